@@ -0,0 +1,83 @@
+"""Throughput and latency of common API calls against a local FakePaystack server.
+
+Every scenario is run sequentially and with a pool of threads, over pooled (keep-alive)
+and unpooled connections. Run from the repository root:
+
+    python -m benchmarks.bench_api --requests 500 --concurrency 16 --latency 0.005
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from py4paystack.routes.bulk_charges import BulkCharges
+from py4paystack.routes.charge import Charge
+from py4paystack.routes.transaction import Transaction
+from py4paystack.routes.transfer import Transfer
+from tests.fake_server import FakePaystack
+
+BATCH_SIZE = 100
+
+SCENARIOS = {
+    'verify': (Transaction, lambda route, i: route.verify(f'ref{i:010d}')),
+    'charge': (Charge, lambda route, i: route.create(f'customer{i}@example.com', 5000, authorization_code='AUTH_0000000001')),
+    'list pagination': (Transaction, lambda route, i: route.list_transactions(per_page=100, page=i % 5 + 1)),
+    'bulk charges': (BulkCharges, lambda route, i: route.initiate([(f'AUTH_{n:010d}', 5000) for n in range(BATCH_SIZE)])),
+    'bulk transfers': (Transfer, lambda route, i: route.initiate_bulk('balance', *[
+        {'amount': 5000, 'recipient': f'RCP_{n:010d}', 'reference': f'bulk{i}x{n}'} for n in range(BATCH_SIZE)])),
+}
+
+
+def run(server, route_class, call, requests, concurrency, pooled):
+    route = route_class('sk_test_fake')
+    route.transport = server.transport(pooled=pooled, pool_size=concurrency)
+    timings = []
+    lock = threading.Lock()
+
+    def timed(i):
+        start = time.perf_counter()
+        call(route, i)
+        elapsed = time.perf_counter() - start
+        with lock:
+            timings.append(elapsed)
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        for i in range(requests):
+            timed(i)
+    else:
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(timed, range(requests)))
+    total = time.perf_counter() - start
+    route.transport.close()
+
+    percentiles = statistics.quantiles(timings, n=100)
+    return requests / total, percentiles[49] * 1000, percentiles[98] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds the fake server waits before answering')
+    parser.add_argument('--scenario', choices=SCENARIOS, action='append')
+    args = parser.parse_args()
+
+    print(f"{'scenario':<16} {'mode':<11} {'connections':<12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    with FakePaystack(latency=args.latency) as server:
+        for name in args.scenario or SCENARIOS:
+            route_class, call = SCENARIOS[name]
+            for concurrency in (1, args.concurrency):
+                for pooled in (False, True):
+                    throughput, p50, p99 = run(
+                        server, route_class, call, args.requests, concurrency, pooled)
+                    mode = 'sequential' if concurrency == 1 else f'{concurrency} threads'
+                    connections = 'pooled' if pooled else 'unpooled'
+                    print(f'{name:<16} {mode:<11} {connections:<12} {throughput:>9.0f} {p50:>8.2f} {p99:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
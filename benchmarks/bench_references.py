@@ -0,0 +1,39 @@
+"""Cost of generating transaction and transfer references.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_references --number 200000
+"""
+
+import argparse
+import timeit
+import uuid
+
+from py4paystack.utilities.dedup import MemoryDeduplicator
+from py4paystack.utilities.reference import ReferenceGenerator, uuid_reference
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000)
+    args = parser.parse_args()
+
+    generator = ReferenceGenerator('shop1', shard=3)
+    guarded = ReferenceGenerator('shop1', shard=3, guard=MemoryDeduplicator(args.number * 3))
+    candidates = {
+        "str(uuid4()).replace('-', '')": lambda: str(uuid.uuid4()).replace('-', ''),
+        'uuid4().hex': uuid_reference,
+        'ReferenceGenerator()': generator,
+        'ReferenceGenerator() guarded': guarded,
+        'ReferenceGenerator.batch(1000)': lambda: generator.batch(1000),
+    }
+
+    for name, func in candidates.items():
+        per_call = 1000 if name.endswith('(1000)') else 1
+        number = max(args.number // per_call, 10)
+        best = min(timeit.repeat(func, number=number, repeat=3))
+        print(f'{name:<32} {best / number / per_call * 1e9:>8.0f} ns/reference')
+
+
+if __name__ == '__main__':
+    main()
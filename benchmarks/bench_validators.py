@@ -0,0 +1,55 @@
+"""Per-call cost of the validators in py4paystack.utilities.util.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_validators --number 200000
+"""
+
+import argparse
+import datetime
+import timeit
+
+from py4paystack.utilities import settings, util
+
+EMAILS = [f'customer{n}@example.com' for n in range(1000)]
+
+VALIDATORS = {
+    'check_email': lambda: util.check_email('customer@example.com'),
+    'check_domain': lambda: util.check_domain('example.com'),
+    'check_code': lambda: util.check_code(settings.AUTHORIZATION, 'AUTH_8dfhjjdt'),
+    'check_code (list)': lambda: util.check_code(settings.SUBACCOUNT, ['ACCT_8f4s1eq7ml', 'ACCT_9g5t2fr8nm']),
+    'check_membership': lambda: util.check_membership(settings.CURRENCIES, 'USD', 'currency'),
+    'check_channels': lambda: util.check_channels(['card', 'bank']),
+    'check_account_number': lambda: util.check_account_number('0123456789'),
+    'check_bank_code': lambda: util.check_bank_code('058'),
+    'check_bvn': lambda: util.check_bvn('12345678901'),
+    'check_country': lambda: util.check_country('NG'),
+    'check_email_or_customer': lambda: util.check_email_or_customer('CUS_xnxdt6s1zg1f4nx'),
+    'handle_date': lambda: util.handle_date(datetime.date(2022, 1, 1)),
+    'handle_date (str)': lambda: util.handle_date('2022-01-01'),
+}
+
+BATCHES = {
+    'validate_many emails x1000': lambda: util.validate_many(util.check_email, EMAILS),
+    'loop check_email x1000': lambda: [util.check_email(email) for email in EMAILS],
+}
+
+
+def report(name, func, number):
+    best = min(timeit.repeat(func, number=number, repeat=3))
+    print(f'{name:<30} {best / number * 1e9:>10.0f} ns/call')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000)
+    args = parser.parse_args()
+
+    for name, func in VALIDATORS.items():
+        report(name, func, args.number)
+    for name, func in BATCHES.items():
+        report(name, func, max(args.number // 1000, 10))
+
+
+if __name__ == '__main__':
+    main()
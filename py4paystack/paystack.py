@@ -1,87 +1,112 @@
-from .routes import (apple_pay, bulk_charges, charge, control_panel, customers,
-                     disputes, invoices, miscellaneous, payment_pages, plans,
-                     products, refund, settlement, subaccount, subscription,
-                     transactions, transactions_split, transfer_recipient,
-                     transfers, transfers_control, verification,
+from typing import Optional
+
+from .routes import (apple_pay, bulk_charges, charge, control_panel, customer,
+                     disputes, invoices, miscellaneous, payment_pages, plan,
+                     product, refund, settlement, subaccount, subscription,
+                     transaction, transaction_split, transfer,
+                     transfer_control, transfer_recipient, verification,
                      virtual_accounts)
 from .utilities import decorators
+from .utilities.metrics import Instrumentation
+from .utilities.ratelimit import RateLimiter
+from .utilities.transport import Transport
 
 
 class Paystack:
 
     """
     General class that hold all the functionalities of the Paystack API.
+    Route objects are created on first use and reused afterwards.
     """
 
     @decorators.func_type_checker
-    def __init__(self, secret_key: str) -> None:
+    def __init__(self, secret_key: str, transport: Optional[Transport] = None, instrumentation: Optional[Instrumentation] = None, rate_limiter: Optional[RateLimiter] = None) -> None:
+        """
+        Args:
+            secret_key (str): Your Paystack secret key
+            transport (Transport, optional): Connection pool used by every route. Defaults to the shared pool.
+            instrumentation (Instrumentation, optional): Collects the metrics of every route. Defaults to the shared one.
+            rate_limiter (RateLimiter, optional): Limits how fast the routes send requests together. Defaults to None.
+        """
+
         self.secret_key = secret_key
+        self.transport = transport
+        self.instrumentation = instrumentation
+        self.rate_limiter = rate_limiter
+        self._routes = {}
 
     def __repr__(self):
         return 'Paystack(paystack_secret_key)'
 
+    def _route(self, route_class):
+        route = self._routes.get(route_class)
+        if route is None:
+            route = self._routes.setdefault(route_class, route_class(
+                self.secret_key, self.transport, self.instrumentation, self.rate_limiter))
+        return route
+
     def transaction(self):
-        return transactions.Transaction(self.secret_key)
+        return self._route(transaction.Transaction)
 
     def transactionsplit(self):
-        return transactions_split.TransactionSplit(self.secret_key)
+        return self._route(transaction_split.TransactionSplit)
 
     def customers(self):
-        return customers.Customer(self.secret_key)
+        return self._route(customer.Customer)
 
     def dedicated_virtual_accounts(self):
-        return virtual_accounts.DedicatedVirtualAccounts(self.secret_key)
+        return self._route(virtual_accounts.DedicatedVirtualAccounts)
 
     def applepay(self):
-        return apple_pay.ApplePay(self.secret_key)
+        return self._route(apple_pay.ApplePay)
 
     def subaccounts(self):
-        return subaccount.SubAccounts(self.secret_key)
+        return self._route(subaccount.SubAccounts)
 
     def plans(self):
-        return plans.Plan(self.secret_key)
+        return self._route(plan.Plan)
 
     def subscriptions(self):
-        return subscription.Subscription(self.secret_key)
+        return self._route(subscription.Subscription)
 
     def product(self):
-        return products.Product(self.secret_key)
+        return self._route(product.Product)
 
     def payment_pages(self):
-        return payment_pages.PaymentPages(self.secret_key)
+        return self._route(payment_pages.PaymentPages)
 
     def invoices(self):
-        return invoices.Invoice(self.secret_key)
+        return self._route(invoices.Invoice)
 
     def settlement(self):
-        return settlement.Settlements(self.secret_key)
+        return self._route(settlement.Settlement)
 
     def transfer_recipient(self):
-        return transfer_recipient.TransferRecipient(self.secret_key)
+        return self._route(transfer_recipient.TransferRecipient)
 
     def transfer(self):
-        return transfers.Tranfer(self.secret_key)
+        return self._route(transfer.Transfer)
 
     def transfer_control(self):
-        return transfers_control.TransferControl(self.secret_key)
+        return self._route(transfer_control.TransferControl)
 
     def bulk_charges(self):
-        return bulk_charges.BulkCharges(self.secret_key)
+        return self._route(bulk_charges.BulkCharges)
 
     def control_panel(self):
-        return control_panel.ControlPanel(self.secret_key)
+        return self._route(control_panel.ControlPanel)
 
     def charge(self):
-        return charge.Charge(self.secret_key)
+        return self._route(charge.Charge)
 
     def dispute(self):
-        return disputes.Disputes(self.secret_key)
+        return self._route(disputes.Disputes)
 
     def refund(self):
-        return refund.Refund(self.secret_key)
+        return self._route(refund.Refund)
 
     def verification(self):
-        return verification.Verification(self.secret_key)
+        return self._route(verification.Verification)
 
     def miscellaneous(self):
-        return miscellaneous.Miscellaneous(self.secret_key)
+        return self._route(miscellaneous.Miscellaneous)
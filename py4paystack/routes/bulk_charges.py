@@ -14,6 +14,14 @@ class BulkCharges(Request):
 
     path = '/bulkcharge'
 
+    @staticmethod
+    def get_payload(charge: Sequence) -> dict:
+        authorization, amount = charge
+        if not isinstance(amount, int) or amount <= 0:
+            raise ValueError(
+                f"Invalid amount {amount!r}, amount must be a positive integer")
+        return {'authorization': util.check_code(settings.AUTHORIZATION, authorization), 'amount': amount}
+
     def initiate(self, charges: Sequence):
         """Send list of tuples with authorization codes and amount (in kobo if currency is NGN, pesewas, if currency is GHS, and cents, if currency is ZAR ) 
         so we can process transactions as a batch.
@@ -22,12 +30,14 @@ class BulkCharges(Request):
             charges ( Sequence[tuple[str, int]] ): List of tuples each containing an authorization code as a string
                 and an amount to be charged as an integer eg [( "AUTH_n95vpedf", 2500 ), ( "AUTH_n95vpedf", 2500 ), ( "AUTH_n95vpedf", 2500 )]
 
+        Raises:
+            BatchValidationError: raised with every invalid charge and its index, nothing is sent
+
         Returns:
             json: Data fetched from paystack API
         """
 
-        payload = [{'authorization': util.check_code(
-            settings.AUTHORIZATION, x[0]), 'amount': x[1]} for x in charges]
+        payload = util.validate_rows(self.get_payload, charges)
 
         return self.post(self.path, payload)
 
@@ -50,9 +60,7 @@ class BulkCharges(Request):
 
         params = util.check_query_params(
             per_page=per_page, page=page, from_date=from_date, to_date=to_date)
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch_batches(self, id_or_code: Union[int, str]):
         """This endpoint retrieves a specific batch code.
@@ -100,9 +108,7 @@ class BulkCharges(Request):
             params['status'] = util.check_membership(
                 settings.BULK_CHARGE_STATUSES, status, status)
 
-        if params:
-            return self.get(util.handle_query_params(path, params))
-        return self.get(path)
+        return self.get(path, params)
 
     def pause_batch(self, batch_code: str):
         """Use this endpoint to pause processing a batch
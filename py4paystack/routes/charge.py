@@ -150,7 +150,7 @@ class Charge(Request):
         """
 
         path = f"{self.path}/submit_otp"
-        payload = util.generate_payload(locals)
+        payload = util.generate_payload(locals())
         return self.post(path, payload)
 
     def submit_phone(self, phone: str, reference: str):
@@ -181,6 +181,7 @@ class Charge(Request):
 
         path = f"{self.path}/submit_birthday"
         payload = util.generate_payload(locals())
+        payload['birthday'] = util.handle_date(birthday)
         return self.post(path, payload)
 
     def submit_address(self, reference: str, address: str, city: str, state: str, zipcode: str):
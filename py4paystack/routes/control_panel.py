@@ -9,7 +9,7 @@ class ControlPanel(Request):
     The Control Panel API allows you manage some settings on your integration
     """
 
-    path = 'integration/payment_session_timeout'
+    path = '/integration/payment_session_timeout'
 
     def fetch_payment_session_timeout(self):
         """Fetch the payment session timeout on your integration
@@ -1,7 +1,9 @@
+import os
 from datetime import date, datetime
 
-from typing import Union
+from typing import Callable, Optional, Union
 from ..utilities import settings, util, decorators
+from ..utilities.errors import APIError
 from ..utilities.request import Request
 
 
@@ -44,10 +46,7 @@ class Disputes(Request):
             params['status'] = util.check_membership(
                 settings.DISPUTE_STATUSES, status, 'status')
 
-        if params:
-            path = util.handle_query_params(self.path, params)
-            return self.get(path)
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, dispute_id: int):
         """Get more details about a dispute
@@ -131,10 +130,32 @@ class Disputes(Request):
         """
 
         path = f'{self.path}/{dispute_id}/upload_url'
-        if upload_filename:
-            path = util.handle_query_params(
-                path, {'upload_filename': upload_filename})
-        return self.get(path)
+        return self.get(path, {'upload_filename': upload_filename})
+
+    def upload_evidence(self, dispute_id: int, file_path: str, content_type: str = 'application/octet-stream', progress: Optional[Callable] = None):
+        """Get an upload URL for a file and upload it, streaming it from disk.
+
+        Args:
+            dispute_id (int): ID of the dispute
+            file_path (str): Path of the file to upload e.g. receipts/1234.pdf
+            content_type (str, optional): Content type of the file. Defaults to 'application/octet-stream'.
+            progress (Callable, optional): Called with (bytes sent, total bytes) as the file is sent. Defaults to None.
+
+        Raises:
+            APIError: raised when the upload url is refused or the upload fails
+
+        Returns:
+            JSON: Data fetched from API, data.fileName is the upload_url to pass to resolve
+        """
+
+        response = self.get_upload_url(dispute_id, os.path.basename(file_path))
+        if not response.get('status'):
+            raise APIError(response)
+
+        status = self.upload(response['data']['signedUrl'], file_path, content_type, progress)
+        if status >= 300:
+            raise APIError({'status': False, 'message': f'upload of {file_path} failed with status {status}'})
+        return response
 
     def resolve(self, dispute_id: int, resolution: str, message: str, refund_amount: int, upload_url: str, evidence_id: int = None):
         """Resolve disputes on your integration
@@ -190,6 +211,4 @@ class Disputes(Request):
             params['status'] = util.check_membership(
                 settings.DISPUTE_STATUSES, status, 'status')
 
-        if params:
-            path = util.handle_query_params(path, params)
-        return self.get(path)
+        return self.get(path, params)
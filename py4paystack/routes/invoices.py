@@ -90,9 +90,7 @@ class Invoice(Request):
             params['currency'] = util.check_membership(
                 settings.CURRENCIES, currency, 'currency')
 
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def view(self, invoice: Union[int, str]):
         """Get details of an invoice on your integration.
@@ -132,7 +130,7 @@ class Invoice(Request):
         """
 
         path = f"{self.path}/notify/{util.check_code(settings.INVOICE, invoice_code)}"
-        return self.get(path)
+        return self.post(path, {})
 
     def total(self):
         """Get invoice metrics for dashboard
@@ -155,7 +153,7 @@ class Invoice(Request):
         """
 
         path = f"{self.path}/finalize/{util.check_code(settings.INVOICE, invoice_code)}"
-        return self.get(path)
+        return self.post(path, {})
 
     def update(self, invoice: Union[int, str], customer: Union[int, str] = None, amount: int = None, currency: str = None, due_date: Union[date, datetime, str] = None, description: str = None, line_items: list[dict[str]] = None, tax: list[dict[str]] = None, send_notification: bool = None, draft: bool = None, invoice_number: int = None, split_code: str = None):
         """Update an invoice details on your integration.
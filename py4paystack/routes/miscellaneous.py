@@ -32,16 +32,14 @@ class Miscellaneous(Request):
         """
 
         path = '/bank'
-        params = util.generate_payload(locals(), 'per_page', 'currency').update(
-            util.check_query_params(per_page=per_page))
+        params = util.generate_payload(locals(), 'per_page', 'currency')
+        params.update(util.check_query_params(per_page=per_page))
 
         if currency:
             params['currency'] = util.check_membership(
                 settings.CURRENCIES, currency, 'currency')
 
-        if params:
-            path = util.handle_query_params(path, params)
-        return self.get(path)
+        return self.get(path, params)
 
     def list_providers(self, pay_with_bank_transfer: bool = None):
         """Get a list of all providers for Dedicated Virtual Account
@@ -56,10 +54,7 @@ class Miscellaneous(Request):
         path = '/bank'
         params = util.generate_payload(locals())
 
-        if params:
-            path = util.handle_query_params(path, params)
-
-        return self.get(path)
+        return self.get(path, params)
 
     def list_search_countries(self):
         """Gets a list of Countries that Paystack currently supports
@@ -82,6 +77,6 @@ class Miscellaneous(Request):
         Returns:
             JSON: Data fetched from API
         """
-        path = f'/address_verification/states?country={country}' if country else '/address_verification/states'
+        path = '/address_verification/states'
 
-        return self.get(path)
+        return self.get(path, {'country': country})
@@ -57,9 +57,7 @@ class PaymentPages(Request):
 
         params = util.check_query_params(
             per_page=per_page, page=page, from_date=from_date, to_date=to_date)
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, id_or_slug: Union[int, str]):
         """Get details of a payment page on your integration.
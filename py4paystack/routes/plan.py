@@ -68,9 +68,7 @@ class Plan(Request):
             params['status'] = util.check_membership(
                 settings.PLAN_STATUSES, status, 'status')
 
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, plan: Union[int, str]):
         """Get details of a plan on your integration.
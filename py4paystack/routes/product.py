@@ -63,9 +63,7 @@ class Product(Request):
 
         params = util.check_query_params(
             per_page=per_page, page=page, from_date=from_date, to_date=to_date)
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, product_id: int):
         """Get details of a product on your integration.
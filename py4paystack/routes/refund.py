@@ -65,10 +65,7 @@ class Refund(Request):
             params['currency'] = util.check_membership(
                 settings.CURRENCIES, currency, 'currency')
 
-        if params:
-            path = util.handle_query_params(self.path, params)
-            return self.get(path)
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, reference: str):
         """Get details of a refund on your integration.
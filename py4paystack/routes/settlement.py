@@ -38,9 +38,7 @@ class Settlement(Request):
         params.update({'subaccount': util.check_code(
             settings.SUBACCOUNT, subaccount)})
 
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch_transactions(self, settlement_id: int, per_page: int = None, page: int = None, from_date: Union[date, datetime, str] = None, to_date: Union[date, datetime, str] = None):
         """Get the transactions that make up a particular settlement
@@ -63,6 +61,4 @@ class Settlement(Request):
         path = f"{self.path}/{settlement_id}/transactions"
         params = util.check_query_params(
             per_page=per_page, page=page, from_date=from_date, to_date=to_date)
-        if params:
-            return self.get(util.handle_query_params(path, params))
-        return self.get(path)
+        return self.get(path, params)
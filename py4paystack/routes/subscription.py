@@ -61,9 +61,7 @@ class Subscription(Request):
         params = util.generate_payload(locals())
         params.update(util.check_query_params(per_page=per_page, page=page))
 
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, subscription: Union[int, str]):
         """Get details of a subscription on your integration.
@@ -140,9 +140,7 @@ class Transaction(Request):
             params['status'] = util.check_membership(
                 settings.TRANSACTION_STATUS, status, 'status')
 
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, transaction_id: int):
         """Get details of a transaction carried out on your integration.
@@ -253,7 +251,7 @@ class Transaction(Request):
             payload['reference'] = util.create_ref()
 
         if channels:
-            payload.update(util.check_channels(channels))
+            payload['channels'] = util.check_channels(channels)
 
         if queue:
             payload['queue'] = True
@@ -330,10 +328,8 @@ class Transaction(Request):
 
         path = f'{self.path}/totals'
         params = util.check_query_params(
-            per_page=per_page, page=page, from_date=from_date, to_date=to_date).values()
-        if params:
-            return self.get(util.handle_query_params(path, params))
-        return self.get(path)
+            per_page=per_page, page=page, from_date=from_date, to_date=to_date)
+        return self.get(path, params)
 
     def timeline(self, id_or_reference: Union[int, str] = None):
         """View the timeline of a transaction.
@@ -387,6 +383,4 @@ class Transaction(Request):
             params['status'] = util.check_membership(
                 settings.TRANSACTION_STATUS, status, 'status')
 
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(f'{self.path}/export', params)
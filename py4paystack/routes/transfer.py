@@ -17,6 +17,10 @@ class Transfer(Request):
 
     @staticmethod
     def get_payload(transfer: dict, generate_reference: bool = False) -> dict:
+        if not {'amount', 'recipient'}.issubset(transfer):
+            raise MissingArgumentsError(
+                'missing arguments: provide the amount and recipient code')
+
         payload = util.generate_payload(
             transfer, 'source', 'generate_reference')
         payload['recipient'] = util.check_code(
@@ -49,11 +53,12 @@ class Transfer(Request):
             JSON: Data fetched from API
         """
 
+        transfer = self.get_payload(
+            locals(), generate_reference=generate_reference)
         payload = {
             'source': util.check_membership(settings.TRANSFER_SOURCES, source, 'source')
         }
-        payload.update(self.get_payload(
-            locals(), generate_reference=generate_reference))
+        payload.update(transfer)
 
         return self.post(self.path, payload)
 
@@ -84,7 +89,8 @@ class Transfer(Request):
             transfers (dict): Transfer objects. Each object should contain amount, recipient, and reference
 
         Raises:
-            MissingArgumentsError: raised when a required argument is missing.
+            BatchValidationError: raised with every invalid transfer and its index, e.g. a missing amount or recipient
+                or a reference used twice. Nothing is sent.
 
         Returns:
             JSON: Data fetched from API
@@ -92,14 +98,14 @@ class Transfer(Request):
 
         path = f'{self.path}/bulk'
 
-        for x in transfers:
-            if ('amount', 'recipient') not in x:
-                raise MissingArgumentsError(
-                    'missing arguments: provide the amount and recipient code')
+        references = iter(util.create_refs(
+            sum(1 for transfer in transfers if not transfer.get('reference'))))
+        transfers = [transfer if transfer.get('reference') else dict(transfer, reference=next(references))
+                     for transfer in transfers]
 
         payload = {
             'source': util.check_membership(settings.TRANSFER_SOURCES, source, 'source'),
-            'transfers': [self.get_payload(transfer, generate_reference=True) for transfer in transfers]
+            'transfers': util.validate_rows(self.get_payload, transfers, unique='reference')
         }
 
         return self.post(path, payload)
@@ -124,9 +130,7 @@ class Transfer(Request):
         if customer_id:
             params.update({'customer': customer_id})
 
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, transfer: Union[int, str]):
         """Get details of a transfer on your integration.
@@ -1,3 +1,6 @@
+import datetime
+from typing import Union
+
 from ..utilities import decorators, settings, util
 from ..utilities.request import Request
 
@@ -21,15 +24,23 @@ class TransferControl(Request):
 
         return self.get(self.balance)
 
-    def fetch_balance_ledger(self):
-        """Fetch all pay-ins and pay-outs that occured on your integration
+    def fetch_balance_ledger(self, per_page: int = None, page: int = None, from_date: Union[datetime.datetime, datetime.date, str] = None, to_date: Union[datetime.datetime, datetime.date, str] = None):
+        """Fetch all pay-ins and pay-outs that occured on your integration, newest first
+
+        Args:
+            per_page (int, optional): Specify how many records you want to retrieve per page. Defaults to None.
+            page (int, optional): Specify exactly what page you want to retrieve. Defaults to None.
+            from_date (Union[datetime.datetime, datetime.date, str], optional): A timestamp from which to start listing entries. Defaults to None.
+            to_date (Union[datetime.datetime, datetime.date, str], optional): A timestamp at which to stop listing entries. Defaults to None.
 
         Returns:
             JSON: Data fetched from API
         """
         path = f'{self.balance}/ledger'
+        params = util.check_query_params(
+            per_page=per_page, page=page, from_date=from_date, to_date=to_date)
 
-        return self.get(path)
+        return self.get(path, params)
 
     def resend_otp(self, transfer_code: str, reason: str):
         """Generates a new OTP and sends to customer in the event they are having trouble receiving one.
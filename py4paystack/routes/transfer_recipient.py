@@ -18,16 +18,16 @@ class TransferRecipient(Request):
     @staticmethod
     def get_payload(payload: dict):
         payload = util.generate_payload(payload)
-        if not ('recipient_type' or 'type') in payload:
+        if not ('recipient_type' in payload or 'type' in payload):
             raise MissingArgumentsError(
                 f"provide recipient_type or type based on the type of recipient you want to create, your choices are: {', '.join(settings.RECIPIENT_TYPES)}")
 
-        payload['type'] = util.check_membership(settings.RECIPIENT_TYPES, payload.get(
-            'recipient_type') or payload.get('type'), 'type')
+        payload['type'] = util.check_membership(settings.RECIPIENT_TYPES, payload.pop(
+            'recipient_type', None) or payload.get('type'), 'type')
         r_type = payload.get('type')
 
         if r_type == 'authorization':
-            if not ('email' and 'authorization_code') in payload:
+            if not ('email' in payload and 'authorization_code' in payload):
                 raise MissingArgumentsError(
                     "provide email and authorization_code params")
 
@@ -40,7 +40,7 @@ class TransferRecipient(Request):
                     payload.pop(x)
 
         elif r_type in ('basa', 'nuban', 'mobile_money'):
-            if not ('bank_code' and 'account_number') in payload:
+            if not ('bank_code' in payload and 'account_number' in payload):
                 raise MissingArgumentsError(
                     "provide bank_code and account_number")
 
@@ -88,12 +88,15 @@ class TransferRecipient(Request):
             recipients (dict[str]): Recipient objects. Each object should contain type, name, and bank_code.
                 Any Create Transfer Recipient param can also be passed.
 
+        Raises:
+            BatchValidationError: raised with every invalid recipient and its index, nothing is sent
+
         Returns:
             JSON: Data fetched from API
         """
         path = f"{self.path}/bulk"
         payload = {
-            'batch': [self.get_payload(recipient) for recipient in recipients]
+            'batch': util.validate_rows(self.get_payload, recipients)
         }
         return self.post(path, payload)
 
@@ -115,9 +118,7 @@ class TransferRecipient(Request):
         """
         params = util.check_query_params(
             per_page=per_page, page=page, from_date=from_date, to_date=to_date)
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, recipient: Union[int, str]):
         """Fetch the details of a transfer recipient.
@@ -21,8 +21,11 @@ class Verification(Request):
             JSON: Data fetched from API
         """
 
-        path = f'/bank/resolve?account_number={util.check_account_number(account_number)}&bank_code={util.check_bank_code(bank_code)}'
-        return self.get(path)
+        params = {
+            'account_number': util.check_account_number(account_number),
+            'bank_code': util.check_bank_code(bank_code)
+        }
+        return self.get('/bank/resolve', params)
 
     def validate_account(self, account_name: str, account_number: str, account_type: str, bank_code: str, country_code: str, document_type: str, document_number: str):
         """Confirm the authenticity of a customer's account number before sending money
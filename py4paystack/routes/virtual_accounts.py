@@ -45,7 +45,7 @@ class DedicatedVirtualAccounts(Request):
 
         return self.post(self.path, payload=payload)
 
-    def list_accounts(self, active: bool = None, currency: str = None, provider_slug: str = None, bank_id: int = None, customer_id: str = None):
+    def list_accounts(self, active: bool = None, currency: str = None, provider_slug: str = None, bank_id: int = None, customer_id: str = None, per_page: int = None, page: int = None):
         """List dedicated virtual accounts available on your integration.
 
         Args:
@@ -54,12 +54,16 @@ class DedicatedVirtualAccounts(Request):
             provider_slug (str, optional): The bank's slug in lowercase, without spaces e.g. wema-bank. Defaults to None.
             bank_id (int, optional): The bank's ID e.g. 035. Defaults to None.
             customer_id (str, optional): The customer's ID. Defaults to None.
+            per_page (int, optional): Specify how many records you want to retrieve per page. Defaults to None.
+            page (int, optional): Specify exactly what page you want to retrieve. Defaults to None.
 
         Returns:
             JSON: Data fetched from API
         """
 
-        params = util.generate_payload(locals(), 'currency', 'provider_slug')
+        params = util.generate_payload(
+            locals(), 'currency', 'provider_slug', 'per_page', 'page')
+        params.update(util.check_query_params(per_page=per_page, page=page))
         if currency:
             params['currency'] = util.check_membership(
                 settings.CURRENCIES, currency, 'currency')
@@ -68,9 +72,7 @@ class DedicatedVirtualAccounts(Request):
             params['provider_slug'] = util.check_membership(
                 settings.VIRTUAL_ACCOUNT_PROVIDERS, provider_slug, 'provider_slug')
 
-        if params:
-            return self.get(util.handle_query_params(self.path, params))
-        return self.get(self.path)
+        return self.get(self.path, params)
 
     def fetch(self, dedicated_account_id: int):
         """Get details of a dedicated virtual account on your integration.
@@ -97,10 +99,13 @@ class DedicatedVirtualAccounts(Request):
             JSON: Data fetched from API
         """
 
-        path = f"{self.path}/requery?account_number={util.check_account_number(account_number)}&provider_slug={util.check_membership(settings.VIRTUAL_ACCOUNT_PROVIDERS, provider_slug, 'provider_slug')}"
-        if date:
-            path += f'&date={util.handle_date(date)}'
-        return self.get(path)
+        path = f'{self.path}/requery'
+        params = {
+            'account_number': util.check_account_number(account_number),
+            'provider_slug': util.check_membership(settings.VIRTUAL_ACCOUNT_PROVIDERS, provider_slug, 'provider_slug'),
+            'date': util.handle_date(date) if date else None
+        }
+        return self.get(path, params)
 
     def deactivate(self, dedicated_account_id: int):
         """Deactivate a dedicated virtual account on your integration.
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Optional, Union
+
+from .paystack import Paystack
+from .utilities import decorators
+from .utilities.metrics import Instrumentation
+from .utilities.ratelimit import RateLimiter
+from .utilities.transport import Transport
+
+
+class Tenant:
+
+    """
+    The client of one merchant with its own metrics and rate limit budget.
+    """
+
+    __slots__ = ('tenant_id', 'client', 'instrumentation', 'rate_limiter', 'last_used')
+
+    def __init__(self, tenant_id: str, client: Paystack, instrumentation: Instrumentation, rate_limiter: RateLimiter = None) -> None:
+        self.tenant_id = tenant_id
+        self.client = client
+        self.instrumentation = instrumentation
+        self.rate_limiter = rate_limiter
+        self.last_used = time.monotonic()
+
+    def __repr__(self):
+        return f'Tenant({self.tenant_id!r})'
+
+
+class Tenants:
+
+    """
+    Clients for many merchants, each with its own secret key, looked up by tenant id e.g.
+
+        tenants = Tenants(lambda tenant_id: vault.secret_key(tenant_id), rate=50)
+        tenants[merchant_id].transaction().verify(reference)
+
+    Every tenant sends its requests over one shared connection pool but has its own
+    Instrumentation and RateLimiter. Clients are created on first use and dropped when they
+    have been idle for idle_timeout seconds or when more than max_tenants are in memory,
+    the secret key is looked up again if the tenant comes back.
+    """
+
+    @decorators.func_type_checker
+    def __init__(self, keys: Union[Mapping, Callable], transport: Optional[Transport] = None, rate: Optional[Union[int, float]] = None, burst: Optional[int] = None, max_tenants: int = 1000, idle_timeout: Union[int, float] = 900.0, on_evict: Optional[Callable] = None) -> None:
+        """
+        Args:
+            keys (Union[Mapping, Callable]): Secret key of each tenant id, or a function returning it.
+            transport (Transport, optional): Connection pool shared by every tenant. Defaults to the shared pool of the routes.
+            rate (float, optional): Requests per second allowed for each tenant. Defaults to None, no limit.
+            burst (int, optional): Requests each tenant may send at once. Defaults to rate.
+            max_tenants (int, optional): Most tenant clients kept in memory. Defaults to 1000.
+            idle_timeout (float, optional): Seconds after which an unused client is dropped. Defaults to 900.0.
+            on_evict (Callable, optional): Called with each Tenant dropped from memory, e.g. to export its metrics. Defaults to None.
+        """
+
+        self._lookup = keys.__getitem__ if isinstance(keys, Mapping) else keys
+        self.transport = transport
+        self.rate = rate
+        self.burst = burst
+        self.max_tenants = max_tenants
+        self.idle_timeout = idle_timeout
+        self.on_evict = on_evict
+        self._tenants = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'Tenants(active={len(self._tenants)})'
+
+    def __len__(self):
+        return len(self._tenants)
+
+    def __contains__(self, tenant_id):
+        return tenant_id in self._tenants
+
+    def __getitem__(self, tenant_id: str) -> Paystack:
+        return self.tenant(tenant_id).client
+
+    def client(self, tenant_id: str) -> Paystack:
+        """Return the Paystack client of tenant_id"""
+
+        return self.tenant(tenant_id).client
+
+    def tenant(self, tenant_id: str) -> Tenant:
+        """Return the Tenant of tenant_id, creating its client if it is not in memory
+
+        Raises:
+            KeyError: raised when keys has no secret key for tenant_id
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            tenant = self._tenants.get(tenant_id)
+            if tenant is not None:
+                tenant.last_used = now
+                self._tenants.move_to_end(tenant_id)
+                return tenant
+
+        # the key lookup may be slow (a database or vault), so it runs outside the lock
+        secret_key = self._lookup(tenant_id)
+        if secret_key is None:
+            raise KeyError(tenant_id)
+        tenant = self._create(tenant_id, secret_key)
+
+        with self._lock:
+            existing = self._tenants.get(tenant_id)
+            if existing is not None:
+                tenant = existing
+            else:
+                self._tenants[tenant_id] = tenant
+            tenant.last_used = now
+            self._tenants.move_to_end(tenant_id)
+            evicted = self._evict(now)
+        self._notify(evicted)
+        return tenant
+
+    def _create(self, tenant_id, secret_key):
+        instrumentation = Instrumentation()
+        rate_limiter = RateLimiter(self.rate, self.burst) if self.rate else None
+        client = Paystack(secret_key, self.transport, instrumentation, rate_limiter)
+        return Tenant(tenant_id, client, instrumentation, rate_limiter)
+
+    def _evict(self, now):
+        # least recently used tenants are at the front, stop at the first one still in use
+        evicted = []
+        while self._tenants:
+            tenant = next(iter(self._tenants.values()))
+            if len(self._tenants) <= self.max_tenants and now - tenant.last_used < self.idle_timeout:
+                break
+            evicted.append(self._tenants.popitem(last=False)[1])
+        return evicted
+
+    def _notify(self, evicted):
+        if self.on_evict:
+            for tenant in evicted:
+                self.on_evict(tenant)
+
+    def evict_idle(self) -> int:
+        """Drop every client idle for longer than idle_timeout and return how many were dropped"""
+
+        with self._lock:
+            evicted = self._evict(time.monotonic())
+        self._notify(evicted)
+        return len(evicted)
+
+    def remove(self, tenant_id: str):
+        """Drop the client of tenant_id, e.g. after its secret key was rotated"""
+
+        with self._lock:
+            tenant = self._tenants.pop(tenant_id, None)
+        if tenant is not None:
+            self._notify([tenant])
+
+    def metrics(self, tenant_id: str) -> dict:
+        """Metrics snapshot of tenant_id, empty if it is not in memory"""
+
+        tenant = self._tenants.get(tenant_id)
+        return tenant.instrumentation.snapshot() if tenant else {}
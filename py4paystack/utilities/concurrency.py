@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator
+
+from .metrics import Instrumentation
+from .ratelimit import RateLimiter
+
+RETRYABLE_ERRORS = (OSError,)
+
+
+def retry(func: Callable, *args, attempts: int = 3, backoff: float = 0.5, retry_on: tuple = RETRYABLE_ERRORS, instrumentation: Instrumentation = None, route: str = '*', **kwargs):
+    """Call func(*args, **kwargs), calling it again after backoff, 2 * backoff... seconds when it raises one of retry_on.
+    Only use it for calls that are safe to repeat, e.g. a charge with a fixed reference.
+    Every retry is counted as 'retries' in instrumentation.
+    """
+
+    for attempt in range(attempts):
+        try:
+            return func(*args, **kwargs)
+        except retry_on:
+            if attempt == attempts - 1:
+                raise
+            if instrumentation is not None:
+                instrumentation.incr('retries', route)
+            time.sleep(backoff * 2 ** attempt)
+
+
+def run_concurrently(func: Callable, items: Iterable, workers: int = 8, rate_limiter: RateLimiter = None) -> Iterator[tuple]:
+    """Call func(item) for every item on a pool of workers threads and yield (item, result, error) as calls finish.
+    At most 2 * workers items are taken from items at a time so a streamed iterable is never read ahead
+    of the workers, and rate_limiter, if given, limits how fast calls start.
+    """
+
+    def call(item):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        return func(item)
+
+    items = iter(items)
+    with ThreadPoolExecutor(workers) as executor:
+        running = {}
+        while True:
+            for item in items:
+                running[executor.submit(call, item)] = item
+                if len(running) >= workers * 2:
+                    break
+            if not running:
+                return
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = running.pop(future)
+                error = future.exception()
+                yield item, None if error else future.result(), error
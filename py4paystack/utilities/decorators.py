@@ -2,27 +2,35 @@ import sys
 import typing
 from functools import wraps
 from inspect import _empty, signature
-from types import GenericAlias
+from types import FunctionType, GenericAlias
 from .settings import TYPE_CHECK
 
 def func_type_checker(func):
 
+    sig = signature(func)
+
     @wraps(func)
     def wrapper(*args, **kwargs):
         if TYPE_CHECK:
-            sig = signature(func)
             bound = sig.bind(*args, **kwargs)
 
             for key, value in bound.arguments.items():
-                ann = sig.parameters[key].annotation
+                param = sig.parameters[key]
+                ann = param.annotation
 
                 if ann == _empty or isinstance(ann, GenericAlias):
                     continue
-            
-                if not isinstance(value, get_types(ann)):
+
+                values = (value,)
+                if param.kind == param.VAR_POSITIONAL:
+                    values = value
+                elif param.kind == param.VAR_KEYWORD:
+                    values = value.values()
+
+                if not all(isinstance(x, get_types(ann)) for x in values):
                     class_name = bound.arguments.get('self')
                     func_name = func.__name__
-                    if class_name:
+                    if class_name is not None:
                         func_name = f"{class_name.__class__.__name__}.{func_name}"
 
                     raise TypeError(
@@ -33,17 +41,15 @@ def func_type_checker(func):
 
 def class_type_checker(_cls):
 
-    class C(_cls):
+    # wrap the methods once, when the class is created, so instances share them
+    for key, value in list(_cls.__dict__.items()):
+        if isinstance(value, staticmethod):
+            setattr(_cls, key, staticmethod(
+                func_type_checker(value.__func__)))
+        elif isinstance(value, FunctionType):
+            setattr(_cls, key, func_type_checker(value))
+    return _cls
 
-        def __new__(cls, *args, **kwargs):
-            for key, value in _cls.__dict__.items():
-                if callable(value):
-                    setattr(_cls, key, func_type_checker(value))
-            return super().__new__(cls)
-    C.__name__ = _cls.__name__
-    C.__doc__ = _cls.__doc__
-    return C
-    
 
 def get_types(ann):
     if isinstance(ann, typing._UnionGenericAlias) and not ".".join(map(str, sys.version_info[:3])).startswith("3.10"):
@@ -0,0 +1,97 @@
+import abc
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class Deduplicator(abc.ABC):
+
+    """
+    Remembers keys that have been seen so repeated deliveries can be dropped.
+    """
+
+    @abc.abstractmethod
+    def seen(self, key: str) -> bool:
+        """Record key and report whether it had already been recorded"""
+
+    @abc.abstractmethod
+    def forget(self, key: str):
+        """Remove key so its next delivery is treated as new"""
+
+
+class MemoryDeduplicator(Deduplicator):
+
+    """
+    Bounded in-memory store, the least recently seen keys are evicted once maxsize is reached.
+    """
+
+    def __init__(self, maxsize: int = 100000) -> None:
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def seen(self, key: str) -> bool:
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return True
+            self._keys[key] = None
+            if len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+            return False
+
+    def forget(self, key: str):
+        with self._lock:
+            self._keys.pop(key, None)
+
+
+class SQLiteDeduplicator(Deduplicator):
+
+    """
+    Store backed by a SQLite file so seen keys survive restarts.
+    Recent keys are also kept in memory so hot duplicates never reach the database.
+    """
+
+    def __init__(self, path: str, memory_size: int = 10000) -> None:
+        self.memory = MemoryDeduplicator(memory_size)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS seen_keys (key TEXT PRIMARY KEY, created REAL NOT NULL)')
+
+    def __contains__(self, key):
+        if key in self.memory:
+            return True
+        with self._lock:
+            return self._db.execute('SELECT 1 FROM seen_keys WHERE key = ?', (key,)).fetchone() is not None
+
+    def seen(self, key: str) -> bool:
+        if self.memory.seen(key):
+            return True
+        with self._lock:
+            cursor = self._db.execute(
+                'INSERT OR IGNORE INTO seen_keys (key, created) VALUES (?, ?)', (key, time.time()))
+        return cursor.rowcount == 0
+
+    def forget(self, key: str):
+        self.memory.forget(key)
+        with self._lock:
+            self._db.execute('DELETE FROM seen_keys WHERE key = ?', (key,))
+
+    def prune(self, max_age: float):
+        """Delete keys recorded more than max_age seconds ago"""
+
+        with self._lock:
+            self._db.execute('DELETE FROM seen_keys WHERE created < ?', (time.time() - max_age,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -8,3 +8,25 @@ class UnwantedArgumentsError(Error):
 class MissingArgumentsError(Error):
     """raised when an argument is missing
     """
+
+class InvalidSignatureError(Error):
+    """raised when a webhook payload does not match its x-paystack-signature header
+    """
+
+class BatchValidationError(Error):
+    """raised when rows of a bulk payload are invalid, errors holds (row index, message) for every invalid row
+    """
+
+    def __init__(self, errors: list) -> None:
+        self.errors = errors
+        shown = ', '.join(f'row {index}: {message}' for index, message in errors[:5])
+        more = f' and {len(errors) - 5} more' if len(errors) > 5 else ''
+        super().__init__(f'{len(errors)} invalid rows - {shown}{more}')
+
+class APIError(Error):
+    """raised when the Paystack API answers a request with status false, response holds the whole answer
+    """
+
+    def __init__(self, response: dict) -> None:
+        self.response = response
+        super().__init__(response.get('message') or 'request failed')
@@ -0,0 +1,118 @@
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Union
+
+from .metrics import Instrumentation, route_name
+
+
+class HedgePolicy:
+
+    """
+    When a GET has not answered within the delay percentile of recent GET latencies, the transport sends
+    the same request again on another pooled connection, takes the first response and cuts the other off.
+
+        transport = Transport(hedge=HedgePolicy(percentile=95, max_rate=0.05, routes=['/transaction/verify/:id']))
+
+    Every request earns max_rate of a hedge, up to burst saved hedges, so no more than about max_rate of
+    the requests are ever hedged even while the upstream is slow for everyone. No request is hedged until
+    min_samples latencies have been seen. Hedges are counted as 'hedges' and wins of the hedge over the
+    first request as 'hedge_wins', in instrumentation if given and in snapshot().
+    """
+
+    def __init__(self, percentile: float = 95.0, max_rate: float = 0.05, burst: int = 10, min_delay: float = 0.01, max_delay: float = 2.0, window: int = 1000, min_samples: int = 50, routes: Union[Iterable[str], None] = None, workers: int = 16, instrumentation: Instrumentation = None) -> None:
+        """
+        Args:
+            percentile (float, optional): Latency percentile (0-100) after which a request is hedged. Defaults to 95.
+            max_rate (float, optional): Most hedges per request sent. Defaults to 0.05.
+            burst (int, optional): Most hedges saved up while requests are fast. Defaults to 10.
+            min_delay (float, optional): Shortest wait in seconds before hedging. Defaults to 0.01.
+            max_delay (float, optional): Longest wait in seconds before hedging. Defaults to 2.0.
+            window (int, optional): Recent latencies the percentile is taken over. Defaults to 1000.
+            min_samples (int, optional): Latencies needed before hedging starts. Defaults to 50.
+            routes (Iterable[str], optional): Routes to hedge e.g. /transaction/verify/:id, every GET if None. Defaults to None.
+            workers (int, optional): Threads sending hedges. Defaults to 16.
+            instrumentation (Instrumentation, optional): Where hedges are counted besides snapshot(). Defaults to None.
+        """
+
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.burst = burst
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.routes = frozenset(routes) if routes is not None else None
+        self.workers = workers
+        self.instrumentation = instrumentation
+        self.counters = Counter()
+        self._latencies = deque(maxlen=window)
+        self._delay = None
+        self._stale = 0
+        self._tokens = 0.0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'HedgePolicy(percentile={self.percentile}, max_rate={self.max_rate}, delay={self._delay})'
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='hedge')
+            return self._executor
+
+    def applies(self, path: str) -> bool:
+        return self.routes is None or route_name(path) in self.routes
+
+    def delay(self) -> Union[float, None]:
+        """Seconds to wait before hedging a request that is being sent, None while warming up"""
+
+        with self._lock:
+            self.counters['requests'] += 1
+            self._tokens = min(self.burst, self._tokens + self.max_rate)
+            if len(self._latencies) < self.min_samples:
+                return None
+            if self._delay is None or self._stale >= len(self._latencies) // 20:
+                # a fresh percentile every 5% of the window keeps the sort off the hot path
+                ordered = sorted(self._latencies)
+                index = min(len(ordered) - 1, int(self.percentile / 100 * len(ordered)))
+                self._delay = min(self.max_delay, max(self.min_delay, ordered[index]))
+                self._stale = 0
+            return self._delay
+
+    def observe(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self._stale += 1
+
+    def allow(self) -> bool:
+        """Take a hedge from the budget if one is left"""
+
+        with self._lock:
+            if self._tokens < 1:
+                self.counters['hedges_denied'] += 1
+                return False
+            self._tokens -= 1
+            return True
+
+    def count(self, name: str, path: str):
+        with self._lock:
+            self.counters[name] += 1
+        if self.instrumentation is not None:
+            self.instrumentation.incr(name, f'GET {route_name(path)}')
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            requests = self.counters['requests']
+            return {
+                **self.counters,
+                'hedge_rate': self.counters['hedges'] / requests if requests else 0.0,
+                'delay': self._delay,
+            }
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+import time
+from typing import Union
+
+
+class Journal:
+
+    """
+    Append only JSON lines log of the state of each item of a batch run, e.g. one line per
+    renewal started and one per renewal finished. Reopening the file after a crash restores
+    the last state of every item so the run can resume where it stopped.
+    """
+
+    def __init__(self, path: str, sync: bool = True) -> None:
+        """
+        Args:
+            path (str): Path of the journal file, created if it does not exist
+            sync (bool, optional): fsync after every entry so no entry is lost in a crash. Defaults to True.
+        """
+
+        self.path = path
+        self.sync = sync
+        self._entries = {}
+        self._lock = threading.Lock()
+        torn = os.path.exists(path) and self._load()
+        self._file = open(path, 'a', encoding='utf-8')
+        if torn:
+            # end the line a crash cut short, or the next entry would be appended to it and lost
+            self._file.write('\n')
+            self._file.flush()
+
+    def __repr__(self):
+        return f'Journal({self.path!r}, entries={len(self._entries)})'
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load(self) -> bool:
+        # returns whether the last line is missing its newline
+        line = '\n'
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a line cut short by a crash
+                    continue
+                self._entries[entry['key']] = entry
+        return not line.endswith('\n')
+
+    def get(self, key: str) -> Union[dict, None]:
+        """Last entry written for key"""
+
+        return self._entries.get(key)
+
+    def state(self, key: str) -> Union[str, None]:
+        entry = self._entries.get(key)
+        return entry['state'] if entry else None
+
+    def write(self, key: str, state: str, **data) -> dict:
+        """Record that key reached state, data is kept with the entry"""
+
+        entry = {'key': key, 'state': state, 'time': time.time(), **data}
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+            self._entries[key] = entry
+        return entry
+
+    def entries(self, state: str = None) -> list:
+        """Last entry of every key, only those in state if given"""
+
+        with self._lock:
+            return [entry for entry in self._entries.values() if state is None or entry['state'] == state]
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,260 @@
+import bisect
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# every path the routes build, :id stands for an id, code, reference, email or slug
+ROUTES = (
+    '/address_verification/states',
+    '/apple-pay/domain',
+    '/balance', '/balance/ledger',
+    '/bank', '/bank/resolve', '/bank/validate',
+    '/bulkcharge', '/bulkcharge/:id', '/bulkcharge/:id/charges', '/bulkcharge/pause/:id', '/bulkcharge/resume/:id',
+    '/charge', '/charge/:id', '/charge/submit_address', '/charge/submit_birthday',
+    '/charge/submit_otp', '/charge/submit_phone', '/charge/submit_pin',
+    '/country',
+    '/customer', '/customer/:id', '/customer/:id/identification',
+    '/customer/deactivate_authorization', '/customer/set_risk_action',
+    '/decision/bin/:id',
+    '/dedicated_account', '/dedicated_account/:id', '/dedicated_account/available_providers',
+    '/dedicated_account/requery', '/dedicated_account/split',
+    '/dispute', '/dispute/:id', '/dispute/:id/evidence', '/dispute/:id/resolve', '/dispute/:id/upload_url',
+    '/dispute/export', '/dispute/transaction/:id',
+    '/integration/payment_session_timeout',
+    '/page', '/page/:id', '/page/:id/product', '/page/check_slug_availability/:id',
+    '/paymentrequest', '/paymentrequest/:id', '/paymentrequest/archive/:id', '/paymentrequest/finalize/:id',
+    '/paymentrequest/notify/:id', '/paymentrequest/totals', '/paymentrequest/verify/:id',
+    '/plan', '/plan/:id',
+    '/product', '/product/:id',
+    '/refund', '/refund/:id',
+    '/settlement', '/settlement/:id/transactions',
+    '/split', '/split/:id', '/split/:id/subaccount/add', '/split/:id/subaccount/remove',
+    '/subaccount', '/subaccount/:id',
+    '/subscription', '/subscription/:id', '/subscription/:id/manage/link',
+    '/subscription/disable', '/subscription/enable',
+    '/transaction', '/transaction/:id', '/transaction/charge_authorization', '/transaction/check_authorization',
+    '/transaction/export', '/transaction/initialize', '/transaction/part_debit', '/transaction/timeline/:id',
+    '/transaction/totals', '/transaction/verify/:id',
+    '/transfer', '/transfer/:id', '/transfer/bulk', '/transfer/disable_otp', '/transfer/disable_otp_finalize',
+    '/transfer/enable_otp', '/transfer/finalize_transfer', '/transfer/resend_otp', '/transfer/verify/:id',
+    '/transferrecipient', '/transferrecipient/:id', '/transferrecipient/bulk',
+)
+
+_DYNAMIC_SEGMENT = re.compile(r'[0-9@]')
+
+
+def _tree(routes):
+    # segment -> subtree, a route ends where the subtree holds None
+    tree = {}
+    for route in routes:
+        node = tree
+        for segment in route.split('/'):
+            node = node.setdefault(segment, {})
+        node[None] = route
+    return tree
+
+
+_TREE = _tree(ROUTES)
+
+
+def _match(node, segments):
+    if not segments:
+        return node.get(None)
+    # a fixed segment such as totals wins over :id
+    for key in (segments[0], ':id') if segments[0] else ('',):
+        if key in node:
+            route = _match(node[key], segments[1:])
+            if route is not None:
+                return route
+    return None
+
+
+def route_name(path: str) -> str:
+    """Turn a request path into the route it belongs to by dropping the query string
+    and matching it against ROUTES, e.g. /transaction/verify/7PVGX8MEk85tgeEpVDtD?x=1 -> /transaction/verify/:id.
+    Paths of no known route have the segments holding a digit or @ replaced with :id
+    """
+
+    path = path.split('?', 1)[0]
+    segments = path.split('/')
+    route = _match(_TREE, segments)
+    if route is not None:
+        return route
+    return '/'.join(':id' if _DYNAMIC_SEGMENT.search(segment) else segment for segment in segments)
+
+
+class Histogram:
+
+    """
+    Counts observations into fixed buckets, cheap enough to update on every request.
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (0-100) observation"""
+
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'buckets': dict(zip(self.buckets + (float('inf'),), self.counts)),
+        }
+
+
+class Call:
+
+    """
+    A single API call as seen by the before and after request hooks.
+    Hooks may keep their own state for the call in context.
+    """
+
+    __slots__ = ('method', 'path', 'route', 'request_size', 'started',
+                 'elapsed', 'status', 'response_size', 'error', 'context')
+
+    def __init__(self, method: str, path: str, request_size: int = 0) -> None:
+        self.method = method
+        self.path = path
+        self.route = route_name(path)
+        self.request_size = request_size
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.status = None
+        self.response_size = 0
+        self.error = None
+        self.context = {}
+
+    def __repr__(self):
+        return f'Call({self.method} {self.route}, status={self.status}, elapsed={self.elapsed})'
+
+
+class Instrumentation:
+
+    """
+    Collects latency histograms, status codes and payload sizes per route,
+    counts events such as retries, rate limit waits and cache hits,
+    and runs user hooks before and after every request.
+    """
+
+    def __init__(self) -> None:
+        self.before_request = []
+        self.after_request = []
+        self.latency = defaultdict(Histogram)
+        self.status_codes = defaultdict(Counter)
+        self.bytes_sent = Counter()
+        self.bytes_received = Counter()
+        self.counters = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def add_hooks(self, before: Callable = None, after: Callable = None):
+        """Register functions called with the Call before it is sent and after its response is read"""
+
+        if before:
+            self.before_request.append(before)
+        if after:
+            self.after_request.append(after)
+
+    def start(self, method: str, path: str, request_size: int = 0) -> Call:
+        call = Call(method, path, request_size)
+        for hook in self.before_request:
+            hook(call)
+        return call
+
+    def finish(self, call: Call):
+        call.elapsed = time.perf_counter() - call.started
+        key = f'{call.method} {call.route}'
+        with self._lock:
+            self.latency[key].observe(call.elapsed)
+            self.status_codes[key][call.status or 'error'] += 1
+            self.bytes_sent[key] += call.request_size
+            self.bytes_received[key] += call.response_size
+        for hook in self.after_request:
+            hook(call)
+
+    def incr(self, name: str, route: str = '*', value: int = 1):
+        """Count an event e.g. incr('retries', 'GET /transaction/verify/:id')"""
+
+        with self._lock:
+            self.counters[name][route] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'latency': {key: histogram.snapshot() for key, histogram in self.latency.items()},
+                'status_codes': {key: dict(codes) for key, codes in self.status_codes.items()},
+                'bytes_sent': dict(self.bytes_sent),
+                'bytes_received': dict(self.bytes_received),
+                'counters': {name: dict(routes) for name, routes in self.counters.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.latency.clear()
+            self.status_codes.clear()
+            self.bytes_sent.clear()
+            self.bytes_received.clear()
+            self.counters.clear()
+
+
+class SpanHooks:
+
+    """
+    Opens a tracing span around every API call. Works with any tracer that has an
+    OpenTelemetry style start_span(name) returning spans with set_attribute and end.
+    """
+
+    def __init__(self, tracer) -> None:
+        self.tracer = tracer
+
+    def install(self, instrumentation: Instrumentation) -> 'SpanHooks':
+        instrumentation.add_hooks(before=self.before, after=self.after)
+        return self
+
+    def before(self, call: Call):
+        span = self.tracer.start_span(f'paystack {call.method} {call.route}')
+        span.set_attribute('http.method', call.method)
+        span.set_attribute('http.route', call.route)
+        call.context['span'] = span
+
+    def after(self, call: Call):
+        span = call.context.pop('span', None)
+        if span is None:
+            return
+        if call.status is not None:
+            span.set_attribute('http.status_code', call.status)
+        span.set_attribute('http.response_content_length', call.response_size)
+        if call.error is not None and hasattr(span, 'record_exception'):
+            span.record_exception(call.error)
+        span.end()
@@ -0,0 +1,38 @@
+from typing import Callable, Iterator
+
+from .errors import APIError
+
+
+def pages(list_method: Callable, per_page: int = 100, page: int = 1, **kwargs) -> Iterator[list]:
+    """Yield the records of a list endpoint one page at a time, e.g. pages(trans.list_transactions, status='success').
+    Only one page is held in memory, the page count comes from the meta of each response.
+
+    Raises:
+        APIError: raised when a page request fails
+    """
+
+    while True:
+        response = list_method(per_page=per_page, page=page, **kwargs)
+        if not response.get('status'):
+            raise APIError(response)
+
+        records = response.get('data') or []
+        if records:
+            yield records
+
+        meta = response.get('meta') or {}
+        page_count = meta.get('pageCount')
+        if page_count is None:
+            # endpoints without a page count end with a short page
+            if len(records) < per_page:
+                return
+        elif page >= page_count:
+            return
+        page += 1
+
+
+def paginate(list_method: Callable, per_page: int = 100, page: int = 1, **kwargs) -> Iterator[dict]:
+    """Yield every record of a list endpoint, fetching the next page only when the current one is used up"""
+
+    for records in pages(list_method, per_page, page, **kwargs):
+        yield from records
@@ -0,0 +1,55 @@
+import threading
+import time
+
+
+class RateLimiter:
+
+    """
+    Token bucket limiting how many requests are sent per second.
+    Up to burst requests go out at once, after that one every 1/rate seconds.
+    """
+
+    def __init__(self, rate: float, burst: int = None) -> None:
+        """
+        Args:
+            rate (float): Requests allowed per second
+            burst (int, optional): Requests allowed at once after a quiet period. Defaults to rate.
+        """
+
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'RateLimiter(rate={self.rate}, burst={self.burst})'
+
+    def _reserve(self, tokens):
+        # take the tokens now, possibly going into debt, and return how long to wait for them
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Block until tokens requests may be sent and return the seconds waited"""
+
+        wait = self._reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Take tokens only if they are available now"""
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+import uuid
+from typing import Callable
+
+from .dedup import Deduplicator
+
+
+def uuid_reference() -> str:
+    return uuid.uuid4().hex
+
+
+class ReferenceGenerator:
+
+    """
+    Generates time ordered transaction and transfer references that sort by creation time,
+    e.g. shop1-07-018b2f5c7e4a0003f1c9a2d4b7e0
+
+    A reference is the optional prefix and shard, a 12 hex digit millisecond timestamp,
+    a 4 hex digit counter for references made in the same millisecond and random hex digits.
+    Only lowercase letters, digits and - are used so references are valid for every Paystack endpoint.
+    """
+
+    def __init__(self, prefix: str = '', shard: int = None, random_bytes: int = 6, guard: Deduplicator = None) -> None:
+        """
+        Args:
+            prefix (str, optional): Prefix such as a merchant id. Defaults to ''.
+            shard (int, optional): Shard or worker number, keeps references from parallel workers apart. Defaults to None.
+            random_bytes (int, optional): Number of random bytes added to each reference. Defaults to 6.
+            guard (Deduplicator, optional): Store of issued references, a reference already in it is replaced.
+                Useful for long running batch jobs. Defaults to None.
+        """
+
+        parts = [part for part in (prefix, f'{shard:02d}' if shard is not None else '') if part]
+        self.prefix = ''.join(f'{part}-' for part in parts)
+        self.random_bytes = random_bytes
+        self.guard = guard
+        self._last = 0
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'ReferenceGenerator(prefix={self.prefix!r})'
+
+    def __call__(self) -> str:
+        reference = self._single()
+        return self._unique(reference) if self.guard is not None else reference
+
+    def _single(self):
+        stamp, start = self._reserve(1)
+        return f'{self.prefix}{stamp:012x}{start:04x}{os.urandom(self.random_bytes).hex()}'
+
+    def _reserve(self, count):
+        # returns the millisecond timestamp and first counter value of count consecutive slots
+        now = time.time_ns() // 1000000
+        with self._lock:
+            if now > self._last:
+                self._last, self._counter = now, 0
+            if self._counter + count > 0x10000:
+                self._last, self._counter = self._last + 1, 0
+            start = self._counter
+            self._counter += count
+            return self._last, start
+
+    def batch(self, count: int) -> list:
+        """Allocate count references at once, e.g. one per row of a bulk transfer"""
+
+        references = []
+        while len(references) < count:
+            size = min(count - len(references), 0x10000)
+            stamp, start = self._reserve(size)
+            noise = os.urandom(size * self.random_bytes).hex()
+            width = self.random_bytes * 2
+            head = f'{self.prefix}{stamp:012x}'
+            references.extend(
+                f'{head}{start + n:04x}{noise[n * width:(n + 1) * width]}' for n in range(size))
+
+        if self.guard is not None:
+            references = [self._unique(reference) for reference in references]
+        return references
+
+    def _unique(self, reference):
+        while self.guard.seen(reference):
+            reference = self._single()
+        return reference
+
+
+default = uuid_reference
+
+
+def set_default(generator: Callable):
+    """Use generator for every reference the routes generate, e.g. set_default(ReferenceGenerator('shop1'))"""
+
+    global default
+    default = generator
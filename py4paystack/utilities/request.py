@@ -1,26 +1,75 @@
-import http.client
+import io
 import json
-from typing import Sequence, Union
-from . import decorators
+import os
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Callable, Optional, Sequence, Union
+from urllib.parse import urlsplit
+from . import decorators, util
+from .metrics import Instrumentation, route_name
+from .ratelimit import RateLimiter
+from .transport import Transport
+
+JSON_CONTENT_TYPE = b'application/json'
 
 
 @decorators.class_type_checker
 class Request:
 
-    def __init__(self, secret_key: str) -> None:
-        self.headers = {
-            'authorization': f'bearer {secret_key}',
-            'Content-type': 'application/json',
-        }
+    """
+    Base of every route. The headers are built once per secret key and never
+    modified afterwards, so a route object can be shared by many threads.
+    """
+
+    instrumentation = Instrumentation()
+    transport = Transport()
+    rate_limiter = None
+
+    def __init__(self, secret_key: str, transport: Optional[Transport] = None, instrumentation: Optional[Instrumentation] = None, rate_limiter: Optional[RateLimiter] = None) -> None:
+        """
+        Args:
+            secret_key (str): Your Paystack secret key
+            transport (Transport, optional): Connection pool to send requests with. Defaults to the pool shared by every route.
+            instrumentation (Instrumentation, optional): Collects the metrics of this object's requests. Defaults to the shared one.
+            rate_limiter (RateLimiter, optional): Limits how fast this object sends requests. Defaults to None.
+        """
+
+        if transport is not None:
+            self.transport = transport
+        if instrumentation is not None:
+            self.instrumentation = instrumentation
+        if rate_limiter is not None:
+            self.rate_limiter = rate_limiter
+        authorization = f'bearer {secret_key}'.encode('latin-1')
+        self.auth_headers = MappingProxyType({'authorization': authorization})
+        self.headers = MappingProxyType({
+            'authorization': authorization,
+            'Content-type': JSON_CONTENT_TYPE,
+        })
 
-    @classmethod
-    def request(cls, path: str, method: str, headers: dict = None, payload: dict = None):
-        connection = http.client.HTTPSConnection('api.paystack.co')
-        connection.request(method, path, headers=headers, body=payload)
-        return json.loads(connection.getresponse().read().decode('utf-8'))
+    def request(self, path: str, method: str, headers: Mapping = None, payload: Union[str, bytes] = None):
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        if self.rate_limiter is not None and self.rate_limiter.acquire():
+            self.instrumentation.incr(
+                'rate_limit_waits', f'{method} {route_name(path)}')
+        call = self.instrumentation.start(
+            method, path, len(payload) if payload else 0)
+        try:
+            call.status, body = self.transport.send(
+                method, path, headers=headers, body=payload)
+            call.response_size = len(body)
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            self.instrumentation.finish(call)
+        return json.loads(body)
 
-    def get(self, path: str):
-        return self.request(path, 'GET', headers={'authorization': self.headers.pop('authorization')})
+    def get(self, path: str, params: dict = None):
+        if params:
+            path = util.handle_query_params(path, params)
+        return self.request(path, 'GET', headers=self.auth_headers)
 
     def post(self, path: str, payload: Union[dict, Sequence, set] = None):
         if payload:
@@ -31,8 +80,29 @@ class Request:
         return self.request(path, 'PUT', headers=self.headers, payload=json.dumps(payload))
 
     def delete(self, path: str, payload: dict = None):
-        method = 'DELETE'
         if payload:
-            return self.request(path, method, headers=self.headers, payload=payload)
-        return self.request(path, method, headers={'authorization': self.headers.pop('authorization')})
-    
+            return self.request(path, 'DELETE', headers=self.headers, payload=json.dumps(payload))
+        return self.request(path, 'DELETE', headers=self.auth_headers)
+
+    def upload(self, url: str, file: Union[str, io.IOBase], content_type: str = 'application/octet-stream', progress: Optional[Callable] = None) -> int:
+        """PUT a file to a signed url, e.g. from Disputes.get_upload_url, streaming it from disk.
+        Uploads to the same host share a connection pool with this object's timeout settings.
+
+        Returns:
+            int: The response status code
+        """
+
+        parts = urlsplit(url)
+        path = f'{parts.path}?{parts.query}' if parts.query else parts.path
+        size = os.path.getsize(file) if isinstance(file, str) else os.fstat(file.fileno()).st_size - file.tell()
+        call = self.instrumentation.start('PUT', parts.path, size)
+        try:
+            call.status, body = self.transport.for_url(url).upload(
+                'PUT', path, file, headers={'Content-Type': content_type}, progress=progress)
+            call.response_size = len(body)
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            self.instrumentation.finish(call)
+        return call.status
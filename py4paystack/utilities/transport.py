@@ -0,0 +1,368 @@
+import http.client
+import mmap
+import os
+import queue
+import select
+import socket
+import threading
+import time
+from typing import BinaryIO, Callable, Iterator, Union
+from urllib.parse import urlsplit
+
+from .hedging import HedgePolicy
+
+PAYSTACK_HOST = 'api.paystack.co'
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+MMAP_THRESHOLD = 8 << 20
+
+# methods a request can be sent again with when it is unknown whether the server got it
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'})
+
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected,
+                            http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError)
+
+
+class Transport:
+
+    """
+    Sends requests to a single host. When pooled, keep-alive connections are
+    kept in a pool and reused instead of opening a new TLS connection per call.
+    With a HedgePolicy, slow GETs are sent a second time on another connection
+    and the first response is used.
+    """
+
+    def __init__(self, host: str = PAYSTACK_HOST, port: int = None, secure: bool = True, timeout: float = 30.0, pool_size: int = 10, pooled: bool = True, hedge: HedgePolicy = None) -> None:
+        self.host = host
+        self.port = port
+        self.secure = secure
+        self.timeout = timeout
+        self.pooled = pooled
+        self.hedge = hedge
+        self._idle = queue.LifoQueue(pool_size)
+        self._siblings = {}
+        self._siblings_lock = threading.Lock()
+
+    def __repr__(self):
+        scheme = 'https' if self.secure else 'http'
+        port = f':{self.port}' if self.port else ''
+        return f'Transport({scheme}://{self.host}{port}, pooled={self.pooled})'
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> 'Transport':
+        """Build a transport from a base url e.g. http://127.0.0.1:8000"""
+
+        parts = urlsplit(url)
+        return cls(parts.hostname, parts.port, parts.scheme == 'https', **kwargs)
+
+    def connect(self) -> http.client.HTTPConnection:
+        connection_class = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self):
+        """Return an idle pooled connection, or a new one, and whether it was reused"""
+
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self.connect(), False
+            if not _dropped(connection):
+                return connection, True
+            connection.close()
+
+    def release(self, connection: http.client.HTTPConnection):
+        if not self.pooled:
+            connection.close()
+            return
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def send(self, method: str, path: str, headers: dict = None, body: bytes = None):
+        """Send a request and read the whole response.
+
+        Returns:
+            tuple: The response status code and body
+        """
+
+        if method == 'GET' and self.hedge is not None and self.hedge.applies(path):
+            return self._send_hedged(path, headers)
+        return self._perform(lambda connection: self._exchange(
+            connection, method, path, headers, body), replay=method in IDEMPOTENT_METHODS)
+
+    def _send_hedged(self, path, headers):
+        policy = self.hedge
+        start = time.perf_counter()
+        delay = policy.delay()
+        exchange = lambda connection: self._exchange(connection, 'GET', path, headers, None)  # noqa: E731
+        if delay is None:
+            # still learning how long requests take
+            response = self._perform(exchange)
+            policy.observe(time.perf_counter() - start)
+            return response
+
+        race = _Race()
+
+        def attempt(index):
+            try:
+                race.finish(index, self._perform(exchange, lambda connection: race.track(index, connection)))
+            except _Lost:
+                pass
+            except BaseException as error:
+                race.finish(index, error=error)
+
+        def hedge():
+            if race.done.wait(max(0.0, start + delay - time.perf_counter())):
+                return
+            # the budget is only spent on requests that are actually slow
+            if not policy.allow() or not race.start():
+                return
+            policy.count('hedges', path)
+            attempt(1)
+
+        policy.executor.submit(hedge)
+        attempt(0)
+        race.done.wait()
+
+        if race.error is not None:
+            raise race.error
+        policy.observe(time.perf_counter() - start)
+        if race.winner == 1:
+            policy.count('hedge_wins', path)
+        return race.result
+
+    def upload(self, method: str, path: str, file: Union[str, BinaryIO], headers: dict = None, progress: Callable = None, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        """Send a file as the request body, streaming it from disk chunk by chunk so it is never held in memory.
+        Files of MMAP_THRESHOLD bytes or more are read through a memory map.
+
+        Args:
+            method (str): e.g. PUT
+            path (str): Path and query string on this transport's host
+            file (Union[str, BinaryIO]): Path of the file or a binary file object opened on a real file, sent from its current position
+            headers (dict, optional): Request headers, Content-Length is added. Defaults to None.
+            progress (Callable, optional): Called with (bytes sent, total bytes) after every chunk. Defaults to None.
+            chunk_size (int, optional): Bytes sent at a time. Defaults to 1 MiB.
+
+        Returns:
+            tuple: The response status code and body
+        """
+
+        if isinstance(file, str):
+            with open(file, 'rb') as handle:
+                return self.upload(method, path, handle, headers, progress, chunk_size)
+
+        # a file object is sent from its current position to its end
+        start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+        headers = {**(headers or {}), 'Content-Length': str(size - start)}
+
+        def exchange(connection):
+            file.seek(start)
+            connection.putrequest(method, path, skip_accept_encoding=True)
+            for key, value in headers.items():
+                connection.putheader(key, value)
+            connection.endheaders()
+            sent = 0
+            for chunk in _file_chunks(file, size - start, chunk_size):
+                connection.send(chunk)
+                sent += len(chunk)
+                if progress:
+                    progress(sent, size - start)
+            response = connection.getresponse()
+            return response.status, response.read(), response.will_close
+
+        return self._perform(exchange, replay=method in IDEMPOTENT_METHODS)
+
+    def download(self, path: str, file: BinaryIO, headers: dict = None, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+        """GET path and write the response body to file chunk by chunk so it is never held in memory.
+        Nothing is written unless the status is 2xx.
+
+        Args:
+            path (str): Path and query string on this transport's host
+            file (BinaryIO): Binary file object the body is written to
+            headers (dict, optional): Request headers. Defaults to None.
+            chunk_size (int, optional): Bytes read at a time. Defaults to 64 KiB.
+
+        Returns:
+            tuple: The response status code and the number of bytes written
+        """
+
+        def exchange(connection):
+            connection.request('GET', path, headers=headers or {})
+            response = connection.getresponse()
+            if not 200 <= response.status < 300:
+                response.read()
+                return response.status, 0, response.will_close
+            written = 0
+            try:
+                while True:
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        return response.status, written, response.will_close
+                    file.write(chunk)
+                    written += len(chunk)
+            except _STALE_CONNECTION_ERRORS as error:
+                # the bytes written cannot be taken back, so the request is not sent again
+                raise ConnectionAbortedError(f'connection lost after {written} bytes') from error
+
+        return self._perform(exchange)
+
+    def _perform(self, exchange, track: Callable = None, replay: bool = True):
+        # track is called with every connection before the exchange is sent on it. Unless replay is
+        # True the request is never sent twice, since the server may have acted on it before the
+        # connection broke, e.g. a POST creating a charge or transfer.
+        connection, reused = self.acquire()
+        try:
+            try:
+                if track:
+                    track(connection)
+                response = exchange(connection)
+            except _STALE_CONNECTION_ERRORS:
+                if not reused or not replay:
+                    raise
+                # the server closed an idle keep-alive connection, retry once on a fresh one
+                connection.close()
+                connection = self.connect()
+                if track:
+                    track(connection)
+                response = exchange(connection)
+        except BaseException:
+            connection.close()
+            raise
+
+        status, data, will_close = response
+        if will_close:
+            connection.close()
+        else:
+            self.release(connection)
+        return status, data
+
+    @staticmethod
+    def _exchange(connection, method, path, headers, body):
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.read(), response.will_close
+
+    def for_url(self, url: str) -> 'Transport':
+        """Transport for the host of url with the same timeout and pool settings, created once per host
+        and shared, e.g. for the signed upload urls returned by Disputes.get_upload_url
+        """
+
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        with self._siblings_lock:
+            transport = self._siblings.get(key)
+            if transport is None:
+                transport = self._siblings[key] = Transport(
+                    parts.hostname, parts.port, parts.scheme == 'https', self.timeout, self._idle.maxsize, self.pooled)
+        return transport
+
+    def close(self):
+        """Close every idle connection in the pool"""
+
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class _Lost(Exception):
+    pass
+
+
+class _Race:
+
+    # the attempts of one hedged request, the first to answer wins and the sockets of the others are shut
+    # down so they stop waiting. An error only ends the race once every attempt started has failed.
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.winner = None
+        self.result = None
+        self.error = None
+        self.started = 1
+        self.failed = 0
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        with self._lock:
+            if self.done.is_set():
+                return False
+            self.started += 1
+            return True
+
+    def track(self, index, connection):
+        with self._lock:
+            if self.done.is_set():
+                raise _Lost()
+            self._connections[index] = connection
+
+    def finish(self, index, result=None, error=None):
+        with self._lock:
+            if self.done.is_set():
+                return
+            if error is not None:
+                self.failed += 1
+                if self.failed < self.started:
+                    return
+                self.error = error
+            else:
+                self.winner = index
+                self.result = result
+            losers = [connection for other, connection in self._connections.items() if other != index]
+            self.done.set()
+
+        for connection in losers:
+            if connection.sock is not None:
+                try:
+                    connection.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+def _dropped(connection: http.client.HTTPConnection) -> bool:
+    # an idle keep-alive socket only turns readable once the server has closed it
+    if connection.sock is None:
+        return False
+    try:
+        if hasattr(select, 'poll'):
+            poller = select.poll()
+            poller.register(connection.sock, select.POLLIN)
+            return bool(poller.poll(0))
+        return bool(select.select([connection.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+def _file_chunks(file: BinaryIO, size: int, chunk_size: int) -> Iterator:
+    # yields views of one reused buffer, or of a memory map for large files, so memory stays at one chunk
+    if size >= MMAP_THRESHOLD:
+        offset = file.tell()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for position in range(offset, offset + size, chunk_size):
+                    chunk = view[position:min(position + chunk_size, offset + size)]
+                    try:
+                        yield chunk
+                    finally:
+                        # the map can only be closed once no slice of it is exported
+                        chunk.release()
+            finally:
+                view.release()
+        return
+
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        read = file.readinto(buffer)
+        if not read:
+            return
+        yield view[:read]
@@ -1,10 +1,24 @@
 import datetime
 import re
-import uuid
-from typing import Sequence, Union
+from typing import Callable, Iterable, Sequence, Union
+from urllib.parse import quote
 
-from . import settings
-from .errors import MissingArgumentsError
+from . import reference, settings
+from .errors import BatchValidationError, Error, MissingArgumentsError
+
+EMAIL_PATTERN = re.compile(
+    r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+
+DOMAIN_PATTERN = re.compile(
+    r'^(([a-zA-Z]{1})|([a-zA-Z]{1}[a-zA-Z]{1})|'
+    r'([a-zA-Z]{1}[0-9]{1})|([0-9]{1}[a-zA-Z]{1})|'
+    r'([a-zA-Z0-9][-_.a-zA-Z0-9]{0,61}[a-zA-Z0-9]))\.'
+    r'([a-zA-Z]{2,13}|[a-zA-Z0-9-]{2,30}.[a-zA-Z]{2,3})$'
+)
+
+PAYMENT_CHANNELS = frozenset(settings.PAYMENT_CHANNELS)
+
+VALIDATION_ERRORS = (Error, ValueError, TypeError, AttributeError, KeyError)
 
 def check_bvn(bvn: str) -> str:
     if not bvn.isdigit() or len(bvn) != 11:
@@ -13,27 +27,34 @@ def check_bvn(bvn: str) -> str:
 
 
 def create_ref() -> str:
-    return str(uuid.uuid4()).replace('-', '')
+    return reference.default()
+
+
+def create_refs(count: int) -> list:
+    if hasattr(reference.default, 'batch'):
+        return reference.default.batch(count)
+    return [reference.default() for _ in range(count)]
 
 
 def check_channels(channel) -> list:
-    channels = settings.PAYMENT_CHANNELS
-    message = f"Invalid payment channel, choices are: {', '.join(channels)}"
-    if isinstance(channel, list):
-        if not set(channel).issubset(channels):
-            raise ValueError(message)
-    else:
-        if not channel in channels:
-            raise ValueError(message)
-    return [channel]
+    channels = [channel] if isinstance(channel, str) else list(channel)
+    if not PAYMENT_CHANNELS.issuperset(channels):
+        raise ValueError(
+            f"Invalid payment channel, choices are: {', '.join(settings.PAYMENT_CHANNELS)}")
+    return channels
 
 
 def handle_date(date: Union[datetime.datetime, datetime.date, str]) -> str:
-    return date.strftime('%Y-%m-%d') if isinstance(date, (datetime.date, datetime.datetime)) else datetime.datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m-%d')
+    if isinstance(date, datetime.date):
+        return date.isoformat()[:10]
+    try:
+        return datetime.date.fromisoformat(date).isoformat()
+    except ValueError:
+        return datetime.datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m-%d')
 
 
 def check_email(email: str) -> bool:
-    if not re.fullmatch(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-z|a-z]{2,}\b', email):
+    if not EMAIL_PATTERN.fullmatch(email):
         raise ValueError('provide a valid email!')
     return email
 
@@ -57,7 +78,7 @@ def check_email_or_customer(email_or_customer_code: str) -> str:
         customer = check_email(email_or_customer_code)
     except ValueError:
         try:
-            customer = check_code(email_or_customer_code, 'CUS')
+            customer = check_code(settings.CUSTOMER, email_or_customer_code)
         except ValueError as error:
             raise ValueError(
                 'Invalid value for email_or_customer_code, provide an email or customer_code') from error
@@ -71,13 +92,7 @@ def check_bank_code(bank_code: str) -> str:
 
 
 def check_domain(domain: str) -> str:
-    pattern = re.compile(
-        r'^(([a-zA-Z]{1})|([a-zA-Z]{1}[a-zA-Z]{1})|'
-        r'([a-zA-Z]{1}[0-9]{1})|([0-9]{1}[a-zA-Z]{1})|'
-        r'([a-zA-Z0-9][-_.a-zA-Z0-9]{0,61}[a-zA-Z0-9]))\.'
-        r'([a-zA-Z]{2,13}|[a-zA-Z0-9-]{2,30}.[a-zA-Z]{2,3})$'
-    )
-    if not re.match(pattern, domain):
+    if not DOMAIN_PATTERN.match(domain):
         raise ValueError('Invalid domain')
     return domain
 
@@ -99,22 +114,34 @@ def check_query_params(per_page: int = None, page: int = None, from_date: Union[
     return params
 
 
+def encode_query_value(value) -> str:
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return handle_date(value)
+    value = str(value)
+    if value.isascii() and value.isalnum():
+        return value
+    return quote(value, safe='')
+
+
 def handle_query_params(path: str, params: dict) -> str:
-    path += '?'
-    for key, value in params.items():
-        path += f"{key}={value}&"
-    return path.rstrip('&')
+    query = '&'.join(f'{quote(key, safe="")}={encode_query_value(value)}'
+                     for key, value in params.items() if value is not None)
+    return f'{path}?{query}' if query else path
 
 
 def check_code(data: tuple[str, str], code: Union[Sequence[str], str]) -> Union[str, list]:
-    if isinstance(code, (str)):
-        code = tuple(code)
+    if isinstance(code, str):
+        if code.partition('_')[0] != data.prefix:
+            raise ValueError("Invalid {0}: {0} must start with {1} not {2}".format(
+                data.name, data.prefix, code.partition('_')[0]))
+        return code
 
     for x in code:
-        pre = x.split('_')[0]
-        if pre != data.prefix:
-            raise ValueError("Invalid {0}: {0} must start with {1} not {2}".format(
-                data.name, data.prefix, pre))
+        check_code(data, x)
     if len(code) == 1:
         return code[0]
     return code
@@ -123,7 +150,7 @@ def check_code(data: tuple[str, str], code: Union[Sequence[str], str]) -> Union[
 def check_membership(group: Sequence, member: str, name: str) -> str:
     if member not in group:
         raise ValueError(
-            f"Invalid value for {name}, your choices are: {', '.join(group)}")
+            f"Invalid value for {name}, your choices are: {', '.join(map(str, group))}")
     return member
 
 
@@ -137,3 +164,60 @@ def id_or_code(value: Union[str, int], data: tuple = None):
     if isinstance(value, int):
         return value
     return check_code(data, value)
+
+
+def validate_many(check: Callable, values: Iterable) -> tuple:
+    """Run check over every value in one pass instead of stopping at the first invalid one.
+
+    Returns:
+        tuple: The list of checked values and a list of (index, error message) for the ones that failed
+    """
+
+    valid = []
+    errors = []
+    append = valid.append
+    for index, value in enumerate(values):
+        try:
+            append(check(value))
+        except VALIDATION_ERRORS as error:
+            errors.append((index, str(error)))
+    return valid, errors
+
+
+def validate_rows(check: Callable, rows: Iterable, unique: str = None) -> list:
+    """Check every row of a bulk payload in one pass.
+
+    Args:
+        check (Callable): Function that returns the cleaned row or raises for an invalid one
+        rows (Iterable): The rows to check
+        unique (str, optional): Key that must not repeat across the cleaned rows e.g. reference. Defaults to None.
+
+    Raises:
+        BatchValidationError: raised with the index and error of every invalid row
+
+    Returns:
+        list: The cleaned rows, ready to send
+    """
+
+    valid = []
+    errors = []
+    first_seen = {}
+    for index, row in enumerate(rows):
+        try:
+            cleaned = check(row)
+        except VALIDATION_ERRORS as error:
+            errors.append((index, str(error)))
+            continue
+
+        value = cleaned.get(unique) if unique else None
+        if value is not None:
+            if value in first_seen:
+                errors.append(
+                    (index, f'duplicate {unique} {value}, first used on row {first_seen[value]}'))
+                continue
+            first_seen[value] = index
+        valid.append(cleaned)
+
+    if errors:
+        raise BatchValidationError(errors)
+    return valid
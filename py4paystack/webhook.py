@@ -0,0 +1,217 @@
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import threading
+from typing import Callable, Union
+
+from .utilities import decorators
+from .utilities.dedup import Deduplicator
+from .utilities.errors import InvalidSignatureError
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'x-paystack-signature'
+ALL_EVENTS = '*'
+
+_STOP = object()
+
+
+def verify_signature(secret_key: Union[str, bytes], payload: bytes, signature: str) -> bool:
+    """Check a webhook payload against the x-paystack-signature header in constant time.
+
+    Args:
+        secret_key (Union[str, bytes]): Your Paystack secret key
+        payload (bytes): The raw request body exactly as it was received
+        signature (str): Value of the x-paystack-signature header
+
+    Returns:
+        bool: True if the payload was signed with secret_key
+    """
+
+    if not signature:
+        return False
+    if isinstance(secret_key, str):
+        secret_key = secret_key.encode()
+    digest = hmac.digest(secret_key, payload, 'sha512').hex()
+    return hmac.compare_digest(digest, signature)
+
+
+class Event:
+
+    """
+    A decoded webhook event e.g. charge.success, transfer.success or subscription.create
+    """
+
+    __slots__ = ('event', 'data')
+
+    def __init__(self, event: str, data: dict) -> None:
+        self.event = event
+        self.data = data
+
+    def __repr__(self):
+        return f'Event({self.event!r}, reference={self.reference!r})'
+
+    @classmethod
+    def from_payload(cls, payload: Union[bytes, str, dict]) -> 'Event':
+        if not isinstance(payload, dict):
+            payload = json.loads(payload)
+        return cls(payload.get('event', ''), payload.get('data') or {})
+
+    @property
+    def id(self):
+        return self.data.get('id')
+
+    @property
+    def reference(self):
+        return self.data.get('reference') or self.data.get('transfer_code') or self.data.get('subscription_code')
+
+    @property
+    def key(self) -> Union[str, None]:
+        """Name and reference or id of the event, None if it carries neither"""
+
+        identifier = self.reference or self.id
+        return f'{self.event}:{identifier}' if identifier is not None else None
+
+
+class WebhookDispatcher:
+
+    """
+    Verify, decode and route Paystack webhook events to the handlers registered for them.
+    """
+
+    @decorators.func_type_checker
+    def __init__(self, secret_key: str, workers: int = 0, queue_size: int = 1000, dedup: Deduplicator = None) -> None:
+        """
+        Args:
+            secret_key (str): Your Paystack secret key, used to check the x-paystack-signature header
+            workers (int, optional): Number of worker threads that run the handlers.
+                With the default of 0 handlers run in the thread that calls handle.
+            queue_size (int, optional): Maximum number of events waiting for a worker. Defaults to 1000.
+            dedup (Deduplicator, optional): Store used to drop events Paystack has already delivered,
+                e.g. MemoryDeduplicator or SQLiteDeduplicator. Defaults to None.
+        """
+
+        self._key = secret_key.encode()
+        self.dedup = dedup
+        self.handlers = {}
+        self._queue = queue.Queue(queue_size) if workers else None
+        self._threads = []
+
+        for _ in range(workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def __repr__(self):
+        return f'WebhookDispatcher(paystack_secret_key, workers={len(self._threads)})'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def register(self, event: str, handler: Callable):
+        """Register handler to be called with every event named event. Use '*' to receive all events.
+
+        Args:
+            event (str): Event name e.g. charge.success
+            handler (Callable): Function that takes an Event
+        """
+
+        self.handlers[event] = self.handlers.get(event, ()) + (handler,)
+
+    def on(self, *events: str):
+        """Decorator form of register.
+
+            @dispatcher.on('charge.success', 'charge.failed')
+            def handle_charge(event): ...
+        """
+
+        def decorator(handler):
+            for event in events:
+                self.register(event, handler)
+            return handler
+        return decorator
+
+    def verify(self, payload: bytes, signature: str) -> bool:
+        return verify_signature(self._key, payload, signature)
+
+    def handle(self, payload: bytes, signature: str, block: bool = True, timeout: float = None) -> Event:
+        """Verify a webhook request and dispatch its event.
+
+        Args:
+            payload (bytes): The raw request body
+            signature (str): Value of the x-paystack-signature header
+            block (bool, optional): Wait for room in the queue when every worker is busy. Defaults to True.
+            timeout (float, optional): Seconds to wait for room in the queue. Defaults to None.
+
+        Raises:
+            InvalidSignatureError: raised when the signature does not match the payload
+            queue.Full: raised when workers are used and the queue stays full
+
+        Returns:
+            Event: The decoded event, or None if it is a duplicate delivery
+        """
+
+        if not self.verify(payload, signature):
+            raise InvalidSignatureError('webhook signature does not match payload')
+
+        event = Event.from_payload(payload)
+        key = None
+        if self.dedup is not None:
+            # a redelivery repeats the body byte for byte, events without a reference are keyed on it
+            key = event.key or f'{event.event}:{hashlib.sha256(payload).hexdigest()}'
+            if self.dedup.seen(key):
+                return None
+
+        try:
+            if self._queue is None:
+                self.dispatch(event)
+            else:
+                self._queue.put((event, key), block, timeout)
+        except BaseException:
+            self._forget(key)
+            raise
+        return event
+
+    def dispatch(self, event: Event):
+        for handler in self.handlers.get(event.event, ()) + self.handlers.get(ALL_EVENTS, ()):
+            handler(event)
+
+    def join(self):
+        """Block until every queued event has been handled"""
+
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self):
+        """Handle the events still queued then stop the workers"""
+
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _forget(self, key):
+        # a failed event is forgotten so Paystack's next delivery of it is handled
+        if key is not None:
+            self.dedup.forget(key)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                event, key = item
+                try:
+                    self.dispatch(event)
+                except Exception:
+                    self._forget(key)
+                    logger.exception('webhook handler failed for %r', event)
+            finally:
+                self._queue.task_done()
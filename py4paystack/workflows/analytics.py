@@ -0,0 +1,196 @@
+from typing import Iterable
+
+from ..routes.transaction import Transaction
+from ..utilities.pagination import pages
+from .export import parse_timestamp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# dimensions stored as integer codes, with a table turning the codes back into values
+CATEGORIES = ('channel', 'currency', 'status')
+
+DIMENSIONS = CATEGORIES + ('hour',)
+
+MEASURES = ('amount', 'fees')
+
+_HOUR_MS = 3600000
+
+
+class TransactionAnalytics:
+
+    """
+    Holds transactions as NumPy columns and computes breakdowns without looping in Python, e.g.
+
+        analytics = TransactionAnalytics()
+        analytics.pull(trans, from_date='2022-06-01')
+        analytics.group_by('channel', 'currency')
+        # {('card', 'NGN'): {'count': 812, 'sum': 40600000, 'mean': 50000.0, 'p50': 45000.0, ...}, ...}
+
+    Pages are added as they arrive and a transaction already held replaces its row,
+    so the same object can be refreshed with the latest pages, e.g. as pending charges settle.
+    Amounts are in the minor unit (kobo, pesewas, cents), hours are UTC.
+    """
+
+    def __init__(self) -> None:
+        if numpy is None:
+            raise ImportError('numpy is required for TransactionAnalytics, install it with pip install numpy')
+
+        self._codes = {name: {} for name in CATEGORIES}
+        self._labels = {name: [] for name in CATEGORIES}
+        # transaction id -> row
+        self._rows = {}
+        self._chunks = []
+        self._columns = None
+
+    def __repr__(self):
+        return f'TransactionAnalytics(transactions={len(self)})'
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _code(self, name, value):
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self._labels[name].append(value)
+        return code
+
+    def _row(self, record):
+        stamp = record.get('paid_at') or record.get('created_at')
+        row = {'id': record['id'], 'time': parse_timestamp(stamp) if stamp else -1}
+        for name in CATEGORIES:
+            row[name] = self._code(name, record.get(name))
+        for name in MEASURES:
+            row[name] = record.get(name) or 0
+        return row
+
+    def add(self, records: Iterable[dict]) -> int:
+        """Add transaction records, e.g. the data of a list_transactions response, and return how many were new.
+        A record of a transaction already held replaces its row.
+        """
+
+        columns = {name: [] for name in ('id', 'time') + CATEGORIES + MEASURES}
+        updates = {}
+        for record in records:
+            row = self._rows.get(record['id'])
+            if row is not None:
+                updates[row] = record
+                continue
+            self._rows[record['id']] = len(self._rows)
+            for name, value in self._row(record).items():
+                columns[name].append(value)
+
+        added = len(columns['id'])
+        if added:
+            chunk = {name: numpy.array(values, dtype=numpy.int64) for name, values in columns.items()}
+            chunk['hour'] = numpy.where(chunk['time'] >= 0, chunk['time'] // _HOUR_MS % 24, -1)
+            self._chunks.append(chunk)
+            self._columns = None
+        if updates:
+            held = self.columns
+            for row, record in updates.items():
+                for name, value in self._row(record).items():
+                    held[name][row] = value
+                held['hour'][row] = held['time'][row] // _HOUR_MS % 24 if held['time'][row] >= 0 else -1
+        return added
+
+    def pull(self, transaction: Transaction, per_page: int = 100, **filters) -> int:
+        """Add every page of transaction.list_transactions(**filters) and return how many transactions were new"""
+
+        return sum(self.add(records) for records in pages(transaction.list_transactions, per_page, **filters))
+
+    @property
+    def columns(self) -> dict:
+        """Column name -> int64 array, categories hold codes, see labels"""
+
+        if self._columns is None:
+            if len(self._chunks) > 1:
+                # keep one chunk so later reads do not concatenate again
+                self._chunks = [{name: numpy.concatenate([chunk[name] for chunk in self._chunks])
+                                 for name in self._chunks[0]}]
+            self._columns = self._chunks[0] if self._chunks else {}
+        return self._columns
+
+    def labels(self, name: str) -> list:
+        """Values of a category column in code order"""
+
+        return list(self._labels[name])
+
+    def _mask(self, where):
+        columns = self.columns
+        mask = numpy.ones(len(columns['id']), dtype=bool)
+        for name, values in (where or {}).items():
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            if name in CATEGORIES:
+                codes = self._codes[name]
+                values = [codes[value] for value in values if value in codes]
+            mask &= numpy.isin(columns[name], list(values))
+        return mask
+
+    def _label(self, name, code):
+        return self._labels[name][code] if name in CATEGORIES else (int(code) if code >= 0 else None)
+
+    def group_by(self, *dimensions: str, measure: str = 'amount', percentiles: tuple = (50, 90, 99), where: dict = None) -> dict:
+        """Count, sum, mean and percentiles of measure for every combination of dimensions
+
+        Args:
+            dimensions (str): Any of channel, currency, status and hour. None gives a single group ().
+            measure (str, optional): amount or fees. Defaults to 'amount'.
+            percentiles (tuple, optional): Percentiles to compute. Defaults to (50, 90, 99).
+            where (dict, optional): Only include rows matching every item e.g. {'status': 'success'}. Defaults to None.
+
+        Returns:
+            dict: tuple of dimension values -> dict of statistics
+        """
+
+        unknown = set(dimensions) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f'unknown dimensions {sorted(unknown)}, use any of {DIMENSIONS}')
+        if not self._chunks:
+            return {}
+
+        mask = self._mask(where)
+        values = self.columns[measure][mask]
+        if not len(values):
+            return {}
+        keys = [self.columns[name][mask] for name in dimensions]
+
+        # one int64 group id per row, +1 keeps the -1 of a missing hour apart from 0
+        group = numpy.zeros(len(values), dtype=numpy.int64)
+        for key in keys:
+            group = group * (int(key.max()) + 2) + key + 1
+
+        order = numpy.lexsort((values, group))
+        group, values = group[order], values[order]
+        starts = numpy.flatnonzero(numpy.r_[True, group[1:] != group[:-1]])
+        counts = numpy.diff(numpy.r_[starts, len(group)])
+        sums = numpy.add.reduceat(values, starts)
+
+        # values are sorted inside each group so percentiles are a linear interpolation by position
+        stats = {'count': counts, 'sum': sums, 'mean': sums / counts}
+        for q in percentiles:
+            position = starts + (counts - 1) * (q / 100)
+            low = numpy.floor(position).astype(numpy.int64)
+            high = numpy.ceil(position).astype(numpy.int64)
+            stats[f'p{q:g}'] = values[low] + (values[high] - values[low]) * (position - low)
+
+        first = [key[order][starts] for key in keys]
+        result = {}
+        for index in range(len(starts)):
+            label = tuple(self._label(name, codes[index]) for name, codes in zip(dimensions, first))
+            result[label] = {name: column[index].item() for name, column in stats.items()}
+        return result
+
+    def totals(self, where: dict = None) -> dict:
+        """Transaction count and volume per currency, like Transaction.totals but for the held transactions"""
+
+        groups = self.group_by('currency', percentiles=(), where=where)
+        return {
+            'total_transactions': sum(stats['count'] for stats in groups.values()),
+            'total_volume_by_currency': {currency: stats['sum'] for (currency,), stats in groups.items()},
+        }
@@ -0,0 +1,229 @@
+import calendar
+import datetime
+import threading
+from collections import Counter
+from typing import Union
+
+from ..routes.plan import Plan
+from ..routes.subscription import Subscription
+from ..routes.transaction import Transaction
+from ..utilities.concurrency import retry, run_concurrently
+from ..utilities.errors import APIError
+from ..utilities.journal import Journal
+from ..utilities.pagination import paginate
+from ..utilities.ratelimit import RateLimiter
+
+# plan interval -> (months, days) added to get the next payment date
+INTERVALS = {
+    'daily': (0, 1),
+    'weekly': (0, 7),
+    'monthly': (1, 0),
+    'biannually': (6, 0),
+    'annually': (12, 0),
+}
+
+BILLABLE_STATUSES = ('active', 'attention')
+
+# journal states, a renewal is written as started before the charge is sent
+STARTED = 'started'
+CHARGED = 'charged'
+FAILED = 'failed'
+
+FAILED_STATUSES = ('failed', 'abandoned', 'reversed')
+
+
+def not_found(response: dict) -> bool:
+    # Paystack answers the verify of an unknown reference with status false and 'Transaction reference not found'
+    return not response.get('status') and 'not found' in (response.get('message') or '').lower()
+
+
+def parse_date(value: Union[str, datetime.datetime]) -> datetime.datetime:
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def add_interval(date: datetime.datetime, interval: str) -> datetime.datetime:
+    """date moved forward by one plan interval, the day is clamped to the end of shorter months"""
+
+    months, days = INTERVALS[interval]
+    if months:
+        month = date.month - 1 + months
+        year, month = date.year + month // 12, month % 12 + 1
+        date = date.replace(year=year, month=month, day=min(
+            date.day, calendar.monthrange(year, month)[1]))
+    return date + datetime.timedelta(days=days)
+
+
+def due_date(subscription: dict, plan: dict) -> Union[datetime.datetime, None]:
+    """When the subscription should next be charged, its next_payment_date or one interval after it was created"""
+
+    if subscription.get('next_payment_date'):
+        return parse_date(subscription['next_payment_date'])
+    created = subscription.get('createdAt') or subscription.get('created_at')
+    if created and plan.get('interval') in INTERVALS:
+        return add_interval(parse_date(created), plan['interval'])
+    return None
+
+
+class BillingSweeper:
+
+    """
+    Charges every subscription that is due, e.g.
+
+        sweeper = BillingSweeper(Transaction(key), Subscription(key), Plan(key), 'billing-2022-06.jsonl',
+                                 rate_limiter=RateLimiter(20))
+        sweeper.sweep()   # Counter({'charged': 950, 'failed': 50, 'done': 12})
+
+    Subscriptions are streamed page by page, plans are fetched once per plan code and renewals
+    are charged by a pool of workers. Each renewal uses a reference made from the subscription code
+    and due date and is written to the journal before and after its charge. Running the sweeper
+    again with the same journal, after a crash or for the next batch, skips finished renewals and
+    verifies the ones that were started. A started renewal is only charged again when Paystack
+    has no transaction with its reference, so nobody is charged twice.
+    """
+
+    def __init__(self, transaction: Transaction, subscription: Subscription, plan: Plan, journal: Union[Journal, str], workers: int = 8, rate_limiter: RateLimiter = None, queue: bool = True) -> None:
+        """
+        Args:
+            transaction (Transaction): Used to charge the authorizations
+            subscription (Subscription): Used to list the subscriptions
+            plan (Plan): Used to fetch plans missing from the subscriptions
+            journal (Union[Journal, str]): Journal, or the path of its file, recording every renewal
+            workers (int, optional): Renewals charged at the same time. Defaults to 8.
+            rate_limiter (RateLimiter, optional): Limits how fast charges are sent. Defaults to None.
+            queue (bool, optional): Send the charges with queue so Paystack spreads them out. Defaults to True.
+        """
+
+        self.transaction = transaction
+        self.subscription = subscription
+        self.plan = plan
+        self.journal = Journal(journal) if isinstance(journal, str) else journal
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.queue = queue
+        self._plans = {}
+        self._plans_lock = threading.Lock()
+
+    def __repr__(self):
+        return f'BillingSweeper(journal={self.journal.path!r})'
+
+    def plan_for(self, subscription: dict) -> dict:
+        """The plan of a subscription, fetched at most once per plan code"""
+
+        plan = subscription.get('plan')
+        if isinstance(plan, dict) and plan.get('interval'):
+            return plan
+
+        code = (plan.get('plan_code') or plan.get('id')) if isinstance(plan, dict) else plan
+        with self._plans_lock:
+            cached = self._plans.get(code)
+            if cached is not None:
+                self.plan.instrumentation.incr('cache_hits', 'GET /plan/:id')
+                return cached
+            # the workers wait for the first fetch of a plan instead of each sending their own
+            response = self.plan.fetch(code)
+            if not response.get('status'):
+                raise APIError(response)
+            cached = self._plans[code] = response['data']
+        return cached
+
+    @staticmethod
+    def reference(subscription: dict, due: datetime.datetime) -> str:
+        # only -, . and alphanumerics are allowed in references
+        code = subscription['subscription_code'].replace('_', '-')
+        return f'renewal.{code}.{due:%Y%m%d}'
+
+    def renewals(self, now: datetime.datetime = None, **filters):
+        """Yield (subscription, plan, due date) for every billable subscription due at now, streaming the pages"""
+
+        now = parse_date(now or datetime.datetime.now(datetime.timezone.utc))
+        for subscription in paginate(self.subscription.list_subscriptions, **filters):
+            if subscription.get('status') not in BILLABLE_STATUSES:
+                continue
+            plan = self.plan_for(subscription)
+            due = due_date(subscription, plan)
+            if due is not None and due <= now:
+                yield subscription, plan, due
+
+    def sweep(self, now: datetime.datetime = None, **filters) -> Counter:
+        """Charge every due subscription and return how many renewals ended in each outcome
+
+        Args:
+            now (datetime.datetime, optional): Charge subscriptions due at this time. Defaults to now.
+            filters: Passed to Subscription.list_subscriptions e.g. plan=123
+
+        Returns:
+            Counter: charged, failed, done (finished in an earlier run), pending and error (both verified by the next sweep)
+        """
+
+        summary = Counter()
+
+        def todo():
+            for subscription, plan, due in self.renewals(now, **filters):
+                reference = self.reference(subscription, due)
+                if self.journal.state(reference) in (CHARGED, FAILED):
+                    summary['done'] += 1
+                else:
+                    yield subscription, plan, reference
+
+        for item, outcome, error in run_concurrently(self._renew, todo(), self.workers, self.rate_limiter):
+            summary['error' if error else outcome] += 1
+        return summary
+
+    def _renew(self, item):
+        subscription, plan, reference = item
+
+        if self.journal.state(reference) == STARTED:
+            # a previous run sent this charge and stopped before recording the result
+            outcome = self._verify(reference)
+            if outcome is not None:
+                return outcome
+
+        self.journal.write(reference, STARTED,
+                           subscription_code=subscription['subscription_code'])
+        # never retried, a charge that fails on the network may have reached Paystack and
+        # stays started for the next sweep to verify
+        response = self.transaction.charge_authorization(
+            subscription['customer']['email'],
+            subscription.get('amount') or plan['amount'],
+            subscription['authorization']['authorization_code'],
+            currency=plan.get('currency'),
+            reference=reference,
+            queue=self.queue,
+        )
+        if not response.get('status'):
+            # a refused charge may still have gone through, e.g. a duplicate reference
+            outcome = self._verify(reference)
+            if outcome is not None:
+                return outcome
+            self.journal.write(reference, FAILED, message=response.get('message'))
+            return FAILED
+        return self._finish(reference, response.get('data') or {})
+
+    def _verify(self, reference):
+        # the outcome of the charge Paystack has under reference, None if it has none
+        response = retry(self.transaction.verify, reference,
+                         instrumentation=self.transaction.instrumentation, route='GET /transaction/verify/:id')
+        if response.get('status'):
+            # a queued or ongoing charge stays started for the next sweep
+            return self._finish(reference, response.get('data') or {})
+        if not not_found(response):
+            raise APIError(response)
+        return None
+
+    def _finish(self, reference, data):
+        status = data.get('status')
+        if status == 'success':
+            state = CHARGED
+        elif status in FAILED_STATUSES:
+            state = FAILED
+        else:
+            # e.g. a queued charge, left started so the next sweep verifies it
+            self.journal.write(reference, STARTED, status=status)
+            return 'pending'
+        self.journal.write(reference, state, status=status,
+                           message=data.get('gateway_response'))
+        return state
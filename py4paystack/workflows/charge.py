@@ -0,0 +1,322 @@
+import asyncio
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Union
+
+from ..routes.charge import Charge
+from ..utilities.errors import APIError, UnwantedArgumentsError
+
+# charge status -> (Charge method that continues it, input it needs from the customer)
+TRANSITIONS = {
+    'send_pin': ('submit_pin', 'pin'),
+    'send_otp': ('submit_otp', 'otp'),
+    'send_phone': ('submit_phone', 'phone'),
+    'send_birthday': ('submit_birthday', 'birthday'),
+    'send_address': ('submit_address', 'address'),
+}
+
+# open_url and pay_offline wait for the customer to finish on a bank page or by dialing a USSD code
+PENDING_STATUSES = ('pending', 'open_url', 'pay_offline')
+
+FINAL_STATUSES = ('success', 'failed', 'abandoned', 'reversed')
+
+ADDRESS_FIELDS = ('address', 'city', 'state', 'zipcode')
+
+
+class ChargeSession:
+
+    """
+    A charge in progress. The status returned by the Charge API decides which submit_* call continues it
+    or whether check_pending_charge has to be polled, e.g.
+
+        session = ChargeSession.start(charge, email='customer@email.com', amount=5000, authorization_code='AUTH_xxx')
+        while session.expects:
+            session.submit(charge, ask_customer_for(session.expects))
+    """
+
+    __slots__ = ('reference', 'status', 'message', 'display_text', 'url',
+                 'delay', 'next_poll_at', 'polls')
+
+    initial_delay = 10.0
+    max_delay = 300.0
+    backoff = 1.5
+
+    def __init__(self, reference: str, status: str = 'pending', message: str = None, display_text: str = None, url: str = None, delay: float = None, next_poll_at: float = 0.0, polls: int = 0) -> None:
+        self.reference = reference
+        self.status = status
+        self.message = message
+        self.display_text = display_text
+        self.url = url
+        self.delay = delay or self.initial_delay
+        self.next_poll_at = next_poll_at
+        self.polls = polls
+
+    def __repr__(self):
+        return f'ChargeSession({self.reference!r}, status={self.status!r})'
+
+    def __lt__(self, other):
+        return self.next_poll_at < other.next_poll_at
+
+    @classmethod
+    def start(cls, charge: Charge, **kwargs) -> 'ChargeSession':
+        """Create a charge with Charge.create and return the session tracking it.
+        A reference is generated if none is provided so the session can always be resumed.
+
+        Raises:
+            APIError: raised when the charge is refused without a charge status
+        """
+
+        if not kwargs.get('reference'):
+            kwargs['generate_reference'] = True
+        session = cls(None)
+        session.update(charge.create(**kwargs))
+        return session
+
+    @property
+    def expects(self) -> Union[str, None]:
+        """Name of the input the customer has to provide next, None if no input is needed"""
+
+        transition = TRANSITIONS.get(self.status)
+        return transition[1] if transition else None
+
+    @property
+    def pending(self) -> bool:
+        return self.status in PENDING_STATUSES
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    def update(self, response: dict):
+        """Move the session to the state reported in a Charge API response
+
+        Raises:
+            APIError: raised when the response carries no charge status, e.g. a 429 or server error,
+                the session keeps its status and a pending one is scheduled for its next check
+        """
+
+        data = response.get('data') or {}
+        self.message = response.get('message')
+        if data.get('status'):
+            self.reference = data.get('reference') or self.reference
+            self.display_text = data.get('display_text')
+            self.url = data.get('url')
+            self.status = data['status']
+
+        if self.status in PENDING_STATUSES:
+            self.next_poll_at = time.time() + self.delay
+        if not data.get('status'):
+            raise APIError(response)
+        return self
+
+    def submit(self, charge: Charge, value: Union[str, dict]) -> 'ChargeSession':
+        """Send the input the charge is waiting for, e.g. the pin when status is send_pin.
+        For send_address value is a dict with address, city, state and zipcode.
+
+        Raises:
+            UnwantedArgumentsError: raised when the charge is not waiting for any input
+            APIError: raised when the input is refused without a charge status
+        """
+
+        if self.status not in TRANSITIONS:
+            raise UnwantedArgumentsError(
+                f'charge {self.reference} is {self.status}, it is not waiting for any input')
+
+        method, name = TRANSITIONS[self.status]
+        if name == 'address':
+            kwargs = {field: value[field] for field in ADDRESS_FIELDS}
+        else:
+            kwargs = {name: value}
+        return self.update(getattr(charge, method)(reference=self.reference, **kwargs))
+
+    def due(self, now: float = None) -> bool:
+        return self.pending and (now or time.time()) >= self.next_poll_at
+
+    def poll(self, charge: Charge) -> 'ChargeSession':
+        """Check a pending charge, waiting longer before the next check every time it is still pending"""
+
+        self.polls += 1
+        self.delay = min(self.delay * self.backoff, self.max_delay)
+        return self.update(charge.check_pending_charge(self.reference))
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'ChargeSession':
+        return cls(**state)
+
+
+class ChargeSessionStore:
+
+    """
+    Keeps the minimal state of charge sessions keyed by reference so they can be resumed.
+    """
+
+    def __init__(self) -> None:
+        self._sessions = {}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def save(self, session: ChargeSession):
+        self._sessions[session.reference] = session.to_dict()
+
+    def load(self, reference: str) -> Union[ChargeSession, None]:
+        state = self._sessions.get(reference)
+        return ChargeSession.from_dict(state) if state else None
+
+    def delete(self, reference: str):
+        self._sessions.pop(reference, None)
+
+    def pending(self) -> list:
+        return [ChargeSession.from_dict(state) for state in self._sessions.values() if state['status'] in PENDING_STATUSES]
+
+
+class SQLiteChargeSessionStore(ChargeSessionStore):
+
+    """
+    Charge session store backed by a SQLite file, sessions survive restarts.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS charge_sessions (reference TEXT PRIMARY KEY, status TEXT NOT NULL, state TEXT NOT NULL)')
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM charge_sessions').fetchone()[0]
+
+    def save(self, session: ChargeSession):
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO charge_sessions VALUES (?, ?, ?)',
+                             (session.reference, session.status, json.dumps(session.to_dict())))
+
+    def load(self, reference: str) -> Union[ChargeSession, None]:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT state FROM charge_sessions WHERE reference = ?', (reference,)).fetchone()
+        return ChargeSession.from_dict(json.loads(row[0])) if row else None
+
+    def delete(self, reference: str):
+        with self._lock:
+            self._db.execute('DELETE FROM charge_sessions WHERE reference = ?', (reference,))
+
+    def pending(self) -> list:
+        placeholders = ', '.join('?' * len(PENDING_STATUSES))
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT state FROM charge_sessions WHERE status IN ({placeholders})', PENDING_STATUSES).fetchall()
+        return [ChargeSession.from_dict(json.loads(row[0])) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ChargePoller:
+
+    """
+    Polls many pending charge sessions, each no earlier than its own backoff allows.
+    Sessions wait in a heap ordered by their next check, a small pool of workers does the polling,
+    so thousands of sessions need no thread each. A poll that fails leaves its session pending for
+    the next check and keeps the error in errors, by reference, until the session is polled again.
+    """
+
+    def __init__(self, charge: Charge, store: ChargeSessionStore = None, workers: int = 8) -> None:
+        self.charge = charge
+        self.store = store
+        self.workers = workers
+        self.errors = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, session: ChargeSession):
+        if self.store is not None:
+            self.store.save(session)
+        if session.pending:
+            with self._lock:
+                heapq.heappush(self._heap, session)
+
+    def resume(self):
+        """Add every pending session kept in the store"""
+
+        for session in self.store.pending():
+            self.add(session)
+
+    def next_due(self) -> Union[float, None]:
+        with self._lock:
+            return self._heap[0].next_poll_at if self._heap else None
+
+    def poll_due(self, now: float = None, on_error: Callable = None) -> list:
+        """Poll every session that is due and return the ones that left the pending state.
+        on_error, if given, is called with (session, error) for every poll that failed.
+        """
+
+        now = now or time.time()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0].next_poll_at <= now:
+                due.append(heapq.heappop(self._heap))
+        if not due:
+            return []
+
+        with ThreadPoolExecutor(min(self.workers, len(due))) as executor:
+            results = list(executor.map(self._poll, due))
+
+        settled = []
+        for session, error in results:
+            if error is not None:
+                self.errors[session.reference] = error
+                if on_error:
+                    on_error(session, error)
+            else:
+                self.errors.pop(session.reference, None)
+            if session.pending:
+                self.add(session)
+            else:
+                settled.append(session)
+        return settled
+
+    def _poll(self, session):
+        # a failure of one session, e.g. a network or API error, must not stop the polling of the others
+        error = None
+        try:
+            session.poll(self.charge)
+        except Exception as exception:
+            error = exception
+            session.message = str(error)
+            session.next_poll_at = time.time() + session.delay
+        if self.store is not None:
+            self.store.save(session)
+        return session, error
+
+    def run(self, callback: Callable = None, on_error: Callable = None):
+        """Poll until no session is pending, calling callback(session) as each one settles
+        and on_error(session, error) for every poll that failed
+        """
+
+        while self._heap:
+            time.sleep(max(0.0, self.next_due() - time.time()))
+            for session in self.poll_due(on_error=on_error):
+                if callback:
+                    callback(session)
+
+    async def run_async(self, callback: Callable = None, on_error: Callable = None):
+        """Event loop version of run, waits with asyncio.sleep and polls in the default executor"""
+
+        loop = asyncio.get_running_loop()
+        while self._heap:
+            await asyncio.sleep(max(0.0, self.next_due() - time.time()))
+            for session in await loop.run_in_executor(None, self.poll_due, None, on_error):
+                if callback:
+                    callback(session)
@@ -0,0 +1,181 @@
+import csv
+import json
+import threading
+from collections import Counter
+from itertools import islice
+from typing import Iterable, Iterator, Union
+
+from ..routes.customer import Customer
+from ..utilities import util
+from ..utilities.concurrency import run_concurrently
+from ..utilities.errors import APIError
+from ..utilities.journal import Journal
+from ..utilities.pagination import paginate
+from ..utilities.ratelimit import RateLimiter
+
+# customer fields Customer.create and Customer.update accept besides the email
+FIELDS = ('first_name', 'last_name', 'phone', 'metadata')
+
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+
+def read_customers(path: str) -> Iterator[dict]:
+    """Stream customers from a CSV file with a header row or a JSON lines file (.jsonl),
+    a metadata column in a CSV file holds JSON
+    """
+
+    with open(path, newline='', encoding='utf-8') as file:
+        if path.endswith(('.jsonl', '.ndjson')):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        for row in csv.DictReader(file):
+            if row.get('metadata'):
+                row['metadata'] = json.loads(row['metadata'])
+            yield row
+
+
+def clean_customer(row: dict) -> dict:
+    """The customer fields of a row with a lowercase email, empty fields dropped"""
+
+    customer = {key: row[key] for key in FIELDS if row.get(key) not in (None, '')}
+    customer['email'] = util.check_email(row['email'].strip().lower())
+    return customer
+
+
+def changes(existing: dict, customer: dict) -> dict:
+    """Fields of customer that differ from the existing record, as field -> (old, new)"""
+
+    return {key: (existing.get(key), value) for key, value in customer.items()
+            if key != 'email' and existing.get(key) != value}
+
+
+class CustomerUpsert:
+
+    """
+    Creates the customers that do not exist yet and updates the ones that changed, e.g. when migrating a merchant
+
+        upsert = CustomerUpsert(Customer(key), 'import.jsonl', workers=16, rate_limiter=RateLimiter(20))
+        report = upsert.run(read_customers('customers.csv'))
+        report['counts']   # Counter({'created': 180000, 'unchanged': 19000, 'updated': 950, 'invalid': 50})
+
+    Existing customers are loaded once into an index keyed by email from list_customers pages, so
+    no fetch is needed per row. Rows are read lazily and their emails are validated a batch at a time.
+    Every finished row is written to the journal, a rerun with the same journal skips them.
+    """
+
+    def __init__(self, customer: Customer, journal: Union[Journal, str], workers: int = 8, rate_limiter: RateLimiter = None, batch_size: int = 1000) -> None:
+        """
+        Args:
+            customer (Customer): Used to list, create and update customers
+            journal (Union[Journal, str]): Journal, or the path of its file, recording every row
+            workers (int, optional): Customers created or updated at the same time. Defaults to 8.
+            rate_limiter (RateLimiter, optional): Limits how fast requests are sent. Defaults to None.
+            batch_size (int, optional): Rows validated at a time. Defaults to 1000.
+        """
+
+        self.customer = customer
+        self.journal = Journal(journal) if isinstance(journal, str) else journal
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.batch_size = batch_size
+        self.index = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'CustomerUpsert(journal={self.journal.path!r}, indexed={len(self.index)})'
+
+    def load_existing(self, per_page: int = 100, **filters) -> int:
+        """Index the customers on the integration by lowercase email and return how many were indexed"""
+
+        self.index.clear()
+        for customer in paginate(self.customer.list_customers, per_page=per_page, **filters):
+            if customer.get('email'):
+                self.index[customer['email'].lower()] = customer
+        return len(self.index)
+
+    def _batches(self, rows, report):
+        # validates a batch of rows at a time, invalid ones go to the report with their row number
+        rows = iter(rows)
+        start = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return
+            valid, errors = util.validate_many(clean_customer, batch)
+            report['invalid'].extend((start + index, message) for index, message in errors)
+            report['counts']['invalid'] += len(errors)
+            yield from valid
+            start += len(batch)
+
+    def plan(self, customer: dict) -> tuple:
+        """What to do with a cleaned customer: (created, None), (updated, changed fields) or (unchanged, None)"""
+
+        existing = self.index.get(customer['email'])
+        if existing is None:
+            return CREATED, None
+        changed = changes(existing, customer)
+        return (UPDATED, changed) if changed else (UNCHANGED, None)
+
+    def run(self, rows: Iterable[dict], **filters) -> dict:
+        """Create or update every customer in rows
+
+        Args:
+            rows (Iterable[dict]): Customers with email and optionally first_name, last_name, phone and metadata
+            filters: Passed to load_existing e.g. from_date
+
+        Returns:
+            dict: counts of every outcome, invalid (row number, error) pairs, failed (email, error) pairs
+                and updated, email -> field -> (old, new)
+        """
+
+        self.load_existing(**filters)
+        report = {'counts': Counter(), 'invalid': [], 'failed': [], 'updated': {}}
+        counts = report['counts']
+
+        def todo():
+            seen = set()
+            for customer in self._batches(rows, report):
+                email = customer['email']
+                if email in seen or self.journal.state(email) in (CREATED, UPDATED, UNCHANGED):
+                    counts['done'] += 1
+                    continue
+                seen.add(email)
+                action, changed = self.plan(customer)
+                if action == UNCHANGED:
+                    counts[UNCHANGED] += 1
+                    self.journal.write(email, UNCHANGED)
+                    continue
+                yield customer, action, changed
+
+        for (customer, action, changed), _, error in run_concurrently(self._apply, todo(), self.workers, self.rate_limiter):
+            if error:
+                counts[FAILED] += 1
+                report['failed'].append((customer['email'], str(error)))
+                continue
+            counts[action] += 1
+            if action == UPDATED:
+                report['updated'][customer['email']] = changed
+        return report
+
+    def _apply(self, item):
+        customer, action, changed = item
+        email = customer['email']
+        fields = {key: value for key, value in customer.items() if key != 'email'}
+        if action == CREATED:
+            response = self.customer.create(email, **fields)
+        else:
+            response = self.customer.update(self.index[email]['customer_code'],
+                                            **{key: fields[key] for key in changed})
+        if not response.get('status'):
+            self.journal.write(email, FAILED, message=response.get('message'))
+            raise APIError(response)
+
+        with self._lock:
+            self.index[email] = {**self.index.get(email, {}), **(response.get('data') or {})}
+        self.journal.write(email, action, changes=changed)
+        return action
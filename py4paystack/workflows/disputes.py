@@ -0,0 +1,140 @@
+from typing import Callable, Union
+
+from ..routes.disputes import Disputes
+from ..routes.transaction import Transaction
+from ..utilities import settings
+from ..utilities.concurrency import run_concurrently
+from ..utilities.errors import APIError
+from ..utilities.pagination import paginate
+from ..utilities.ratelimit import RateLimiter
+
+AWAITING_MERCHANT = settings.DISPUTE_STATUSES[0]
+
+_NO_DEADLINE = '9999-12-31'
+
+
+class Decision:
+
+    """
+    What to do with a dispute: the resolution passed to Disputes.resolve, the evidence passed to
+    Disputes.add_evidence and the path of the file uploaded with it, e.g.
+
+        Decision('declined', 'Item was delivered', 0, file='receipts/1234.pdf',
+                 evidence={'customer_email': ..., 'customer_name': ..., 'customer_phone': ..., 'service_details': ...})
+    """
+
+    __slots__ = ('resolution', 'message', 'refund_amount', 'evidence', 'file')
+
+    def __init__(self, resolution: str, message: str, refund_amount: int = 0, evidence: dict = None, file: Union[str, None] = None) -> None:
+        self.resolution = resolution
+        self.message = message
+        self.refund_amount = refund_amount
+        self.evidence = evidence
+        self.file = file
+
+    def __repr__(self):
+        return f'Decision({self.resolution!r}, file={self.file!r})'
+
+
+def _check(response):
+    if not response.get('status'):
+        raise APIError(response)
+    return response['data']
+
+
+class DisputeRunner:
+
+    """
+    Works through the disputes awaiting merchant feedback, e.g.
+
+        runner = DisputeRunner(Disputes(key), Transaction(key), workers=16)
+        results = runner.run(lambda dispute, transaction: Decision('merchant-accepted', 'Refunded', transaction['amount']))
+
+    Disputes are pulled page by page, their transactions are fetched once each when the list does
+    not already include them, and the disputes closest to their deadline are handled first.
+    Each dispute's evidence, uploads and resolution run on a pool of workers, the uploads stream
+    from disk over a connection pool shared by every worker.
+    """
+
+    def __init__(self, disputes: Disputes, transaction: Transaction, workers: int = 8, rate_limiter: RateLimiter = None) -> None:
+        """
+        Args:
+            disputes (Disputes): Used to list, add evidence to and resolve disputes
+            transaction (Transaction): Used to fetch transactions the dispute list does not include
+            workers (int, optional): Disputes handled at the same time. Defaults to 8.
+            rate_limiter (RateLimiter, optional): Limits how fast disputes are started. Defaults to None.
+        """
+
+        self.disputes = disputes
+        self.transaction = transaction
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+
+    def __repr__(self):
+        return f'DisputeRunner(workers={self.workers})'
+
+    def pending(self, per_page: int = 100, **filters) -> list:
+        """Every dispute awaiting merchant feedback with its transaction under 'transaction', earliest deadline first"""
+
+        disputes = list(paginate(self.disputes.list_disputes, per_page=per_page,
+                                 status=AWAITING_MERCHANT, **filters))
+
+        # the list usually embeds the transaction, fetch the rest once per transaction id
+        missing = {dispute['transaction'] for dispute in disputes
+                   if dispute.get('transaction') is not None and not isinstance(dispute['transaction'], dict)}
+        transactions = {}
+        for transaction_id, response, error in run_concurrently(self.transaction.fetch, missing, self.workers, self.rate_limiter):
+            if error is None and response.get('status'):
+                transactions[transaction_id] = response['data']
+        for dispute in disputes:
+            transaction = dispute.get('transaction')
+            if not isinstance(transaction, dict) and transaction in transactions:
+                dispute['transaction'] = transactions[transaction]
+
+        disputes.sort(key=lambda dispute: dispute.get('dueAt') or _NO_DEADLINE)
+        return disputes
+
+    def handle(self, dispute: dict, decision: Decision) -> dict:
+        """Add the evidence, upload the file and resolve one dispute, returning the resolve data
+
+        Raises:
+            APIError: raised when a step is refused by Paystack
+        """
+
+        dispute_id = dispute['id']
+        extra = {}
+        if decision.evidence:
+            evidence = _check(self.disputes.add_evidence(dispute_id, **decision.evidence))
+            extra['evidence_id'] = evidence['id']
+
+        uploaded = ''
+        if decision.file:
+            uploaded = self.disputes.upload_evidence(dispute_id, decision.file)['data']['fileName']
+
+        return _check(self.disputes.resolve(
+            dispute_id, decision.resolution, decision.message, decision.refund_amount,
+            uploaded, **extra))
+
+    def run(self, decide: Callable, disputes: list = None) -> dict:
+        """Call decide(dispute, transaction) for every pending dispute and carry out the Decision it returns,
+        disputes it returns None for are left alone.
+
+        Returns:
+            dict: dispute id -> resolve data, or the exception that stopped the dispute
+        """
+
+        if disputes is None:
+            disputes = self.pending()
+
+        def work():
+            for dispute in disputes:
+                transaction = dispute.get('transaction')
+                decision = decide(dispute, transaction if isinstance(transaction, dict) else None)
+                if decision is not None:
+                    yield dispute, decision
+
+        results = {}
+        for (dispute, _), data, error in run_concurrently(lambda item: self.handle(*item), work(), self.workers, self.rate_limiter):
+            results[dispute['id']] = error or data
+        return results
+
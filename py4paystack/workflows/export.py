@@ -0,0 +1,232 @@
+import csv
+import datetime
+from collections import namedtuple
+from typing import Callable, Iterable, Iterator, Union
+from urllib.parse import urlsplit
+
+from ..routes.disputes import Disputes
+from ..routes.transaction import Transaction
+from ..utilities.errors import APIError
+from ..utilities.pagination import paginate
+from ..utilities.request import Request
+from ..utilities.transport import DOWNLOAD_CHUNK_SIZE, Transport
+
+# name of the output column, its type and the keys leading to its value in a record
+Column = namedtuple('Column', ['name', 'type', 'path'])
+
+TRANSACTION_COLUMNS = (
+    Column('id', 'int64', ('id',)),
+    Column('reference', 'string', ('reference',)),
+    Column('amount', 'int64', ('amount',)),
+    Column('fees', 'int64', ('fees',)),
+    Column('currency', 'string', ('currency',)),
+    Column('status', 'string', ('status',)),
+    Column('channel', 'string', ('channel',)),
+    Column('gateway_response', 'string', ('gateway_response',)),
+    Column('paid_at', 'timestamp', ('paid_at',)),
+    Column('created_at', 'timestamp', ('created_at',)),
+    Column('customer_id', 'int64', ('customer', 'id')),
+    Column('customer_email', 'string', ('customer', 'email')),
+    Column('customer_code', 'string', ('customer', 'customer_code')),
+)
+
+DISPUTE_COLUMNS = (
+    Column('id', 'int64', ('id',)),
+    Column('refund_amount', 'int64', ('refund_amount',)),
+    Column('currency', 'string', ('currency',)),
+    Column('status', 'string', ('status',)),
+    Column('resolution', 'string', ('resolution',)),
+    Column('category', 'string', ('category',)),
+    Column('transaction_reference', 'string', ('transaction', 'reference')),
+    Column('transaction_amount', 'int64', ('transaction', 'amount')),
+    Column('created_at', 'timestamp', ('createdAt',)),
+    Column('due_at', 'timestamp', ('dueAt',)),
+    Column('resolved_at', 'timestamp', ('resolvedAt',)),
+)
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def parse_timestamp(value: str) -> int:
+    """Milliseconds since the epoch of a Paystack timestamp e.g. 2022-01-01T10:00:00.000Z"""
+
+    stamp = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=datetime.timezone.utc)
+    return (stamp - _EPOCH) // datetime.timedelta(milliseconds=1)
+
+
+CONVERTERS = {
+    'int64': int,
+    'string': str,
+    'bool': bool,
+    'timestamp': parse_timestamp,
+}
+
+
+def _getter(column):
+    convert = CONVERTERS[column.type]
+    first, *rest = column.path
+
+    def get(record):
+        value = record.get(first)
+        for key in rest:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return None if value is None or value == '' else convert(value)
+    return get
+
+
+def rows(records: Iterable[dict], columns: tuple = TRANSACTION_COLUMNS) -> Iterator[tuple]:
+    """Turn records into tuples of typed values in the order of columns.
+    Amounts stay integers in the minor unit (kobo, pesewas, cents), timestamps become epoch milliseconds.
+    """
+
+    getters = [_getter(column) for column in columns]
+    for record in records:
+        yield tuple(get(record) for get in getters)
+
+
+def chunks(records: Iterable[dict], columns: tuple = TRANSACTION_COLUMNS, chunk_size: int = 10000) -> Iterator[dict]:
+    """Group records into dicts of column name -> list of at most chunk_size typed values"""
+
+    names = [column.name for column in columns]
+    chunk = []
+    for row in rows(records, columns):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield dict(zip(names, map(list, zip(*chunk))))
+            chunk = []
+    if chunk:
+        yield dict(zip(names, map(list, zip(*chunk))))
+
+
+def write_csv(records: Iterable[dict], file, columns: tuple = TRANSACTION_COLUMNS) -> int:
+    """Write records to a CSV file, one row at a time, and return the number of rows written
+
+    Args:
+        records (Iterable[dict]): Records e.g. paginate(trans.list_transactions)
+        file: Path of the file or a text file object opened with newline=''
+        columns (tuple, optional): Columns to write. Defaults to TRANSACTION_COLUMNS.
+    """
+
+    if isinstance(file, str):
+        with open(file, 'w', newline='', encoding='utf-8') as handle:
+            return write_csv(records, handle, columns)
+
+    writer = csv.writer(file)
+    writer.writerow([column.name for column in columns])
+    count = 0
+    for row in rows(records, columns):
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def _pyarrow():
+    # imported on first use so CSV exports never pay for loading pyarrow
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('pyarrow is required for columnar exports, install it with pip install pyarrow') from None
+    return pyarrow
+
+
+def arrow_schema(columns: tuple = TRANSACTION_COLUMNS):
+    pyarrow = _pyarrow()
+    types = {
+        'int64': pyarrow.int64(),
+        'string': pyarrow.string(),
+        'bool': pyarrow.bool_(),
+        'timestamp': pyarrow.timestamp('ms', tz='UTC'),
+    }
+    return pyarrow.schema([(column.name, types[column.type]) for column in columns])
+
+
+def record_batches(records: Iterable[dict], columns: tuple = TRANSACTION_COLUMNS, chunk_size: int = 10000) -> Iterator:
+    """Yield pyarrow RecordBatches of at most chunk_size rows"""
+
+    pyarrow = _pyarrow()
+    schema = arrow_schema(columns)
+    for chunk in chunks(records, columns, chunk_size):
+        yield pyarrow.RecordBatch.from_pydict(chunk, schema=schema)
+
+
+def write_parquet(records: Iterable[dict], path: str, columns: tuple = TRANSACTION_COLUMNS, chunk_size: int = 10000) -> int:
+    """Write records to a Parquet file one row group per chunk and return the number of rows written.
+    Requires pyarrow.
+    """
+
+    pyarrow = _pyarrow()
+    schema = arrow_schema(columns)
+    count = 0
+    with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+        for batch in record_batches(records, columns, chunk_size):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def _export(list_method: Callable, file, columns: tuple, format: str, per_page: int, chunk_size: int, filters: dict) -> int:
+    records = paginate(list_method, per_page=per_page, **filters)
+    if format == 'csv':
+        return write_csv(records, file, columns)
+    if format == 'parquet':
+        return write_parquet(records, file, columns, chunk_size)
+    raise ValueError(f"format should be 'csv' or 'parquet', got {format!r}")
+
+
+def export_transactions(transaction: Transaction, file, format: str = 'csv', per_page: int = 100, chunk_size: int = 10000, **filters) -> int:
+    """Page through list_transactions and stream the records to a CSV or Parquet file,
+    e.g. export_transactions(trans, 'june.parquet', 'parquet', from_date='2022-06-01', to_date='2022-06-30').
+    Memory use stays at one page plus one chunk however many transactions there are.
+
+    Returns:
+        int: Number of transactions written
+    """
+
+    return _export(transaction.list_transactions, file, TRANSACTION_COLUMNS, format, per_page, chunk_size, filters)
+
+
+def export_disputes(disputes: Disputes, file, format: str = 'csv', per_page: int = 100, chunk_size: int = 10000, **filters) -> int:
+    """Page through list_disputes and stream the records to a CSV or Parquet file
+
+    Returns:
+        int: Number of disputes written
+    """
+
+    return _export(disputes.list_disputes, file, DISPUTE_COLUMNS, format, per_page, chunk_size, filters)
+
+
+def download_export(response: Union[dict, str], file, chunk_size: int = DOWNLOAD_CHUNK_SIZE, transport: Transport = None) -> int:
+    """Stream the file linked in a Transaction.export or Disputes.export response to file
+    without holding it in memory, and return the number of bytes written.
+
+    Args:
+        response (Union[dict, str]): The export response or the url in its data.path
+        file: Path of the file or a binary file object
+        chunk_size (int, optional): Bytes read at a time. Defaults to 65536.
+        transport (Transport, optional): Transport whose pool for the url's host is used, e.g. trans.transport.
+            Defaults to the pool shared by every route.
+
+    Raises:
+        APIError: raised when the export request or the download failed
+    """
+
+    if isinstance(response, dict):
+        if not response.get('status'):
+            raise APIError(response)
+        response = response['data']['path']
+
+    if isinstance(file, str):
+        with open(file, 'wb') as handle:
+            return download_export(response, handle, chunk_size, transport)
+
+    parts = urlsplit(response)
+    path = f'{parts.path}?{parts.query}' if parts.query else parts.path
+    status, written = (transport or Request.transport).for_url(response).download(path, file, chunk_size=chunk_size)
+    if not 200 <= status < 300:
+        raise APIError({'status': False, 'message': f'export download failed with status {status}'})
+    return written
@@ -0,0 +1,192 @@
+import time
+from collections import Counter
+from itertools import groupby, islice
+from typing import Iterable, Iterator, Union
+
+from ..routes.invoices import Invoice
+from ..utilities import util
+from ..utilities.concurrency import retry, run_concurrently
+from ..utilities.journal import Journal
+from ..utilities.ratelimit import RateLimiter
+
+# journal states of an invoice in the order it moves through them
+STARTED = 'started'
+CREATED = 'created'
+FINALIZED = 'finalized'
+NOTIFIED = 'notified'
+FAILED = 'failed'
+
+# fields of a line item row that belong to the invoice rather than the item
+INVOICE_FIELDS = ('key', 'customer', 'description', 'due_date', 'currency', 'split_code')
+
+
+def group_line_items(rows: Iterable[dict], key: str = 'key') -> Iterator[dict]:
+    """Turn a stream of line item rows sorted by invoice into invoices, one per run of rows with the same key, e.g.
+
+        {'key': 'CUS_x.2022-06', 'customer': 'CUS_x', 'description': 'June', 'due_date': '2022-07-01', 'name': 'Seat', 'amount': 2000, 'quantity': 3}
+
+    The invoice fields come from the first row of each invoice, the remaining fields of every row make its line item.
+    """
+
+    for invoice_key, items in groupby(rows, key=lambda row: row[key]):
+        invoice = None
+        for row in items:
+            if invoice is None:
+                invoice = {field: row[field] for field in INVOICE_FIELDS if row.get(field) is not None}
+                invoice['key'] = invoice_key
+                invoice['line_items'] = []
+            invoice['line_items'].append({field: value for field, value in row.items()
+                                          if field not in INVOICE_FIELDS and field != key})
+        yield invoice
+
+
+class InvoiceBatch:
+
+    """
+    Creates, finalizes and notifies a large batch of invoices, e.g. for month-end billing
+
+        batch = InvoiceBatch(Invoice(key), 'invoices-2022-06.jsonl', workers=16, rate_limiter=RateLimiter(20))
+        batch.run(group_line_items(read_line_items()))
+        # Counter({'created': 200000, 'finalized': 200000, 'notified': 200000})
+
+    Invoices are created as drafts through Invoice.create, so its validation applies, by a pool of
+    workers reading the stream as they go. The drafts are then finalized batch_size at a time and the
+    notifications sent in waves of wave_size with wave_interval seconds between them. Every step is
+    written to the journal against the invoice key, and a rerun with the same journal carries on
+    from the last step of each invoice. An invoice whose create started but never finished is
+    reported as unconfirmed and left alone, since creating it again could bill the customer twice.
+    """
+
+    def __init__(self, invoice: Invoice, journal: Union[Journal, str], workers: int = 8, rate_limiter: RateLimiter = None, batch_size: int = 1000, wave_size: int = 5000, wave_interval: float = 60.0, notify_rate_limiter: RateLimiter = None) -> None:
+        """
+        Args:
+            invoice (Invoice): Used to create, finalize and notify the invoices
+            journal (Union[Journal, str]): Journal, or the path of its file, recording every invoice
+            workers (int, optional): Requests sent at the same time. Defaults to 8.
+            rate_limiter (RateLimiter, optional): Limits how fast invoices are created and finalized. Defaults to None.
+            batch_size (int, optional): Drafts finalized per batch. Defaults to 1000.
+            wave_size (int, optional): Notifications per wave. Defaults to 5000.
+            wave_interval (float, optional): Seconds between two waves of notifications. Defaults to 60.
+            notify_rate_limiter (RateLimiter, optional): Limits how fast notifications are sent within a wave. Defaults to rate_limiter.
+        """
+
+        self.invoice = invoice
+        self.journal = Journal(journal) if isinstance(journal, str) else journal
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.batch_size = batch_size
+        self.wave_size = wave_size
+        self.wave_interval = wave_interval
+        self.notify_rate_limiter = notify_rate_limiter or rate_limiter
+
+    def __repr__(self):
+        return f'InvoiceBatch(journal={self.journal.path!r})'
+
+    def create(self, invoices: Iterable[dict]) -> Counter:
+        """Create every invoice that has no journal entry yet as a draft
+
+        Args:
+            invoices (Iterable[dict]): Invoices with a unique key and the arguments of Invoice.create
+
+        Returns:
+            Counter: created, invalid, failed, done (started in an earlier run), unconfirmed and error (network errors)
+        """
+
+        summary = Counter()
+
+        def todo():
+            for invoice in invoices:
+                state = self.journal.state(invoice['key'])
+                if state == STARTED:
+                    summary['unconfirmed'] += 1
+                elif state is not None:
+                    summary['done'] += 1
+                else:
+                    yield invoice
+
+        for invoice, outcome, error in run_concurrently(self._create, todo(), self.workers, self.rate_limiter):
+            summary['error' if error else outcome] += 1
+        return summary
+
+    def _create(self, invoice):
+        key = invoice['key']
+        fields = {field: value for field, value in invoice.items() if field != 'key'}
+        fields.setdefault('draft', True)
+
+        self.journal.write(key, STARTED)
+        try:
+            # an invoice has no idempotency key, only retry when the request cannot have reached Paystack
+            response = retry(self.invoice.create, instrumentation=self.invoice.instrumentation,
+                             route='POST /paymentrequest', retry_on=(ConnectionRefusedError,), **fields)
+        except util.VALIDATION_ERRORS as error:
+            self.journal.write(key, FAILED, message=str(error))
+            return 'invalid'
+        if not response.get('status'):
+            self.journal.write(key, FAILED, message=response.get('message'))
+            return FAILED
+
+        data = response.get('data') or {}
+        # an invoice created with draft=False needs no finalize
+        state = CREATED if data.get('status', 'draft') == 'draft' else FINALIZED
+        self.journal.write(key, state, request_code=data.get('request_code'), id=data.get('id'))
+        return state
+
+    def _advance(self, state, step, route, keys, rate_limiter):
+        # runs step(request_code) for every key and moves the ones that succeed to state
+        def call(key):
+            code = self.journal.get(key)['request_code']
+            response = retry(step, code, instrumentation=self.invoice.instrumentation, route=route)
+            if not response.get('status'):
+                return response.get('message')
+            self.journal.write(key, state, request_code=code)
+            return None
+
+        summary = Counter()
+        for key, message, error in run_concurrently(call, keys, self.workers, rate_limiter):
+            if error or message:
+                # left in its previous state for the next run
+                summary['error' if error else FAILED] += 1
+            else:
+                summary[state] += 1
+        return summary
+
+    def finalize(self) -> Counter:
+        """Finalize every created draft, batch_size at a time
+
+        Returns:
+            Counter: finalized, failed and error, failed drafts are tried again by the next run
+        """
+
+        keys = [entry['key'] for entry in self.journal.entries(CREATED)]
+        summary = Counter()
+        for start in range(0, len(keys), self.batch_size):
+            summary.update(self._advance(FINALIZED, self.invoice.finalize, 'POST /paymentrequest/finalize/:id',
+                                         keys[start:start + self.batch_size], self.rate_limiter))
+        return summary
+
+    def notify(self) -> Counter:
+        """Send the notification of every finalized invoice in waves of wave_size, wave_interval seconds apart
+
+        Returns:
+            Counter: notified, failed and error, failed notifications are tried again by the next run
+        """
+
+        keys = iter([entry['key'] for entry in self.journal.entries(FINALIZED)])
+        summary = Counter()
+        wave = list(islice(keys, self.wave_size))
+        while wave:
+            summary.update(self._advance(NOTIFIED, self.invoice.send_notification, 'POST /paymentrequest/notify/:id',
+                                         wave, self.notify_rate_limiter))
+            wave = list(islice(keys, self.wave_size))
+            if wave:
+                time.sleep(self.wave_interval)
+        return summary
+
+    def run(self, invoices: Iterable[dict], notify: bool = True) -> Counter:
+        """Create, finalize and, unless notify is False, notify every invoice, returning the counts of all steps"""
+
+        summary = self.create(invoices)
+        summary.update(self.finalize())
+        if notify:
+            summary.update(self.notify())
+        return summary
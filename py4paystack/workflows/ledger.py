@@ -0,0 +1,122 @@
+import threading
+from typing import Callable, Iterator, Union
+
+from ..routes.transfer_control import TransferControl
+from ..utilities.errors import APIError
+
+
+class LedgerWatcher:
+
+    """
+    Follows the balance ledger and emits only the entries it has not seen yet, e.g. for a treasury service
+
+        watcher = LedgerWatcher(TransferControl(key))
+        for entry in watcher.stream(stop_event):
+            throttle_payouts(watcher.balances[entry['currency']])
+
+    The position is the highest ledger entry id seen. Each poll reads the ledger newest first, a page
+    at a time, and stops at the first page reaching back to the position, so a quiet ledger costs a
+    single small request. The wait between polls drops to min_interval as soon as new entries show up
+    and grows by backoff after every empty poll, up to max_interval.
+    """
+
+    def __init__(self, transfer_control: TransferControl, position: int = None, min_interval: float = 2.0, max_interval: float = 60.0, backoff: float = 1.5, per_page: int = 50) -> None:
+        """
+        Args:
+            transfer_control (TransferControl): Used to fetch the ledger and balances
+            position (int, optional): Id of the last entry already handled, start from the current newest entry if None. Defaults to None.
+            min_interval (float, optional): Seconds between polls while entries are coming in. Defaults to 2.0.
+            max_interval (float, optional): Longest wait in seconds between polls of a quiet ledger. Defaults to 60.0.
+            backoff (float, optional): Factor the wait grows by after a poll without new entries. Defaults to 1.5.
+            per_page (int, optional): Ledger entries fetched per request. Defaults to 50.
+        """
+
+        self.transfer_control = transfer_control
+        self.position = position
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.per_page = per_page
+        self.interval = min_interval
+        self.balances = {}
+
+    def __repr__(self):
+        return f'LedgerWatcher(position={self.position}, interval={self.interval})'
+
+    def refresh_balances(self) -> dict:
+        """Fetch the balance of every currency with check_balance, as currency -> balance
+
+        Raises:
+            APIError: raised when the balance cannot be fetched
+        """
+
+        response = self.transfer_control.check_balance()
+        if not response.get('status'):
+            raise APIError(response)
+        for balance in response.get('data') or []:
+            self.balances[balance['currency']] = balance['balance']
+        return self.balances
+
+    def poll(self) -> list:
+        """Entries added since the last poll, oldest first. The first poll without a position
+        only records the newest entry as the position and returns nothing.
+
+        Raises:
+            APIError: raised when a ledger page cannot be fetched
+        """
+
+        new = []
+        seen = set()
+        page = 1
+        while True:
+            response = self.transfer_control.fetch_balance_ledger(per_page=self.per_page, page=page)
+            if not response.get('status'):
+                raise APIError(response)
+            entries = response.get('data') or []
+            if self.position is None:
+                self.position = max((entry['id'] for entry in entries), default=0)
+                return []
+
+            fresh = [entry for entry in entries if entry['id'] > self.position]
+            # entries added while paging push older ones onto the next page, drop the repeats
+            new.extend(entry for entry in fresh if entry['id'] not in seen)
+            seen.update(entry['id'] for entry in fresh)
+            if len(fresh) < len(entries) or len(entries) < self.per_page:
+                break
+            page += 1
+
+        new.sort(key=lambda entry: entry['id'])
+        for entry in new:
+            if entry.get('currency') is not None and entry.get('balance') is not None:
+                self.balances[entry['currency']] = entry['balance']
+        if new:
+            self.position = new[-1]['id']
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return new
+
+    def stream(self, stop: threading.Event) -> Iterator[dict]:
+        """Yield new ledger entries oldest first until stop is set, polling at the adaptive interval"""
+
+        while not stop.is_set():
+            yield from self.poll()
+            stop.wait(self.interval)
+
+    def run(self, callback: Callable, stop: threading.Event, on_error: Union[Callable, None] = None):
+        """Call callback(entry) for every new ledger entry until stop is set. Failed polls are passed
+        to on_error, or raised if it is None, and retried after max_interval.
+        """
+
+        while not stop.is_set():
+            try:
+                entries = self.poll()
+            except (APIError, OSError) as error:
+                if on_error is None:
+                    raise
+                on_error(error)
+                self.interval = self.max_interval
+                entries = []
+            for entry in entries:
+                callback(entry)
+            stop.wait(self.interval)
@@ -0,0 +1,201 @@
+import threading
+from collections import Counter
+from itertools import islice
+from typing import Iterable, Union
+
+from ..routes.transfer_recipient import TransferRecipient
+from ..routes.verification import Verification
+from ..utilities import util
+from ..utilities.concurrency import run_concurrently
+from ..utilities.errors import APIError
+from ..utilities.pagination import paginate
+from ..utilities.ratelimit import RateLimiter
+
+CHUNK_SIZE = 100
+
+# recipient types identified by a bank account, their names can be resolved
+ACCOUNT_TYPES = ('nuban', 'basa', 'mobile_money')
+
+
+def recipient_key(recipient: dict) -> tuple:
+    """(bank_code, account_number) of a bank recipient or ('authorization', code) of a card recipient,
+    works for rows and for the records returned by the API
+    """
+
+    details = recipient.get('details') or recipient
+    if recipient.get('type') == 'authorization':
+        return 'authorization', details.get('authorization_code')
+    return details.get('bank_code'), details.get('account_number')
+
+
+class AccountNames:
+
+    """
+    Thread safe cache of account names resolved with Verification.resolve_acct_number,
+    every account is resolved at most once, accounts Paystack could not resolve are cached as None.
+    Other failures, e.g. a 429 or a server error, are not cached.
+    """
+
+    def __init__(self, verification: Verification) -> None:
+        self.verification = verification
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def resolve(self, bank_code: str, account_number: str) -> Union[str, None]:
+        """Name of the account, None if Paystack could not resolve it
+
+        Raises:
+            APIError: raised when the account could not be looked up, e.g. a 429 or a server error
+        """
+
+        key = (bank_code, account_number)
+        with self._lock:
+            if key in self._names:
+                self.verification.instrumentation.incr('cache_hits', 'GET /bank/resolve')
+                return self._names[key]
+        response = self.verification.resolve_acct_number(account_number, bank_code)
+        if response.get('status'):
+            name = (response.get('data') or {}).get('account_name')
+        elif 'could not resolve' in (response.get('message') or '').lower():
+            name = None
+        else:
+            raise APIError(response)
+        with self._lock:
+            return self._names.setdefault(key, name)
+
+
+class RecipientSync:
+
+    """
+    Creates transfer recipients for many payees at once, e.g. when onboarding payouts
+
+        sync = RecipientSync(TransferRecipient(key), Verification(key), workers=8)
+        report = sync.run(read_payees())
+        report['recipients']   # (bank_code, account_number) -> recipient_code for every payee
+
+    Rows are validated with TransferRecipient.get_payload and deduplicated by (bank_code, account_number)
+    against an index of the recipients that already exist and against each other. Account names are
+    resolved once per account, and filled in for rows without a name, then the new recipients are
+    created with bulk_create in chunks sent by a pool of workers.
+    """
+
+    def __init__(self, transfer_recipient: TransferRecipient, verification: Verification = None, workers: int = 8, rate_limiter: RateLimiter = None, chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        Args:
+            transfer_recipient (TransferRecipient): Used to list and create recipients
+            verification (Verification, optional): Used to resolve account names, names are not checked if None. Defaults to None.
+            workers (int, optional): Chunks sent at the same time. Defaults to 8.
+            rate_limiter (RateLimiter, optional): Limits how fast chunks are sent. Defaults to None.
+            chunk_size (int, optional): Recipients per bulk_create request. Defaults to 100.
+        """
+
+        self.transfer_recipient = transfer_recipient
+        self.names = AccountNames(verification) if verification is not None else None
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.chunk_size = chunk_size
+        self.index = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'RecipientSync(indexed={len(self.index)})'
+
+    def load_existing(self, per_page: int = 100, **filters) -> int:
+        """Index the recipients on the integration by (bank_code, account_number) and return how many were indexed"""
+
+        self.index.clear()
+        for recipient in paginate(self.transfer_recipient.list_recipients, per_page=per_page, **filters):
+            self.index[recipient_key(recipient)] = recipient
+        return len(self.index)
+
+    def run(self, rows: Iterable[dict], **filters) -> dict:
+        """Create a recipient for every row that does not have one yet
+
+        Args:
+            rows (Iterable[dict]): Recipient rows as accepted by TransferRecipient.create
+            filters: Passed to load_existing e.g. from_date
+
+        Returns:
+            dict: counts of every outcome, invalid (row number, error) pairs, failed (row, error) pairs
+                and recipients, the recipient code of every row key that exists after the run
+        """
+
+        self.load_existing(**filters)
+        report = {'counts': Counter(), 'invalid': [], 'failed': [], 'recipients': {}}
+        counts = report['counts']
+
+        def new_rows():
+            seen = set()
+            for number, row in enumerate(rows):
+                try:
+                    row = self.transfer_recipient.get_payload(row)
+                except util.VALIDATION_ERRORS as error:
+                    report['invalid'].append((number, str(error)))
+                    counts['invalid'] += 1
+                    continue
+
+                key = recipient_key(row)
+                if key in self.index:
+                    counts['existing'] += 1
+                    report['recipients'][key] = self.index[key].get('recipient_code')
+                elif key in seen:
+                    counts['duplicate'] += 1
+                else:
+                    seen.add(key)
+                    yield number, row
+
+        def chunks():
+            pending = new_rows()
+            while True:
+                chunk = list(islice(pending, self.chunk_size))
+                if not chunk:
+                    return
+                yield chunk
+
+        for chunk, result, error in run_concurrently(self._submit, chunks(), self.workers, self.rate_limiter):
+            if error:
+                report['failed'].extend((number, str(error)) for number, _ in chunk)
+                counts['failed'] += len(chunk)
+                continue
+            created, unresolved, failed = result
+            counts['created'] += len(created)
+            counts['unresolved'] += len(unresolved)
+            counts['failed'] += len(failed)
+            report['invalid'].extend(unresolved)
+            report['failed'].extend(failed)
+            for recipient in created:
+                report['recipients'][recipient_key(recipient)] = recipient.get('recipient_code')
+        return report
+
+    def _submit(self, chunk):
+        # resolves the account names of a chunk and creates its recipients in one request
+        sent, unresolved, failed = [], [], []
+        for number, row in chunk:
+            if self.names is not None and row['type'] in ACCOUNT_TYPES:
+                try:
+                    name = self.names.resolve(row['bank_code'], row['account_number'])
+                except APIError as error:
+                    failed.append((number, str(error)))
+                    continue
+                if name is None:
+                    unresolved.append((number, f"account {row['account_number']} could not be resolved at bank {row['bank_code']}"))
+                    continue
+                row.setdefault('name', name)
+            sent.append((number, row))
+        if not sent:
+            return [], unresolved, failed
+
+        response = self.transfer_recipient.bulk_create(*(row for _, row in sent))
+        if not response.get('status'):
+            return [], unresolved, failed + [(number, response.get('message')) for number, _ in sent]
+
+        data = response.get('data') or {}
+        created = data.get('success') or []
+        with self._lock:
+            for recipient in created:
+                self.index[recipient_key(recipient)] = recipient
+        failed.extend((None, str(error)) for error in data.get('errors') or [])
+        return created, unresolved, failed
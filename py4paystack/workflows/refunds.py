@@ -0,0 +1,144 @@
+import threading
+from collections import Counter
+from typing import Iterable, Union
+
+from ..routes.refund import Refund
+from ..utilities.concurrency import retry, run_concurrently
+from ..utilities.journal import Journal
+from ..utilities.pagination import paginate
+from ..utilities.ratelimit import RateLimiter
+
+# refunds in these states do not count as refunded
+FAILED_STATUSES = ('failed',)
+
+# journal states, a refund is written as started before it is requested
+STARTED = 'started'
+REFUNDED = 'refunded'
+FAILED = 'failed'
+
+
+def refund_keys(refund: dict) -> list:
+    """Transaction id and reference a refund record belongs to, as strings"""
+
+    transaction = refund.get('transaction')
+    keys = []
+    if isinstance(transaction, dict):
+        keys.extend((transaction.get('id'), transaction.get('reference')))
+    else:
+        keys.append(transaction)
+    keys.append(refund.get('transaction_reference'))
+    return [str(key) for key in keys if key is not None]
+
+
+class RefundRunner:
+
+    """
+    Refunds many transactions at once, e.g. after an incident
+
+        runner = RefundRunner(Refund(key), 'incident-42.jsonl', rate_limiter=RateLimiter(10))
+        runner.run([('T685312322670591', None), (1504248187, 5000)], merchant_note='incident 42')
+        # Counter({'refunded': 1998, 'already_refunded': 2})
+
+    Existing refunds are loaded once into an index keyed by transaction id and reference, and
+    transactions found in it are skipped, as are repeats in the input. Every refund is written to
+    the journal before and after it is requested. Since the index is loaded again when a run starts,
+    a run resumed after a crash skips refunds Paystack already made and requests the rest.
+    """
+
+    def __init__(self, refund: Refund, journal: Union[Journal, str], workers: int = 8, rate_limiter: RateLimiter = None) -> None:
+        """
+        Args:
+            refund (Refund): Used to list and create refunds
+            journal (Union[Journal, str]): Journal, or the path of its file, recording every refund
+            workers (int, optional): Refunds requested at the same time. Defaults to 8.
+            rate_limiter (RateLimiter, optional): Limits how fast refunds are requested. Defaults to None.
+        """
+
+        self.refund = refund
+        self.journal = Journal(journal) if isinstance(journal, str) else journal
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.index = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'RefundRunner(journal={self.journal.path!r}, indexed={len(self.index)})'
+
+    def load_existing(self, per_page: int = 100, **filters) -> int:
+        """Index the refunds already on the integration, e.g. load_existing(from_date='2022-06-01')
+        to only load refunds made since the incident, and return how many were indexed.
+        """
+
+        self.index.clear()
+        count = 0
+        for refund in paginate(self.refund.list_refunds, per_page=per_page, **filters):
+            if refund.get('status') in FAILED_STATUSES:
+                continue
+            for key in refund_keys(refund):
+                self.index[key] = refund
+            count += 1
+        return count
+
+    def already_refunded(self, transaction: Union[str, int]) -> bool:
+        return str(transaction) in self.index
+
+    def run(self, refunds: Iterable[tuple], currency: str = None, merchant_note: str = None, customer_note: str = None, **filters) -> Counter:
+        """Refund every (transaction id or reference, amount) pair, amount None refunds the whole transaction
+
+        Args:
+            refunds (Iterable[tuple]): (transaction, amount) pairs, read as the workers need them
+            currency (str, optional): Currency of the amounts. Defaults to None.
+            merchant_note (str, optional): Merchant reason sent with every refund. Defaults to None.
+            customer_note (str, optional): Customer reason sent with every refund. Defaults to None.
+            filters: Passed to load_existing e.g. from_date
+
+        Returns:
+            Counter: refunded, failed, already_refunded, done (finished in an earlier run)
+                and error (network errors, retried by the next run)
+        """
+
+        self.load_existing(**filters)
+        notes = {key: value for key, value in (('currency', currency), ('merchant_note', merchant_note),
+                                               ('customer_note', customer_note)) if value}
+        summary = Counter()
+
+        def todo():
+            for transaction, amount in refunds:
+                key = str(transaction)
+                if self.journal.state(key) in (REFUNDED, FAILED):
+                    summary['done'] += 1
+                    continue
+                with self._lock:
+                    if key in self.index:
+                        summary['already_refunded'] += 1
+                        continue
+                    # reserve the transaction so a repeat in the input is skipped
+                    self.index[key] = None
+                yield transaction, amount
+
+        def refund(item):
+            return self._refund(*item, notes)
+
+        for item, outcome, error in run_concurrently(refund, todo(), self.workers, self.rate_limiter):
+            summary['error' if error else outcome] += 1
+        return summary
+
+    def _refund(self, transaction, amount, notes):
+        key = str(transaction)
+        kwargs = dict(notes)
+        if amount is not None:
+            kwargs['amount'] = amount
+
+        self.journal.write(key, STARTED, amount=amount)
+        # a refund has no idempotency key, only retry when the request cannot have reached Paystack
+        response = retry(self.refund.create, transaction, instrumentation=self.refund.instrumentation,
+                         route='POST /refund', retry_on=(ConnectionRefusedError,), **kwargs)
+        if not response.get('status'):
+            self.journal.write(key, FAILED, message=response.get('message'))
+            return FAILED
+
+        data = response.get('data') or {}
+        with self._lock:
+            self.index[key] = data
+        self.journal.write(key, REFUNDED, refund_id=data.get('id'), status=data.get('status'))
+        return REFUNDED
@@ -0,0 +1,240 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter
+from typing import Mapping, Union
+
+from ..routes.virtual_accounts import DedicatedVirtualAccounts
+from ..utilities import settings, util
+from ..utilities.concurrency import run_concurrently
+from ..utilities.metrics import Histogram
+from ..utilities.ratelimit import RateLimiter
+from .billing import parse_date
+
+DAY = 86400.0
+
+# seconds between an inbound transfer being paid and it being seen
+DETECTION_BUCKETS = (60.0, 300.0, 900.0, 1800.0, 3600.0, 7200.0, 21600.0, DAY)
+
+
+class ScheduledAccount:
+
+    """A dedicated account in the requery queue, activity is the inbound transfers expected per day"""
+
+    __slots__ = ('account_number', 'provider_slug', 'activity', 'last_requery', 'due')
+
+    def __init__(self, account_number: str, provider_slug: str, activity: float, last_requery: float) -> None:
+        self.account_number = account_number
+        self.provider_slug = provider_slug
+        self.activity = activity
+        self.last_requery = last_requery
+        self.due = None
+
+    def __repr__(self):
+        return f'ScheduledAccount({self.account_number!r}, {self.provider_slug!r}, activity={self.activity})'
+
+
+class RequeryScheduler:
+
+    """
+    Requeries dedicated accounts for missed inbound transfers, busiest and longest unchecked accounts first
+
+        scheduler = RequeryScheduler(DedicatedVirtualAccounts(key), budgets={'wema-bank': 2, 'access-bank': 1})
+        scheduler.add('9000000001', 'wema-bank', activity=40)
+        scheduler.run(stop_event)
+        scheduler.record_credit('9000000001', paid_at)   # e.g. from the charge.success webhook
+
+    An account is due one interval after its last requery, the interval being a day divided by its
+    activity, clamped to min_interval and max_interval. Due accounts are kept in a heap ordered by due
+    time then activity, one heap per provider, and taken a batch at a time. Every provider has its own
+    budget of requeries per second, accounts over their provider's budget wait for the next batch
+    without holding up the other providers.
+    """
+
+    def __init__(self, virtual_accounts: DedicatedVirtualAccounts, budgets: Mapping[str, float] = None, workers: int = 4, rate_limiter: RateLimiter = None, min_interval: float = 300.0, max_interval: float = DAY, batch_size: int = 50) -> None:
+        """
+        Args:
+            virtual_accounts (DedicatedVirtualAccounts): Used to requery the accounts
+            budgets (Mapping[str, float], optional): Requeries per second allowed per provider slug. Defaults to 1 for every provider.
+            workers (int, optional): Requeries sent at the same time. Defaults to 4.
+            rate_limiter (RateLimiter, optional): Limits how fast requeries are sent over all providers. Defaults to None.
+            min_interval (float, optional): Shortest time in seconds between two requeries of an account. Defaults to 300.
+            max_interval (float, optional): Longest time in seconds between two requeries of an account. Defaults to a day.
+            batch_size (int, optional): Most accounts requeried per batch. Defaults to 50.
+        """
+
+        budgets = budgets or {}
+        self.virtual_accounts = virtual_accounts
+        self.limiters = {slug: RateLimiter(budgets.get(slug, 1.0))
+                         for slug in settings.VIRTUAL_ACCOUNT_PROVIDERS}
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.batch_size = batch_size
+        self.counters = Counter()
+        self.detection = Histogram(DETECTION_BUCKETS)
+        self._accounts = {}
+        self._heaps = {slug: [] for slug in settings.VIRTUAL_ACCOUNT_PROVIDERS}
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'RequeryScheduler(accounts={len(self._accounts)})'
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def __contains__(self, account_number):
+        return account_number in self._accounts
+
+    def interval(self, activity: float) -> float:
+        """Seconds between two requeries of an account expecting activity inbound transfers a day"""
+
+        if activity <= 0:
+            return self.max_interval
+        return min(self.max_interval, max(self.min_interval, DAY / activity))
+
+    def _schedule(self, account, due):
+        # the heaps may hold stale entries of an account, only the one matching account.due counts
+        account.due = due
+        heapq.heappush(self._heaps[account.provider_slug], (due, -account.activity, next(self._order), account))
+
+    def add(self, account_number: str, provider_slug: str, activity: float = 1.0, last_requery: float = None) -> ScheduledAccount:
+        """Queue an account, or update its activity if it is queued already
+
+        Args:
+            account_number (str): Dedicated account number
+            provider_slug (str): The bank's slug e.g. wema-bank
+            activity (float, optional): Inbound transfers expected per day. Defaults to 1.0.
+            last_requery (float, optional): Timestamp of the last requery, never requeried if None so it is due now. Defaults to None.
+        """
+
+        account_number = util.check_account_number(account_number)
+        provider_slug = util.check_membership(
+            settings.VIRTUAL_ACCOUNT_PROVIDERS, provider_slug, 'provider_slug')
+        with self._lock:
+            account = self._accounts.get(account_number)
+            if account is None:
+                account = self._accounts[account_number] = ScheduledAccount(
+                    account_number, provider_slug, activity, last_requery)
+            else:
+                account.provider_slug = provider_slug
+                account.activity = activity
+            due = account.last_requery + self.interval(activity) if account.last_requery is not None else 0.0
+            self._schedule(account, due)
+        return account
+
+    def remove(self, account_number: str) -> bool:
+        with self._lock:
+            account = self._accounts.pop(account_number, None)
+            if account is not None:
+                account.due = None
+        return account is not None
+
+    def _head(self, heap):
+        # drops the stale entries on top of a heap and returns the top one, None if empty
+        while heap and heap[0][3].due != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def next_due(self) -> Union[float, None]:
+        """When the next account is due, None if no account is queued"""
+
+        with self._lock:
+            heads = [self._head(heap) for heap in self._heaps.values()]
+            dues = [head[0] for head in heads if head is not None]
+            return min(dues) if dues else None
+
+    def _take(self, now):
+        # pops up to batch_size due accounts, one provider at a time in turn while it has budget left
+        batch = []
+        with self._lock:
+            providers = list(self._heaps)
+            while providers and len(batch) < self.batch_size:
+                for slug in list(providers):
+                    head = self._head(self._heaps[slug])
+                    if head is None or head[0] > now:
+                        providers.remove(slug)
+                    elif not self.limiters[slug].try_acquire():
+                        self.counters['over_budget'] += 1
+                        providers.remove(slug)
+                    else:
+                        account = heapq.heappop(self._heaps[slug])[3]
+                        account.due = None
+                        batch.append(account)
+                        if len(batch) == self.batch_size:
+                            break
+        return batch
+
+    def run_once(self, now: float = None) -> Counter:
+        """Requery one batch of due accounts
+
+        Returns:
+            Counter: requeried, failed and error (network errors) for the batch
+        """
+
+        now = time.time() if now is None else now
+        summary = Counter()
+        instrumentation = self.virtual_accounts.instrumentation
+        for account, response, error in run_concurrently(self._requery, self._take(now), self.workers, self.rate_limiter):
+            outcome = 'error' if error else 'requeried' if response.get('status') else 'failed'
+            summary[outcome] += 1
+            if instrumentation is not None:
+                # the provider goes in the counter name so the route label stays a route
+                instrumentation.incr(f'requeries.{account.provider_slug}', 'GET /dedicated_account/requery')
+            with self._lock:
+                if account.account_number not in self._accounts:
+                    continue
+                account.last_requery = now
+                self._schedule(account, now + (self.min_interval if error else self.interval(account.activity)))
+        with self._lock:
+            self.counters.update(summary)
+        return summary
+
+    def _requery(self, account):
+        return self.virtual_accounts.requery(account.account_number, account.provider_slug)
+
+    def run(self, stop: threading.Event, idle: float = 1.0):
+        """Requery due accounts in batches until stop is set, sleeping at most idle seconds between batches"""
+
+        while not stop.is_set():
+            self.run_once()
+            due = self.next_due()
+            wait = idle if due is None else min(idle, max(0.0, due - time.time()))
+            stop.wait(wait)
+
+    def record_credit(self, account_number: str, paid_at: Union[float, str], detected_at: float = None) -> float:
+        """Record an inbound transfer as detected, e.g. from a webhook, and return its detection latency in seconds
+
+        Args:
+            account_number (str): Dedicated account credited
+            paid_at (Union[float, str]): Timestamp or ISO 8601 time the customer paid
+            detected_at (float, optional): Timestamp it was seen. Defaults to now.
+        """
+
+        if isinstance(paid_at, str):
+            paid_at = parse_date(paid_at).timestamp()
+        detected_at = time.time() if detected_at is None else detected_at
+        latency = max(0.0, detected_at - paid_at)
+        with self._lock:
+            self.detection.observe(latency)
+            account = self._accounts.get(account_number)
+            self.counters['credits'] += 1
+            if account is not None and account.last_requery is not None and paid_at < account.last_requery:
+                # paid before the last requery, so it was only found late
+                self.counters['late_credits'] += 1
+        return latency
+
+    def metrics(self) -> dict:
+        """Counters, queue size and detection latency percentiles in seconds"""
+
+        with self._lock:
+            detection = self.detection.snapshot()
+            detection['p90'] = self.detection.percentile(90)
+            return {
+                'accounts': len(self._accounts),
+                'counters': dict(self.counters),
+                'detection_latency': detection,
+            }
@@ -0,0 +1,239 @@
+import threading
+import time
+from collections import Counter
+from typing import Iterable, Mapping, Union
+
+from ..routes.transfer import Transfer
+from ..routes.transfer_control import TransferControl
+from ..utilities import util
+from ..utilities.concurrency import retry, run_concurrently
+from ..utilities.ratelimit import RateLimiter
+
+# transfer states, otp while it waits for its code
+OTP = 'otp'
+FINALIZED = 'finalized'
+FAILED = 'failed'
+EXPIRED = 'expired'
+
+# transfer statuses that need no OTP
+SENT_STATUSES = ('success', 'pending', 'received')
+
+# fields of a transfer row passed on to Transfer.initiate, the rest are left out
+TRANSFER_FIELDS = ('amount', 'recipient', 'reason', 'currency', 'reference')
+
+OTP_TTL = 600.0
+
+
+class PendingTransfer:
+
+    """A row of the OTP table, expires_at is when its OTP stops being valid"""
+
+    __slots__ = ('transfer_code', 'reference', 'amount', 'state', 'expires_at', 'attempts', 'message')
+
+    def __init__(self, transfer_code: str, reference: str, amount: int, expires_at: float) -> None:
+        self.transfer_code = transfer_code
+        self.reference = reference
+        self.amount = amount
+        self.state = OTP
+        self.expires_at = expires_at
+        self.attempts = 0
+        self.message = None
+
+    def __repr__(self):
+        return f'PendingTransfer({self.transfer_code!r}, {self.state!r}, attempts={self.attempts})'
+
+
+class TransferOTPQueue:
+
+    """
+    Initiates payouts that need an OTP and finalizes them together once the codes are in, e.g.
+
+        queue = TransferOTPQueue(Transfer(key), TransferControl(key), workers=16)
+        queue.initiate([{'amount': 50000, 'recipient': 'RCP_...', 'reason': 'June payout'}, ...])
+        queue.pending()                                   # transfers waiting for their OTP, soonest to expire first
+        queue.finalize({'TRF_1ptvuv321ahaa7q': '928783', ...})
+        queue.resend()                                    # new OTPs for the expired ones
+
+    Every transfer gets a reference before it is initiated. An initiate is never sent twice, one that
+    fails on the network or is refused is looked up by its reference, since it may have gone through.
+    Transfers Paystack answers with the otp status go into a table keyed by transfer code that holds
+    their state, OTP expiry and finalize attempts. A wrong OTP leaves a transfer waiting for another code.
+    """
+
+    def __init__(self, transfer: Transfer, transfer_control: TransferControl = None, workers: int = 8, rate_limiter: RateLimiter = None, otp_ttl: float = OTP_TTL) -> None:
+        """
+        Args:
+            transfer (Transfer): Used to initiate and finalize the transfers
+            transfer_control (TransferControl, optional): Used to resend OTPs. Defaults to None.
+            workers (int, optional): Transfers initiated or finalized at the same time. Defaults to 8.
+            rate_limiter (RateLimiter, optional): Limits how fast requests are sent. Defaults to None.
+            otp_ttl (float, optional): Seconds an OTP stays valid. Defaults to 600.
+        """
+
+        self.transfer = transfer
+        self.transfer_control = transfer_control
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.otp_ttl = otp_ttl
+        self.table = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'TransferOTPQueue(transfers={len(self.table)})'
+
+    def __len__(self):
+        return len(self.table)
+
+    def add(self, transfer_code: str, reference: str = None, amount: int = None, expires_at: float = None) -> PendingTransfer:
+        """Track a transfer initiated elsewhere that is waiting for its OTP"""
+
+        pending = PendingTransfer(transfer_code, reference, amount,
+                                  expires_at or time.time() + self.otp_ttl)
+        with self._lock:
+            self.table[transfer_code] = pending
+        return pending
+
+    def initiate(self, transfers: Iterable[dict], source: str = 'balance') -> Counter:
+        """Initiate every transfer and queue the ones waiting for an OTP
+
+        Args:
+            transfers (Iterable[dict]): Transfers with amount, recipient and optionally reason, currency and reference, other fields are ignored
+            source (str, optional): Where the money comes from. Defaults to 'balance'.
+
+        Returns:
+            Counter: otp (queued), sent (no OTP needed), invalid, failed and error (network errors)
+        """
+
+        summary = Counter()
+
+        def todo():
+            for transfer in transfers:
+                fields = {field: transfer[field] for field in TRANSFER_FIELDS if transfer.get(field) is not None}
+                try:
+                    yield self.transfer.get_payload(fields, generate_reference=True)
+                except util.VALIDATION_ERRORS:
+                    summary['invalid'] += 1
+
+        def initiate(payload):
+            try:
+                response = self.transfer.initiate(source, **payload)
+            except OSError:
+                found = self._lookup(payload['reference'])
+                if found is None:
+                    raise
+                return found
+            if not response.get('status'):
+                # e.g. a duplicate reference of a transfer that did go through
+                return self._lookup(payload['reference']) or response
+            return response
+
+        for payload, response, error in run_concurrently(initiate, todo(), self.workers, self.rate_limiter):
+            if error:
+                summary['error'] += 1
+                continue
+            data = response.get('data') or {}
+            if not response.get('status'):
+                summary[FAILED] += 1
+            elif data.get('status') == OTP:
+                self.add(data['transfer_code'], payload['reference'], payload['amount'])
+                summary[OTP] += 1
+            else:
+                summary['sent' if data.get('status') in SENT_STATUSES else FAILED] += 1
+        return summary
+
+    def _lookup(self, reference):
+        # the transfer Paystack has under reference, None if it has none
+        response = retry(self.transfer.verify, reference, instrumentation=self.transfer.instrumentation,
+                         route='GET /transfer/verify/:id')
+        return response if response.get('status') else None
+
+    def expire(self, now: float = None) -> int:
+        """Mark the transfers whose OTP has run out as expired and return how many were marked"""
+
+        now = time.time() if now is None else now
+        count = 0
+        with self._lock:
+            for pending in self.table.values():
+                if pending.state == OTP and pending.expires_at <= now:
+                    pending.state = EXPIRED
+                    count += 1
+        return count
+
+    def pending(self, now: float = None) -> list:
+        """Transfers waiting for an OTP, soonest to expire first"""
+
+        self.expire(now)
+        with self._lock:
+            waiting = [pending for pending in self.table.values() if pending.state == OTP]
+        waiting.sort(key=lambda pending: pending.expires_at)
+        return waiting
+
+    def finalize(self, otps: Mapping[str, str]) -> dict:
+        """Finalize the transfers of transfer code -> OTP concurrently
+
+        Returns:
+            dict: transfer code -> state after the attempt, transfers that are not waiting for an OTP are left out
+        """
+
+        self.expire()
+        with self._lock:
+            todo = [(self.table[code], otp) for code, otp in otps.items()
+                    if code in self.table and self.table[code].state == OTP]
+
+        results = {}
+        for (pending, _), state, error in run_concurrently(self._finalize, todo, self.workers, self.rate_limiter):
+            if error:
+                pending.message = str(error)
+            results[pending.transfer_code] = pending.state
+        return results
+
+    def _finalize(self, item):
+        pending, otp = item
+        response = self.transfer.finalize(pending.transfer_code, otp)
+        data = response.get('data') or {}
+        with self._lock:
+            pending.attempts += 1
+            if not response.get('status'):
+                # most often a wrong OTP, the transfer keeps waiting for the right one
+                pending.message = response.get('message')
+                return pending.state
+            pending.state = FINALIZED if data.get('status') in SENT_STATUSES else FAILED
+            pending.message = data.get('reason') or response.get('message')
+            return pending.state
+
+    def resend(self, transfer_codes: Union[Iterable[str], None] = None) -> Counter:
+        """Ask for new OTPs, for the given transfers or every expired one, and wait for them again
+
+        Returns:
+            Counter: resent, failed and error (network errors)
+        """
+
+        if self.transfer_control is None:
+            raise ValueError('a TransferControl is needed to resend OTPs')
+        self.expire()
+        with self._lock:
+            if transfer_codes is None:
+                todo = [pending for pending in self.table.values() if pending.state == EXPIRED]
+            else:
+                todo = [self.table[code] for code in transfer_codes
+                        if code in self.table and self.table[code].state in (OTP, EXPIRED)]
+
+        def resend(pending):
+            return self.transfer_control.resend_otp(pending.transfer_code, 'transfer')
+
+        summary = Counter()
+        for pending, response, error in run_concurrently(resend, todo, self.workers, self.rate_limiter):
+            if error or not response.get('status'):
+                summary['error' if error else FAILED] += 1
+                continue
+            with self._lock:
+                pending.state = OTP
+                pending.expires_at = time.time() + self.otp_ttl
+            summary['resent'] += 1
+        return summary
+
+    def summary(self) -> Counter:
+        """How many transfers are in each state"""
+
+        with self._lock:
+            return Counter(pending.state for pending in self.table.values())
@@ -0,0 +1,182 @@
+import csv
+import threading
+import zlib
+from collections import Counter
+from typing import Iterable, Union
+
+from ..routes.virtual_accounts import DedicatedVirtualAccounts
+from ..utilities import settings
+from ..utilities.concurrency import retry, run_concurrently
+from ..utilities.errors import APIError
+from ..utilities.journal import Journal
+from ..utilities.pagination import paginate
+from ..utilities.ratelimit import RateLimiter
+
+# journal states, an account is written as started before it is requested
+STARTED = 'started'
+ASSIGNED = 'assigned'
+FAILED = 'failed'
+
+
+def account_keys(account: dict) -> list:
+    """Customer id and code a dedicated account is assigned to, as strings"""
+
+    customer = account.get('customer')
+    if not isinstance(customer, dict):
+        return [str(customer)] if customer is not None else []
+    return [str(key) for key in (customer.get('id'), customer.get('customer_code')) if key is not None]
+
+
+class AccountProvisioner:
+
+    """
+    Assigns a dedicated virtual account to every customer of a list, e.g. an existing customer base
+
+        provisioner = AccountProvisioner(DedicatedVirtualAccounts(key), 'accounts.jsonl', workers=16, rate_limiter=RateLimiter(20))
+        provisioner.run(customer_codes())   # Counter({'assigned': 498000, 'existing': 1990, 'failed': 10})
+        provisioner.write_mapping('accounts.csv')
+
+    The available providers are fetched once, and each customer gets the preferred bank, or one picked
+    from the providers by a hash of the customer so a rerun picks the same bank. Accounts already on the
+    integration are loaded once into an index keyed by customer id and code and skipped. Every account
+    is written to the journal, which doubles as the customer -> account number mapping table, and a
+    rerun with the same journal only requests the customers that are not assigned yet.
+    """
+
+    def __init__(self, virtual_accounts: DedicatedVirtualAccounts, journal: Union[Journal, str], workers: int = 8, rate_limiter: RateLimiter = None, preferred_bank: str = None) -> None:
+        """
+        Args:
+            virtual_accounts (DedicatedVirtualAccounts): Used to list providers and list and create accounts
+            journal (Union[Journal, str]): Journal, or the path of its file, recording every account
+            workers (int, optional): Accounts created at the same time. Defaults to 8.
+            rate_limiter (RateLimiter, optional): Limits how fast accounts are created. Defaults to None.
+            preferred_bank (str, optional): Provider slug used for every account, spread over the available providers if None. Defaults to None.
+        """
+
+        self.virtual_accounts = virtual_accounts
+        self.journal = Journal(journal) if isinstance(journal, str) else journal
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.preferred_bank = preferred_bank
+        self.index = {}
+        self._providers = None
+        self._providers_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'AccountProvisioner(journal={self.journal.path!r}, indexed={len(self.index)})'
+
+    def providers(self) -> list:
+        """Slugs of the available providers this library supports, fetched once
+
+        Raises:
+            APIError: raised when the providers cannot be fetched
+        """
+
+        with self._providers_lock:
+            if self._providers is not None:
+                self.virtual_accounts.instrumentation.incr('cache_hits', 'GET /dedicated_account/available_providers')
+                return self._providers
+            # the workers wait for the first fetch instead of each sending their own
+            response = self.virtual_accounts.fetch_bank_providers()
+            if not response.get('status'):
+                raise APIError(response)
+            slugs = [provider.get('provider_slug') for provider in response.get('data') or []]
+            providers = [slug for slug in slugs if slug in settings.VIRTUAL_ACCOUNT_PROVIDERS]
+            if not providers:
+                raise ValueError('no supported dedicated account provider is available')
+            self._providers = providers
+            return providers
+
+    def bank_for(self, customer: Union[int, str]) -> str:
+        if self.preferred_bank:
+            return self.preferred_bank
+        providers = self.providers()
+        return providers[zlib.crc32(str(customer).encode()) % len(providers)]
+
+    def load_existing(self, per_page: int = 100, **filters) -> int:
+        """Index the dedicated accounts on the integration by customer id and code and return how many were indexed"""
+
+        self.index.clear()
+        count = 0
+        for account in paginate(self.virtual_accounts.list_accounts, per_page=per_page, **filters):
+            for key in account_keys(account):
+                self.index[key] = account
+            count += 1
+        return count
+
+    def run(self, customers: Iterable[Union[int, str]], **filters) -> Counter:
+        """Create a dedicated account for every customer id or code that does not have one
+
+        Args:
+            customers (Iterable[Union[int, str]]): Customer ids or codes, read as the workers need them
+            filters: Passed to load_existing e.g. active=True
+
+        Returns:
+            Counter: assigned, existing, done (assigned in an earlier run), failed
+                and error (network errors), failed and errored customers are tried again by the next run
+        """
+
+        self.load_existing(**filters)
+        summary = Counter()
+
+        def todo():
+            for customer in customers:
+                key = str(customer)
+                if self.journal.state(key) == ASSIGNED:
+                    summary['done'] += 1
+                    continue
+                with self._lock:
+                    existing = self.index.get(key, False)
+                    if existing is False:
+                        # reserve the customer so a repeat in the input is skipped
+                        self.index[key] = None
+                if existing is False:
+                    yield customer
+                    continue
+                summary['existing'] += 1
+                if existing is not None:
+                    self._record(key, existing, existing=True)
+
+        for customer, outcome, error in run_concurrently(self._create, todo(), self.workers, self.rate_limiter):
+            summary['error' if error else outcome] += 1
+        return summary
+
+    def _create(self, customer):
+        key = str(customer)
+        bank = self.bank_for(customer)
+        self.journal.write(key, STARTED, bank=bank)
+        # a customer gets one account per bank, only retry when the request cannot have reached Paystack
+        response = retry(self.virtual_accounts.create, customer, bank,
+                         instrumentation=self.virtual_accounts.instrumentation,
+                         route='POST /dedicated_account', retry_on=(ConnectionRefusedError,))
+        if not response.get('status'):
+            self.journal.write(key, FAILED, bank=bank, message=response.get('message'))
+            return FAILED
+
+        account = response.get('data') or {}
+        with self._lock:
+            self.index[key] = account
+        self._record(key, account)
+        return ASSIGNED
+
+    def _record(self, key, account, **data):
+        bank = account.get('bank')
+        self.journal.write(key, ASSIGNED, account_number=account.get('account_number'),
+                           bank=bank.get('slug') if isinstance(bank, dict) else bank, **data)
+
+    def mapping(self) -> dict:
+        """customer -> (account number, bank slug) of every account assigned in this or an earlier run"""
+
+        return {entry['key']: (entry.get('account_number'), entry.get('bank'))
+                for entry in self.journal.entries(ASSIGNED)}
+
+    def write_mapping(self, path: str) -> int:
+        """Write the mapping as a CSV file of customer, account_number, bank and return how many rows were written"""
+
+        mapping = self.mapping()
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(('customer', 'account_number', 'bank'))
+            writer.writerows((customer, *account) for customer, account in mapping.items())
+        return len(mapping)
@@ -9,7 +9,7 @@ setup(
 
     # Packages to include in the distribution:
 
-    packages=find_packages(),
+    packages=find_packages(exclude=['tests', 'tests.*', 'benchmarks', 'benchmarks.*']),
 
     # Project version number:
 
@@ -51,6 +51,10 @@ setup(
 
     install_requires=["python-dotenv"],
 
+    # Optional dependencies:
+
+    extras_require={"parquet": ["pyarrow"], "analytics": ["numpy"]},
+
     # https://pypi.org/classifiers/
 
     classifiers=[
@@ -0,0 +1,403 @@
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qsl, urlsplit
+
+from py4paystack.utilities.transport import Transport
+
+
+class Refused(Exception):
+
+    """Raised by a responder to answer with status false and the message, e.g. for a wrong OTP"""
+
+
+def transaction_record(index: int, reference: str = None) -> dict:
+    return {
+        'id': index,
+        'reference': reference or f'ref{index:010d}',
+        'amount': 10000 + index % 997 * 100,
+        'currency': ('NGN', 'GHS', 'USD', 'ZAR')[index % 4],
+        'status': ('success', 'success', 'success', 'failed', 'abandoned')[index % 5],
+        'channel': ('card', 'bank', 'ussd', 'bank_transfer')[index % 4],
+        'paid_at': f'2022-01-01T{index % 24:02d}:00:00.000Z',
+        'created_at': f'2022-01-01T{index % 24:02d}:00:00.000Z',
+        'customer': {
+            'id': index % 1000,
+            'email': f'customer{index % 1000}@example.com',
+            'customer_code': f'CUS_{index % 1000:010d}',
+        },
+    }
+
+
+def plan_record(index: int) -> dict:
+    return {
+        'id': index,
+        'plan_code': f'PLN_{index:010d}',
+        'name': f'Plan {index}',
+        'amount': 50000 * (index % 3 + 1),
+        'interval': ('daily', 'weekly', 'monthly', 'biannually', 'annually')[index % 5],
+        'currency': 'NGN',
+    }
+
+
+def subscription_record(index: int) -> dict:
+    return {
+        'id': index,
+        'subscription_code': f'SUB_{index:010d}',
+        'status': ('active', 'active', 'active', 'non-renewing', 'cancelled')[index % 5],
+        'amount': None,
+        'next_payment_date': f'2022-01-{index % 28 + 1:02d}T00:00:00.000Z',
+        'createdAt': '2021-12-01T00:00:00.000Z',
+        'plan': index % 10,
+        'customer': {
+            'id': index % 1000,
+            'email': f'customer{index % 1000}@example.com',
+            'customer_code': f'CUS_{index % 1000:010d}',
+        },
+        'authorization': {'authorization_code': f'AUTH_{index:010d}', 'reusable': True},
+    }
+
+
+def dispute_record(index: int) -> dict:
+    return {
+        'id': index,
+        'refund_amount': 0,
+        'currency': 'NGN',
+        'status': 'awaiting-merchant-feedback',
+        'category': 'chargeback',
+        # the list usually embeds the transaction, some disputes only carry its id
+        'transaction': transaction_record(index * 7) if index % 2 else index * 7,
+        'dueAt': f'2022-02-{28 - index % 28:02d}T00:00:00.000Z',
+        'createdAt': '2022-01-01T00:00:00.000Z',
+    }
+
+
+def refund_record(index: int) -> dict:
+    return {
+        'id': index,
+        'transaction': index * 2,
+        'transaction_reference': f'ref{index * 2:010d}',
+        'amount': 10000,
+        'currency': 'NGN',
+        'status': ('processed', 'processed', 'pending', 'failed')[index % 4],
+    }
+
+
+def customer_record(index: int) -> dict:
+    return {
+        'id': index,
+        'email': f'customer{index}@example.com',
+        'customer_code': f'CUS_{index:010d}',
+        'first_name': 'Ada',
+        'last_name': f'Customer{index}',
+        'phone': None,
+        'metadata': None,
+    }
+
+
+def recipient_record(index: int, details: dict = None) -> dict:
+    details = details or {'bank_code': '058', 'account_number': f'{index:010d}'}
+    return {
+        'id': index,
+        'recipient_code': f"RCP_{details['account_number']}",
+        'type': 'nuban',
+        'name': details.get('name') or f'Recipient {index}',
+        'currency': 'NGN',
+        'details': {
+            'bank_code': details['bank_code'],
+            'account_number': details['account_number'],
+            'account_name': details.get('name') or f'RECIPIENT {index}',
+        },
+    }
+
+
+def dedicated_account_record(index: int, customer=None, bank: str = 'wema-bank') -> dict:
+    if customer is None:
+        customer = f'CUS_{index:010d}'
+    return {
+        'id': index,
+        'account_number': f'{9000000000 + index}',
+        'account_name': f'PAYSTACK/CUSTOMER {index}',
+        'bank': {'slug': bank, 'name': bank.replace('-', ' ').title()},
+        'active': True,
+        'assigned': True,
+        'currency': 'NGN',
+        'customer': {'id': customer, 'customer_code': None} if isinstance(customer, int) else {'id': None, 'customer_code': customer},
+    }
+
+
+def ledger_record(index: int) -> dict:
+    return {
+        'id': index + 1,
+        'integration': 1,
+        'domain': 'test',
+        'currency': 'NGN',
+        'difference': (10000, -2500)[index % 2],
+        'balance': 1000000 + index // 2 * 7500 + (10000 if index % 2 == 0 else 0),
+        'reason': ('Transaction', 'Transfer')[index % 2],
+        'model_responsible': ('Transaction', 'Transfer')[index % 2],
+        'createdAt': f'2022-01-01T{index % 24:02d}:00:00.000Z',
+    }
+
+
+def record(collection: str, index: int) -> dict:
+    if collection == 'transaction':
+        return transaction_record(index)
+    if collection == 'subscription':
+        return subscription_record(index)
+    if collection == 'plan':
+        return plan_record(index)
+    if collection == 'dispute':
+        return dispute_record(index)
+    if collection == 'refund':
+        return refund_record(index)
+    if collection == 'customer':
+        return customer_record(index)
+    if collection == 'transferrecipient':
+        return recipient_record(index)
+    if collection == 'dedicated_account':
+        return dedicated_account_record(index)
+    return {'id': index, 'domain': 'test', 'createdAt': '2022-01-01T00:00:00.000Z'}
+
+
+class FakePaystack:
+
+    """
+    A local HTTP stand-in for api.paystack.co serving canned responses for the endpoints used in routes.
+    Latency, server errors and 429 rate limit responses can be injected to exercise client behaviour.
+
+        with FakePaystack(latency=0.02) as server:
+            trans = Transaction('sk_test_fake')
+            trans.transport = server.transport()
+            trans.verify('ref')
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0, total_records: int = 500, charge_status: str = 'success', transfer_status: str = 'success', seed: int = None) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.total_records = total_records
+        self.charge_status = charge_status
+        self.transfer_status = transfer_status
+        self.requests = Counter()
+        self.routes = []
+        self._random = random.Random(seed)
+        self._transfer_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+        self.route('GET', r'/transaction/verify/(?P<reference>[^/]+)',
+                   lambda match, query, body: transaction_record(1, match['reference']))
+        self.route('POST', r'/charge',
+                   lambda match, query, body: {'reference': body.get('reference') or 'ref0000000001', 'status': self.charge_status})
+        self.route('POST', r'/charge/submit_\w+',
+                   lambda match, query, body: {'reference': body.get('reference'), 'status': 'success'})
+        self.route('GET', r'/charge/(?P<reference>[^/]+)',
+                   lambda match, query, body: {'reference': match['reference'], 'status': 'success'})
+        self.route('POST', r'/bulkcharge',
+                   lambda match, query, body: {'batch_code': 'BCH_0000000001', 'total_charges': len(body), 'status': 'active'})
+        self.route('POST', r'/transfer/bulk',
+                   lambda match, query, body: [self._transfer(index, transfer) for index, transfer in enumerate(body['transfers'])])
+        self.route('POST', r'/transfer',
+                   lambda match, query, body: self._transfer(next(self._transfer_ids), body))
+        self.route('POST', r'/transfer/finalize_transfer', self._finalize_transfer)
+        self.route('POST', r'/transfer/resend_otp',
+                   lambda match, query, body: {})
+        self.route('POST', r'/transaction/charge_authorization',
+                   lambda match, query, body: {**transaction_record(1, body.get('reference')), 'amount': body.get('amount'), 'status': self.charge_status})
+        self.route('GET', r'/transaction/(?P<id>\d+)',
+                   lambda match, query, body: transaction_record(int(match['id'])))
+        self.route('POST', r'/dispute/(?P<id>\d+)/evidence',
+                   lambda match, query, body: {**body, 'id': int(match['id']) + 100000, 'dispute': int(match['id'])})
+        self.route('GET', r'/dispute/(?P<id>\d+)/upload_url',
+                   lambda match, query, body: {'signedUrl': f"{self.url}/uploads/{query.get('upload_filename')}", 'fileName': query.get('upload_filename')})
+        self.route('PUT', r'/uploads/(?P<name>[^/]+)',
+                   lambda match, query, body: {'size': len(body)})
+        self.route('PUT', r'/dispute/(?P<id>\d+)/resolve',
+                   lambda match, query, body: {**body, 'id': int(match['id']), 'status': 'resolved'})
+        self.route('POST', r'/refund',
+                   lambda match, query, body: {'id': 900000, 'transaction': body.get('transaction'), 'amount': body.get('amount'), 'status': 'pending'})
+        self.route('POST', r'/customer',
+                   lambda match, query, body: {**body, 'id': 700000, 'customer_code': 'CUS_new0000000'})
+        self.route('PUT', r'/customer/(?P<code>[^/]+)',
+                   lambda match, query, body: {**body, 'customer_code': match['code']})
+        self.route('POST', r'/transferrecipient/bulk',
+                   lambda match, query, body: {'success': [recipient_record(700000 + index, recipient) for index, recipient in enumerate(body['batch'])], 'errors': []})
+        self.route('GET', r'/bank/resolve',
+                   lambda match, query, body: {'account_number': query.get('account_number'), 'account_name': f"ACCOUNT {query.get('account_number')}", 'bank_id': 9})
+        self.route('POST', r'/dedicated_account',
+                   lambda match, query, body: dedicated_account_record(800000 + hash(str(body['customer'])) % 100000, body['customer'], body['preferred_bank']))
+        self.route('GET', r'/dedicated_account/available_providers',
+                   lambda match, query, body: [{'provider_slug': slug, 'bank_id': index, 'id': index} for index, slug in enumerate(('access-bank', 'wema-bank', 'titan-paystack'))])
+        self.route('GET', r'/dedicated_account/requery',
+                   lambda match, query, body: {})
+        self.route('GET', r'/balance/ledger', self._ledger)
+        self.route('POST', r'/paymentrequest',
+                   lambda match, query, body: {**body, 'id': next(self._transfer_ids), 'request_code': f'PRQ_{self._random.getrandbits(40):010x}', 'status': 'draft' if body.get('draft') else 'pending'})
+        self.route('POST', r'/paymentrequest/finalize/(?P<code>[^/]+)',
+                   lambda match, query, body: {'request_code': match['code'], 'status': 'pending'})
+        self.route('POST', r'/paymentrequest/notify/(?P<code>[^/]+)',
+                   lambda match, query, body: {})
+        self.route('GET', r'/plan/(?P<plan>[^/]+)',
+                   lambda match, query, body: plan_record(int(match['plan'].rpartition('_')[2])))
+        self.route('GET', r'/(?P<collection>\w+)', self._page)
+        self.route('GET', r'/balance',
+                   lambda match, query, body: [{'currency': 'NGN', 'balance': ledger_record(self.total_records - 1)['balance']}])
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def transport(self, **kwargs) -> Transport:
+        return Transport('127.0.0.1', self.port, secure=False, **kwargs)
+
+    def route(self, method: str, pattern: str, responder: Callable):
+        """Serve responder(match, query, body) as the data of every method request matching pattern,
+        or a status false response if it raises Refused. Routes added later take precedence over earlier ones.
+        """
+
+        self.routes.insert(0, (method, re.compile(pattern + '$'), responder))
+
+    def start(self) -> 'FakePaystack':
+        handler = type('Handler', (_Handler,), {'fake': self})
+        self._server = _Server(('127.0.0.1', 0), handler)
+        # a short poll interval keeps stop quick, every test stops a server
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def respond(self, method: str, path: str, body: bytes):
+        """Return the status, headers and envelope for a request"""
+
+        parts = urlsplit(path)
+        with self._lock:
+            self.requests[f'{method} {parts.path}'] += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            rate_limited = self._random.random() < self.rate_limit_rate
+            failed = self._random.random() < self.error_rate
+
+        if delay:
+            time.sleep(delay)
+        if rate_limited:
+            return 429, {'Retry-After': '1'}, {'status': False, 'message': 'Too many requests'}
+        if failed:
+            return 500, {}, {'status': False, 'message': 'Internal server error'}
+
+        query = dict(parse_qsl(parts.query))
+        try:
+            body = json.loads(body) if body else {}
+        except ValueError:
+            # raw uploads
+            pass
+        for route_method, pattern, responder in self.routes:
+            match = pattern.match(parts.path)
+            if route_method == method and match:
+                try:
+                    data = responder(match, query, body)
+                except Refused as error:
+                    return 400, {}, {'status': False, 'message': str(error)}
+                break
+        else:
+            data = {}
+
+        envelope = {'status': True, 'message': 'OK'}
+        if isinstance(data, tuple):
+            data, envelope['meta'] = data
+        envelope['data'] = data
+        return 200, {}, envelope
+
+    def _page(self, match, query, body):
+        per_page = int(query.get('perPage', 50))
+        page = int(query.get('page', 1))
+        start = (page - 1) * per_page
+        stop = min(start + per_page, self.total_records)
+        meta = {
+            'total': self.total_records,
+            'skipped': start,
+            'perPage': per_page,
+            'page': page,
+            'pageCount': -(-self.total_records // per_page),
+        }
+        return [record(match['collection'], index) for index in range(start, stop)], meta
+
+    def _ledger(self, match, query, body):
+        # newest entry first like the ledger endpoint
+        records, meta = self._page({'collection': 'ledger'}, query, body)
+        return [ledger_record(self.total_records - 1 - record['id']) for record in records], meta
+
+    def _finalize_transfer(self, match, query, body):
+        # any OTP but 000000 is accepted
+        if body.get('otp') == '000000':
+            raise Refused('Invalid OTP')
+        return {'transfer_code': body.get('transfer_code'), 'status': 'success'}
+
+    def _transfer(self, index, transfer):
+        return {
+            'reference': transfer.get('reference'),
+            'recipient': transfer.get('recipient'),
+            'amount': transfer.get('amount'),
+            'transfer_code': f'TRF_{index:010d}',
+            'currency': transfer.get('currency', 'NGN'),
+            'status': self.transfer_status,
+        }
+
+
+class _Server(ThreadingHTTPServer):
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # clients hang up on the losing attempt of a hedged request
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    fake = None
+
+    def _serve(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        status, headers, envelope = self.fake.respond(
+            self.command, self.path, self.rfile.read(length) if length else b'')
+        data = json.dumps(envelope).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,47 @@
+import unittest
+
+from py4paystack.routes.transaction import Transaction
+from py4paystack.workflows.analytics import TransactionAnalytics
+
+from .fake_server import FakePaystack, transaction_record
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestTransactionAnalytics(unittest.TestCase):
+
+    def test_pull_groups_every_transaction(self):
+        with FakePaystack(total_records=200) as server:
+            analytics = TransactionAnalytics()
+            self.assertEqual(analytics.pull(Transaction('sk_test_fake', transport=server.transport()), per_page=50), 200)
+
+        records = [transaction_record(index) for index in range(200)]
+        groups = analytics.group_by('currency', 'status')
+        self.assertEqual(sum(stats['count'] for stats in groups.values()), 200)
+        ngn_success = [record['amount'] for record in records if record['currency'] == 'NGN' and record['status'] == 'success']
+        self.assertEqual(groups[('NGN', 'success')]['sum'], sum(ngn_success))
+        self.assertEqual(analytics.totals()['total_transactions'], 200)
+
+    def test_refreshed_transaction_replaces_its_row(self):
+        analytics = TransactionAnalytics()
+        pending = {**transaction_record(1), 'status': 'pending', 'amount': 5000}
+        other = {**transaction_record(2), 'status': 'success', 'amount': 7000}
+        self.assertEqual(analytics.add([pending, other]), 2)
+
+        self.assertEqual(analytics.add([{**pending, 'status': 'success'}]), 0)
+        self.assertEqual(len(analytics), 2)
+        groups = analytics.group_by('status', percentiles=())
+        self.assertEqual(list(groups), [('success',)])
+        self.assertEqual(groups[('success',)]['sum'], 12000)
+
+    def test_unknown_dimension_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TransactionAnalytics().group_by('country')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import datetime
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from py4paystack.routes.plan import Plan
+from py4paystack.routes.subscription import Subscription
+from py4paystack.routes.transaction import Transaction
+from py4paystack.workflows.billing import CHARGED, FAILED, STARTED, BillingSweeper, add_interval
+
+from .fake_server import FakePaystack, Refused, plan_record, transaction_record
+
+NOW = datetime.datetime(2022, 2, 1, tzinfo=datetime.timezone.utc)
+
+SUBSCRIPTION = {
+    'subscription_code': 'SUB_0000000001',
+    'customer': {'email': 'customer1@example.com'},
+    'authorization': {'authorization_code': 'AUTH_0000000001'},
+    'amount': 50000,
+}
+PLAN = {'amount': 50000, 'currency': 'NGN'}
+REFERENCE = 'renewal.SUB-0000000001.20220101'
+
+
+class TestBillingSweeper(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack(total_records=20).start()
+        # transactions by reference, charges with a reference Paystack already has are refused
+        self.charges = {}
+        self.server.route('POST', r'/transaction/charge_authorization', self.charge)
+        self.server.route('GET', r'/transaction/verify/(?P<reference>[^/]+)', self.verify)
+
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+        transport = self.server.transport()
+        self.sweeper = BillingSweeper(Transaction('sk_test_fake', transport=transport),
+                                      Subscription('sk_test_fake', transport=transport),
+                                      Plan('sk_test_fake', transport=transport), self.path)
+
+    def tearDown(self):
+        self.sweeper.journal.close()
+        self.server.stop()
+        os.remove(self.path)
+
+    def charge(self, match, query, body):
+        if body['reference'] in self.charges:
+            raise Refused('Duplicate Transaction Reference')
+        self.charges[body['reference']] = {**transaction_record(1, body['reference']), 'status': 'success'}
+        return self.charges[body['reference']]
+
+    def verify(self, match, query, body):
+        if match['reference'] not in self.charges:
+            raise Refused('Transaction reference not found')
+        return self.charges[match['reference']]
+
+    def test_sweep_charges_every_due_subscription_once(self):
+        summary = self.sweeper.sweep(NOW)
+        # the fake lists 12 active subscriptions, all due in January
+        self.assertEqual(summary, {'charged': 12})
+        self.assertEqual(len(self.charges), 12)
+
+        self.assertEqual(self.sweeper.sweep(NOW), {'done': 12})
+        self.assertEqual(len(self.charges), 12)
+
+    def test_plan_is_fetched_once_by_concurrent_callers(self):
+        def slow_plan(match, query, body):
+            # keeps the first fetch in flight while the other threads ask for the plan
+            time.sleep(0.05)
+            return plan_record(int(match['plan']))
+
+        self.server.route('GET', r'/plan/(?P<plan>\d+)', slow_plan)
+        threads = [threading.Thread(target=self.sweeper.plan_for, args=({'plan': 3},)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.server.requests['GET /plan/3'], 1)
+        self.assertEqual(self.sweeper.plan_for({'plan': 3})['interval'], 'biannually')
+
+    def test_refused_charge_that_went_through_is_recorded_as_charged(self):
+        self.charges[REFERENCE] = {**transaction_record(1, REFERENCE), 'status': 'success'}
+        self.assertEqual(self.sweeper._renew((SUBSCRIPTION, PLAN, REFERENCE)), CHARGED)
+        self.assertEqual(self.sweeper.journal.state(REFERENCE), CHARGED)
+
+    def test_refused_charge_paystack_does_not_have_is_failed(self):
+        def refuse(match, query, body):
+            raise Refused('Invalid authorization code')
+
+        self.server.route('POST', r'/transaction/charge_authorization', refuse)
+        self.assertEqual(self.sweeper._renew((SUBSCRIPTION, PLAN, REFERENCE)), FAILED)
+        self.assertEqual(self.sweeper.journal.get(REFERENCE)['message'], 'Invalid authorization code')
+
+    def test_network_error_leaves_the_renewal_started_and_is_not_resent(self):
+        with mock.patch.object(self.sweeper.transaction, 'charge_authorization',
+                               side_effect=ConnectionResetError) as charge:
+            with self.assertRaises(ConnectionResetError):
+                self.sweeper._renew((SUBSCRIPTION, PLAN, REFERENCE))
+        self.assertEqual(charge.call_count, 1)
+        self.assertEqual(self.sweeper.journal.state(REFERENCE), STARTED)
+
+    def test_started_renewal_still_pending_is_not_charged_again(self):
+        self.sweeper.journal.write(REFERENCE, STARTED)
+        self.charges[REFERENCE] = {**transaction_record(1, REFERENCE), 'status': 'ongoing'}
+        self.assertEqual(self.sweeper._renew((SUBSCRIPTION, PLAN, REFERENCE)), 'pending')
+        self.assertEqual(self.sweeper.journal.state(REFERENCE), STARTED)
+        self.assertEqual(self.server.requests['POST /transaction/charge_authorization'], 0)
+
+    def test_started_renewal_paystack_never_got_is_charged(self):
+        self.sweeper.journal.write(REFERENCE, STARTED)
+        self.assertEqual(self.sweeper._renew((SUBSCRIPTION, PLAN, REFERENCE)), CHARGED)
+        self.assertIn(REFERENCE, self.charges)
+
+
+class TestIntervals(unittest.TestCase):
+
+    def test_monthly_interval_clamps_the_day(self):
+        date = datetime.datetime(2022, 1, 31, tzinfo=datetime.timezone.utc)
+        self.assertEqual(add_interval(date, 'monthly').date(), datetime.date(2022, 2, 28))
+        self.assertEqual(add_interval(date, 'annually').date(), datetime.date(2023, 1, 31))
+        self.assertEqual(add_interval(date, 'weekly').date(), datetime.date(2022, 2, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from py4paystack.routes.bulk_charges import BulkCharges
+from py4paystack.routes.transfer import Transfer
+from py4paystack.utilities.errors import BatchValidationError
+
+from .fake_server import FakePaystack
+
+RECIPIENT = 'RCP_1ptvuv321ahaa7q'
+
+
+class TestBulkValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack().start()
+        self.sent = []
+        self.server.route('POST', r'/transfer/bulk', lambda match, query, body: self.sent.append(body) or [])
+        transport = self.server.transport()
+        self.transfer = Transfer('sk_test_fake', transport=transport)
+        self.bulk_charges = BulkCharges('sk_test_fake', transport=transport)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_every_invalid_row_is_reported_and_nothing_is_sent(self):
+        with self.assertRaises(BatchValidationError) as caught:
+            self.transfer.initiate_bulk(
+                'balance',
+                {'amount': 50000, 'recipient': RECIPIENT, 'reference': 'payout-1'},
+                {'amount': 50000},
+                {'amount': 50000, 'recipient': 'CUS_1ptvuv321ahaa7q'},
+                {'amount': 50000, 'recipient': RECIPIENT, 'reference': 'payout-1'},
+                {'amount': 50000, 'recipient': RECIPIENT, 'currency': 'EUR'},
+            )
+        self.assertEqual([index for index, _ in caught.exception.errors], [1, 2, 3, 4])
+        self.assertIn('first used on row 0', caught.exception.errors[2][1])
+        self.assertIn('4 invalid rows', str(caught.exception))
+        self.assertEqual(self.server.requests, {})
+
+    def test_valid_rows_are_sent_with_generated_references(self):
+        self.transfer.initiate_bulk(
+            'balance',
+            {'amount': 50000, 'recipient': RECIPIENT, 'reference': 'payout-1'},
+            {'amount': 70000, 'recipient': RECIPIENT},
+        )
+        transfers = self.sent[0]['transfers']
+        self.assertEqual(transfers[0]['reference'], 'payout-1')
+        self.assertTrue(transfers[1]['reference'])
+        self.assertNotEqual(transfers[1]['reference'], 'payout-1')
+
+    def test_bulk_charge_amounts_must_be_positive_integers(self):
+        with self.assertRaises(BatchValidationError) as caught:
+            self.bulk_charges.initiate([('AUTH_n95vpedf', 2500), ('AUTH_n95vpedf', 0), ('AUTH_n95vpedf', '2500'), ('PLN_n95vpedf', 2500)])
+        self.assertEqual([index for index, _ in caught.exception.errors], [1, 2, 3])
+        self.assertEqual(self.server.requests, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
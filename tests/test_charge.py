@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+from py4paystack.routes.charge import Charge
+from py4paystack.utilities.errors import APIError, UnwantedArgumentsError
+from py4paystack.workflows.charge import ChargePoller, ChargeSession, SQLiteChargeSessionStore
+
+from .fake_server import FakePaystack
+
+CHARGE = {'email': 'customer@example.com', 'amount': 5000, 'authorization_code': 'AUTH_0000000001'}
+
+
+class ChargeTestCase(unittest.TestCase):
+
+    charge_status = 'pending'
+
+    def setUp(self):
+        self.server = FakePaystack(charge_status=self.charge_status).start()
+        self.charge = Charge('sk_test_fake', transport=self.server.transport())
+
+    def tearDown(self):
+        self.server.stop()
+
+
+class TestChargeSession(ChargeTestCase):
+
+    charge_status = 'send_pin'
+
+    def test_submit_follows_the_transitions(self):
+        session = ChargeSession.start(self.charge, reference='ref-pin', **CHARGE)
+        self.assertEqual(session.expects, 'pin')
+        session.submit(self.charge, '1234')
+        self.assertEqual(session.status, 'success')
+        self.assertTrue(session.done)
+        with self.assertRaises(UnwantedArgumentsError):
+            session.submit(self.charge, '1234')
+
+    def test_open_url_is_polled_like_a_pending_charge(self):
+        self.server.route('POST', r'/charge', lambda match, query, body: {
+            'reference': body['reference'], 'status': 'open_url', 'url': 'https://bank.example/3ds'})
+        session = ChargeSession.start(self.charge, reference='ref-3ds', **CHARGE)
+        self.assertTrue(session.pending)
+        self.assertIsNone(session.expects)
+        self.assertEqual(session.url, 'https://bank.example/3ds')
+
+    def test_rate_limited_answer_keeps_the_session_pending(self):
+        session = ChargeSession('ref-limited')
+        self.server.rate_limit_rate = 1.0
+        with self.assertRaises(APIError):
+            session.poll(self.charge)
+        self.assertTrue(session.pending)
+        self.assertEqual(session.message, 'Too many requests')
+
+
+class TestChargePoller(ChargeTestCase):
+
+    def test_polls_until_settled_and_keeps_failed_polls_pending(self):
+        poller = ChargePoller(self.charge)
+        for reference in ('ref-a', 'ref-b'):
+            poller.add(ChargeSession(reference))
+
+        self.server.rate_limit_rate = 1.0
+        errors = []
+        self.assertEqual(poller.poll_due(on_error=lambda session, error: errors.append(session.reference)), [])
+        self.assertEqual(sorted(errors), ['ref-a', 'ref-b'])
+        self.assertEqual(sorted(poller.errors), ['ref-a', 'ref-b'])
+        self.assertEqual(len(poller), 2)
+
+        self.server.rate_limit_rate = 0.0
+        settled = poller.poll_due(now=float('inf'))
+        self.assertEqual(sorted(session.status for session in settled), ['success', 'success'])
+        self.assertEqual(poller.errors, {})
+        self.assertEqual(len(poller), 0)
+
+    def test_sqlite_store_resumes_pending_sessions(self):
+        handle, path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        store = SQLiteChargeSessionStore(path)
+        ChargePoller(self.charge, store).add(ChargeSession('ref-stored', polls=2))
+        store.close()
+
+        poller = ChargePoller(self.charge, SQLiteChargeSessionStore(path))
+        poller.resume()
+        self.assertEqual(len(poller), 1)
+        self.assertEqual(poller.poll_due(now=float('inf'))[0].reference, 'ref-stored')
+        poller.store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from py4paystack.routes.customer import Customer
+from py4paystack.workflows.customers import CustomerUpsert, read_customers
+
+from .fake_server import FakePaystack, Refused
+
+CSV = '''email,first_name,last_name,metadata
+customer1@example.com,Ada,Customer1,
+CUSTOMER2@Example.com,Grace,Customer2,
+new@example.com,Ada,Lovelace,"{""plan"": ""gold""}"
+not-an-email,Ada,Lovelace,
+new@example.com,Ada,Lovelace,
+refused@example.com,Ada,Lovelace,
+'''
+
+
+class TestCustomerUpsert(unittest.TestCase):
+
+    def setUp(self):
+        # customer0@example.com to customer4@example.com exist, all named Ada Customer<n>
+        self.server = FakePaystack(total_records=5).start()
+        self.server.route('POST', r'/customer', self.create)
+        self.customer = Customer('sk_test_fake', transport=self.server.transport())
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.csv = os.path.join(directory.name, 'customers.csv')
+        with open(self.csv, 'w', encoding='utf-8') as file:
+            file.write(CSV)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def create(self, match, query, body):
+        if body['email'] == 'refused@example.com':
+            raise Refused('Email is blacklisted')
+        return {**body, 'id': 700000, 'customer_code': 'CUS_new0000000'}
+
+    def upsert(self):
+        upsert = CustomerUpsert(self.customer, os.path.join(self.directory, 'import.jsonl'), workers=2, batch_size=4)
+        self.addCleanup(upsert.journal.close)
+        return upsert
+
+    def test_only_new_and_changed_customers_are_sent(self):
+        self.assertEqual(next(iter(read_customers(self.csv)))['email'], 'customer1@example.com')
+        report = self.upsert().run(read_customers(self.csv))
+
+        self.assertEqual(+report['counts'], {'unchanged': 1, 'updated': 1, 'created': 1, 'invalid': 1, 'done': 1, 'failed': 1})
+        self.assertEqual(report['updated'], {'customer2@example.com': {'first_name': ('Ada', 'Grace')}})
+        self.assertEqual(report['invalid'][0][0], 3)
+        self.assertEqual(report['failed'], [('refused@example.com', 'Email is blacklisted')])
+        self.assertEqual(self.server.requests['POST /customer'], 2)
+        self.assertEqual(self.server.requests['PUT /customer/CUS_0000000002'], 1)
+
+    def test_rerun_only_retries_failed_rows(self):
+        self.upsert().run(read_customers(self.csv))
+        report = self.upsert().run(read_customers(self.csv))
+        self.assertEqual(+report['counts'], {'done': 4, 'invalid': 1, 'failed': 1})
+        self.assertEqual(self.server.requests['POST /customer'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from py4paystack.utilities.dedup import Deduplicator, MemoryDeduplicator, SQLiteDeduplicator
+
+
+class TestMemoryDeduplicator(unittest.TestCase):
+
+    def test_second_delivery_is_seen(self):
+        dedup = MemoryDeduplicator()
+        self.assertFalse(dedup.seen('charge.success:ref1'))
+        self.assertTrue(dedup.seen('charge.success:ref1'))
+        self.assertFalse(dedup.seen('charge.success:ref2'))
+
+    def test_least_recently_seen_key_is_evicted(self):
+        dedup = MemoryDeduplicator(maxsize=2)
+        dedup.seen('a')
+        dedup.seen('b')
+        dedup.seen('a')
+        dedup.seen('c')
+        self.assertEqual(len(dedup), 2)
+        self.assertIn('a', dedup)
+        self.assertNotIn('b', dedup)
+
+    def test_forgotten_key_is_new_again(self):
+        dedup = MemoryDeduplicator()
+        dedup.seen('a')
+        dedup.forget('a')
+        dedup.forget('never-seen')
+        self.assertFalse(dedup.seen('a'))
+
+    def test_store_without_seen_and_forget_cannot_be_created(self):
+        class Incomplete(Deduplicator):
+
+            def seen(self, key):
+                return False
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+class TestSQLiteDeduplicator(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'seen.db')
+
+    def dedup(self, **kwargs):
+        dedup = SQLiteDeduplicator(self.path, **kwargs)
+        self.addCleanup(dedup.close)
+        return dedup
+
+    def test_seen_keys_survive_a_restart(self):
+        first = self.dedup()
+        self.assertFalse(first.seen('a'))
+        first.close()
+        self.assertTrue(self.dedup().seen('a'))
+
+    def test_keys_evicted_from_memory_are_still_seen(self):
+        dedup = self.dedup(memory_size=1)
+        dedup.seen('a')
+        dedup.seen('b')
+        self.assertNotIn('a', dedup.memory)
+        self.assertTrue(dedup.seen('a'))
+
+    def test_forget_and_prune_remove_keys(self):
+        dedup = self.dedup()
+        dedup.seen('a')
+        dedup.seen('b')
+        dedup.forget('a')
+        self.assertNotIn('a', dedup)
+        self.assertFalse(dedup.seen('a'))
+        dedup.prune(max_age=-1)
+        dedup.memory.forget('b')
+        self.assertFalse(dedup.seen('b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from py4paystack.routes.disputes import Disputes
+from py4paystack.routes.transaction import Transaction
+from py4paystack.utilities.errors import APIError
+from py4paystack.workflows.disputes import Decision, DisputeRunner
+
+from .fake_server import FakePaystack, Refused
+
+
+class TestDisputeRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack(total_records=20).start()
+        transport = self.server.transport()
+        self.runner = DisputeRunner(Disputes('sk_test_fake', transport=transport),
+                                    Transaction('sk_test_fake', transport=transport))
+        handle, self.path = tempfile.mkstemp()
+        os.write(handle, b'receipt')
+        os.close(handle)
+
+    def tearDown(self):
+        self.server.stop()
+        os.remove(self.path)
+
+    def test_pending_joins_embedded_and_fetched_transactions(self):
+        disputes = self.runner.pending()
+        self.assertEqual(len(disputes), 20)
+        self.assertTrue(all(isinstance(dispute['transaction'], dict) for dispute in disputes))
+        deadlines = [dispute['dueAt'] for dispute in disputes]
+        self.assertEqual(deadlines, sorted(deadlines))
+
+    def test_handle_uploads_the_file_and_resolves_with_it(self):
+        data = self.runner.handle({'id': 3}, Decision('declined', 'Item was delivered', file=self.path))
+        self.assertEqual(data['upload_url'], os.path.basename(self.path))
+        self.assertEqual(data['status'], 'resolved')
+
+    def test_refused_resolve_is_reported_per_dispute(self):
+        def refuse(match, query, body):
+            raise Refused('Dispute already resolved')
+
+        self.server.route('PUT', r'/dispute/(?P<id>\d+)/resolve', refuse)
+        results = self.runner.run(lambda dispute, transaction: Decision('merchant-accepted', 'Refunded', transaction['amount']),
+                                  self.runner.pending()[:2])
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(isinstance(result, APIError) for result in results.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
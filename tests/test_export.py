@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+import sys
+import unittest
+from unittest import mock
+
+from py4paystack.routes.transaction import Transaction
+from py4paystack.utilities.errors import APIError
+from py4paystack.workflows.export import download_export, export_transactions
+
+from .fake_server import FakePaystack, Refused
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack(total_records=25).start()
+        self.server.route('GET', r'/transaction/export', self.export)
+        self.server.route('GET', r'/files/(?P<name>[^/]+)', self.file)
+        self.trans = Transaction('sk_test_fake', transport=self.server.transport())
+
+    def tearDown(self):
+        self.server.stop()
+
+    def export(self, match, query, body):
+        return {'path': f"{self.server.url}/files/{query.get('status', 'all')}.csv?signature=abc"}
+
+    def file(self, match, query, body):
+        if query.get('signature') != 'abc':
+            raise Refused('Request has expired')
+        return {'name': match['name']}
+
+    def test_csv_export_pages_through_every_transaction(self):
+        file = io.StringIO(newline='')
+        self.assertEqual(export_transactions(self.trans, file, per_page=10), 25)
+        written = list(csv.DictReader(io.StringIO(file.getvalue())))
+        self.assertEqual(len(written), 25)
+        self.assertEqual(written[3]['reference'], 'ref0000000003')
+        self.assertEqual(written[3]['paid_at'], '1641006000000')
+        self.assertEqual(self.server.requests['GET /transaction'], 3)
+
+    def test_parquet_without_pyarrow_is_an_import_error(self):
+        with mock.patch.dict(sys.modules, {'pyarrow': None, 'pyarrow.parquet': None}):
+            with self.assertRaisesRegex(ImportError, 'pip install pyarrow'):
+                export_transactions(self.trans, 'june.parquet', 'parquet')
+
+    def test_download_streams_the_export_through_the_transport(self):
+        file = io.BytesIO()
+        written = download_export(self.trans.export(status='success'), file, chunk_size=8, transport=self.trans.transport)
+        self.assertEqual(written, len(file.getvalue()))
+        self.assertEqual(json.loads(file.getvalue())['data'], {'name': 'success.csv'})
+        self.assertEqual(self.server.requests['GET /files/success.csv'], 1)
+
+    def test_failed_download_is_an_error(self):
+        file = io.BytesIO()
+        with self.assertRaisesRegex(APIError, 'status 400'):
+            download_export(f'{self.server.url}/files/june.csv', file, transport=self.trans.transport)
+        self.assertEqual(file.getvalue(), b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
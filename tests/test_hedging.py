@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+from collections import Counter
+
+from py4paystack.routes.transaction import Transaction
+from py4paystack.utilities.hedging import HedgePolicy
+
+from .fake_server import FakePaystack, transaction_record
+
+
+class TestHedgePolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack().start()
+        self.server.route('GET', r'/transaction/verify/(?P<reference>[^/]+)', self.verify)
+        # reference -> seconds its first request takes
+        self.stalls = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def verify(self, match, query, body):
+        reference = match['reference']
+        with self._lock:
+            self.calls[reference] += 1
+            first = self.calls[reference] == 1
+        if first:
+            time.sleep(self.stalls.get(reference, 0.0))
+        return transaction_record(1, reference)
+
+    def transaction(self, policy):
+        self.addCleanup(policy.close)
+        return Transaction('sk_test_fake', transport=self.server.transport(hedge=policy))
+
+    def test_losing_request_is_cut_off_not_replayed(self):
+        policy = HedgePolicy(max_rate=0.5, min_delay=0.05, min_samples=5)
+        trans = self.transaction(policy)
+        for index in range(5):
+            trans.verify(f'warm{index}')
+
+        self.stalls['slow'] = 1.0
+        start = time.perf_counter()
+        response = trans.verify('slow')
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(response['data']['reference'], 'slow')
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(policy.snapshot()['hedges'], 1)
+        self.assertEqual(policy.snapshot()['hedge_wins'], 1)
+        # the cut off request answers into a closed socket and is never sent again
+        time.sleep(1.2)
+        self.assertEqual(self.server.requests['GET /transaction/verify/slow'], 2)
+        self.assertEqual(trans.verify('after')['data']['reference'], 'after')
+
+    def test_hedges_stay_within_max_rate(self):
+        policy = HedgePolicy(max_rate=0.1, burst=1, min_delay=0.01, max_delay=0.01, min_samples=5)
+        trans = self.transaction(policy)
+        for index in range(5):
+            trans.verify(f'warm{index}')
+
+        # every request is slower than the delay, so each one wants a hedge
+        for index in range(40):
+            self.stalls[f'ref{index}'] = 0.05
+            trans.verify(f'ref{index}')
+
+        stats = policy.snapshot()
+        self.assertEqual(stats['requests'], 45)
+        self.assertGreater(stats['hedges'], 0)
+        self.assertLessEqual(stats['hedges'], 45 * policy.max_rate + policy.burst)
+        self.assertGreater(stats['hedges_denied'], 0)
+        self.assertEqual(sum(self.server.requests.values()), stats['requests'] + stats['hedges'])
+
+
+if __name__ == '__main__':
+    unittest.main()
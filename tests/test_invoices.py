@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from py4paystack.routes.invoices import Invoice
+from py4paystack.workflows.invoices import STARTED, InvoiceBatch, group_line_items
+
+from .fake_server import FakePaystack, Refused
+
+
+def row(key: str, customer: str, name: str, amount: int, quantity: int = 1) -> dict:
+    return {'key': key, 'customer': customer, 'description': 'June', 'due_date': '2022-07-01',
+            'name': name, 'amount': amount, 'quantity': quantity}
+
+
+ROWS = [
+    row('a', 'CUS_aaaaaaaaaa', 'Seat', 2000, 3),
+    row('a', 'CUS_aaaaaaaaaa', 'Storage', 500),
+    row('b', 'CUS_bbbbbbbbbb', 'Seat', 2000),
+    row('c', 'PLN_cccccccccc', 'Seat', 2000),
+    row('d', 'CUS_blocked000', 'Seat', 2000),
+    row('e', 'CUS_eeeeeeeeee', 'Seat', 2000),
+]
+
+
+class TestInvoiceBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack().start()
+        self.created = []
+        # request codes whose next finalize is refused
+        self.refuse = {'PRQ_CUS_bbbbbbbbbb'}
+        self.server.route('POST', r'/paymentrequest', self.create)
+        self.server.route('POST', r'/paymentrequest/finalize/(?P<code>[^/]+)', self.finalize)
+        self.invoice = Invoice('sk_test_fake', transport=self.server.transport())
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'invoices.jsonl')
+
+    def tearDown(self):
+        self.server.stop()
+
+    def create(self, match, query, body):
+        if body['customer'] == 'CUS_blocked000':
+            raise Refused('Customer is blacklisted')
+        self.created.append(body)
+        return {**body, 'request_code': f"PRQ_{body['customer']}", 'status': 'draft'}
+
+    def finalize(self, match, query, body):
+        if match['code'] in self.refuse:
+            self.refuse.discard(match['code'])
+            raise Refused('Invoice is being updated')
+        return {'request_code': match['code'], 'status': 'pending'}
+
+    def batch(self):
+        batch = InvoiceBatch(self.invoice, self.path, workers=2, wave_size=1, wave_interval=0.01)
+        self.addCleanup(batch.journal.close)
+        return batch
+
+    def test_line_items_are_grouped_by_invoice(self):
+        invoices = list(group_line_items(ROWS[:3]))
+        self.assertEqual([invoice['key'] for invoice in invoices], ['a', 'b'])
+        self.assertEqual(invoices[0]['line_items'], [{'name': 'Seat', 'amount': 2000, 'quantity': 3},
+                                                     {'name': 'Storage', 'amount': 500, 'quantity': 1}])
+        self.assertEqual(invoices[0]['customer'], 'CUS_aaaaaaaaaa')
+
+    def test_each_invoice_moves_through_every_step_once(self):
+        batch = self.batch()
+        # an earlier run crashed while creating e
+        batch.journal.write('e', STARTED)
+
+        summary = batch.run(group_line_items(ROWS))
+        self.assertEqual(summary, {'created': 2, 'invalid': 1, 'failed': 2, 'unconfirmed': 1, 'finalized': 1, 'notified': 1})
+        self.assertEqual([body['draft'] for body in self.created], [True, True])
+        self.assertEqual(self.server.requests['POST /paymentrequest/notify/PRQ_CUS_aaaaaaaaaa'], 1)
+
+        # the refused finalize is retried, nothing is created or notified twice
+        summary = self.batch().run(group_line_items(ROWS))
+        self.assertEqual(summary, {'done': 4, 'unconfirmed': 1, 'finalized': 1, 'notified': 1})
+        self.assertEqual(len(self.created), 2)
+        self.assertEqual(self.server.requests['POST /paymentrequest/notify/PRQ_CUS_aaaaaaaaaa'], 1)
+        self.assertEqual(self.server.requests['POST /paymentrequest/notify/PRQ_CUS_bbbbbbbbbb'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
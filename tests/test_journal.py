@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from py4paystack.utilities.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_reopening_restores_the_last_state_of_every_key(self):
+        with Journal(self.path) as journal:
+            journal.write('a', 'started')
+            journal.write('b', 'started')
+            journal.write('a', 'charged', amount=5000)
+
+        with Journal(self.path) as journal:
+            self.assertEqual(journal.state('a'), 'charged')
+            self.assertEqual(journal.get('a')['amount'], 5000)
+            self.assertEqual([entry['key'] for entry in journal.entries('started')], ['b'])
+            self.assertIsNone(journal.state('c'))
+
+    def test_entry_written_after_a_torn_line_survives(self):
+        with Journal(self.path) as journal:
+            journal.write('a', 'started')
+        with open(self.path, 'a', encoding='utf-8') as file:
+            # a crash in the middle of a write
+            file.write('{"key": "b", "sta')
+
+        with Journal(self.path) as journal:
+            self.assertIsNone(journal.state('b'))
+            journal.write('c', 'started')
+
+        with Journal(self.path) as journal:
+            self.assertEqual(journal.state('a'), 'started')
+            self.assertEqual(journal.state('c'), 'started')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import threading
+import unittest
+
+from py4paystack.routes.transfer_control import TransferControl
+from py4paystack.utilities.errors import APIError
+from py4paystack.workflows.ledger import LedgerWatcher
+
+from .fake_server import FakePaystack, Refused, ledger_record
+
+
+class TestLedgerWatcher(unittest.TestCase):
+
+    def setUp(self):
+        # ledger entries 1 to 10, newest first
+        self.server = FakePaystack(total_records=10).start()
+        self.control = TransferControl('sk_test_fake', transport=self.server.transport())
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_only_new_entries_are_emitted_oldest_first(self):
+        watcher = LedgerWatcher(self.control, min_interval=1.0, max_interval=4.0, backoff=2.0, per_page=2)
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(watcher.position, 10)
+
+        self.server.total_records = 15
+        self.assertEqual([entry['id'] for entry in watcher.poll()], [11, 12, 13, 14, 15])
+        self.assertEqual(self.server.requests['GET /balance/ledger'], 1 + 3)
+        self.assertEqual(watcher.balances, {'NGN': ledger_record(14)['balance']})
+        self.assertEqual(watcher.interval, 1.0)
+
+        # a quiet ledger costs one request per poll and is polled less often
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(watcher.interval, 4.0)
+        self.assertEqual(self.server.requests['GET /balance/ledger'], 4 + 3)
+
+    def test_failed_polls_go_to_on_error(self):
+        def refuse(match, query, body):
+            raise Refused('Service unavailable')
+
+        watcher = LedgerWatcher(self.control, position=8, min_interval=0.01, max_interval=0.01)
+        stop = threading.Event()
+        entries, errors = [], []
+        watcher.run(lambda entry: entries.append(entry['id']) or self.server.route('GET', r'/balance/ledger', refuse),
+                    stop, on_error=lambda error: errors.append(error) or stop.set())
+        self.assertEqual(entries, [9, 10])
+        self.assertIsInstance(errors[0], APIError)
+        self.assertEqual(watcher.position, 10)
+
+        with self.assertRaises(APIError):
+            watcher.run(entries.append, threading.Event())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from py4paystack.routes.verification import Verification
+from py4paystack.utilities.metrics import Instrumentation, route_name
+from py4paystack.workflows.recipients import AccountNames
+
+from .fake_server import FakePaystack, Refused
+
+
+class TestRouteName(unittest.TestCase):
+
+    def test_letter_only_references_and_slugs_are_collapsed(self):
+        self.assertEqual(route_name('/transaction/verify/abcdefgh?x=1'), '/transaction/verify/:id')
+        self.assertEqual(route_name('/page/my-store'), '/page/:id')
+        self.assertEqual(route_name('/customer/CUS_xnxdt6s1zg1f4nx/identification'), '/customer/:id/identification')
+
+    def test_fixed_segments_are_kept(self):
+        self.assertEqual(route_name('/transaction/totals'), '/transaction/totals')
+        self.assertEqual(route_name('/transfer/finalize_transfer'), '/transfer/finalize_transfer')
+        self.assertEqual(route_name('/bank/resolve?account_number=0001234567'), '/bank/resolve')
+
+    def test_unknown_paths_collapse_ids(self):
+        self.assertEqual(route_name('/terminal/30/event'), '/terminal/:id/event')
+
+
+class TestCacheHits(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack().start()
+        self.server.route('GET', r'/bank/resolve', self.resolve)
+        self.instrumentation = Instrumentation()
+        self.names = AccountNames(Verification('sk_test_fake', transport=self.server.transport(),
+                                               instrumentation=self.instrumentation))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def resolve(self, match, query, body):
+        if query['account_number'] == '0000000000':
+            raise Refused('Could not resolve account name. Check parameters or try again.')
+        return {'account_number': query['account_number'], 'account_name': 'ADA LOVELACE'}
+
+    def test_cached_account_names_count_as_hits(self):
+        for _ in range(3):
+            self.assertEqual(self.names.resolve('058', '0001234567'), 'ADA LOVELACE')
+            self.assertIsNone(self.names.resolve('058', '0000000000'))
+        self.assertEqual(self.server.requests['GET /bank/resolve'], 2)
+        self.assertEqual(self.instrumentation.snapshot()['counters']['cache_hits'], {'GET /bank/resolve': 4})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from py4paystack.routes.transfer_recipient import TransferRecipient
+from py4paystack.routes.verification import Verification
+from py4paystack.workflows.recipients import RecipientSync
+
+from .fake_server import FakePaystack, Refused
+
+
+def row(account_number: str, **fields) -> dict:
+    return {'type': 'nuban', 'bank_code': '058', 'account_number': account_number, 'currency': 'NGN', **fields}
+
+
+class TestRecipientSync(unittest.TestCase):
+
+    def setUp(self):
+        # the integration already has recipients for accounts 0000000000 to 0000000004
+        self.server = FakePaystack(total_records=5).start()
+        self.resolves = []
+        self.server.route('GET', r'/bank/resolve', self.resolve)
+        transport = self.server.transport()
+        self.sync = RecipientSync(TransferRecipient('sk_test_fake', transport=transport),
+                                  Verification('sk_test_fake', transport=transport), chunk_size=2)
+        # account -> message of the refusal of its resolve
+        self.refusals = {}
+
+    def tearDown(self):
+        self.server.stop()
+
+    def resolve(self, match, query, body):
+        account_number = query['account_number']
+        self.resolves.append(account_number)
+        if account_number in self.refusals:
+            raise Refused(self.refusals[account_number])
+        return {'account_number': account_number, 'account_name': f'ACCOUNT {account_number}'}
+
+    def test_creates_only_new_unique_recipients(self):
+        report = self.sync.run([
+            row('0000000001'),
+            row('1000000001'),
+            row('1000000001'),
+            row('1000000002', name='Ada'),
+            row('123'),
+        ])
+        self.assertEqual(+report['counts'], {'existing': 1, 'duplicate': 1, 'created': 2, 'invalid': 1})
+        self.assertEqual(report['recipients'][('058', '1000000002')], 'RCP_1000000002')
+        self.assertEqual(self.resolves, ['1000000001', '1000000002'])
+
+    def test_unresolved_rows_are_not_also_failed(self):
+        self.refusals['1000000001'] = 'Could not resolve account name. Check parameters or try again.'
+
+        def refuse(match, query, body):
+            raise Refused('Service unavailable')
+
+        self.server.route('POST', r'/transferrecipient/bulk', refuse)
+        report = self.sync.run([row('1000000001'), row('1000000002')])
+        self.assertEqual(+report['counts'], {'unresolved': 1, 'failed': 1})
+        self.assertEqual([number for number, _ in report['invalid']], [0])
+        self.assertEqual(report['failed'], [(1, 'Service unavailable')])
+
+    def test_transient_resolve_failure_is_not_cached(self):
+        self.refusals['1000000001'] = 'Too many requests'
+        report = self.sync.run([row('1000000001')])
+        self.assertEqual(+report['counts'], {'failed': 1})
+
+        del self.refusals['1000000001']
+        report = self.sync.run([row('1000000001')])
+        self.assertEqual(+report['counts'], {'created': 1})
+        self.assertEqual(self.resolves, ['1000000001', '1000000001'])
+
+
+if __name__ == '__main__':
+    unittest.main()
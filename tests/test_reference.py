@@ -0,0 +1,66 @@
+import re
+import unittest
+
+from py4paystack.utilities import reference, util
+from py4paystack.utilities.dedup import Deduplicator, MemoryDeduplicator
+from py4paystack.utilities.reference import ReferenceGenerator
+
+# only lowercase letters, digits and - are valid in every Paystack reference
+VALID = re.compile(r'[a-z0-9-]+')
+
+
+class Taken(Deduplicator):
+
+    """Reports the first references offered as already issued"""
+
+    def __init__(self, taken: int) -> None:
+        self.taken = taken
+        self.offered = []
+
+    def seen(self, key):
+        self.offered.append(key)
+        return len(self.offered) <= self.taken
+
+    def forget(self, key):
+        pass
+
+
+class TestReferenceGenerator(unittest.TestCase):
+
+    def test_references_sort_by_creation(self):
+        generate = ReferenceGenerator('shop1', shard=7)
+        references = [generate() for _ in range(2000)]
+        self.assertEqual(references, sorted(references))
+        self.assertEqual(len(set(references)), 2000)
+        self.assertTrue(all(reference.startswith('shop1-07-') for reference in references))
+        self.assertTrue(all(VALID.fullmatch(reference) for reference in references))
+
+    def test_batch_continues_the_order(self):
+        generate = ReferenceGenerator(random_bytes=2)
+        first = generate()
+        batch = generate.batch(70000)
+        self.assertEqual(len(set(batch)), 70000)
+        self.assertEqual([first] + batch, sorted([first] + batch))
+        self.assertEqual(len(first), 12 + 4 + 4)
+
+    def test_guard_replaces_issued_references(self):
+        guard = Taken(taken=2)
+        reference = ReferenceGenerator(guard=guard)()
+        self.assertEqual(len(guard.offered), 3)
+        self.assertEqual(reference, guard.offered[-1])
+
+        guard = MemoryDeduplicator()
+        generate = ReferenceGenerator(guard=guard)
+        self.assertEqual(len(set(generate.batch(10) + [generate()])), 11)
+        self.assertEqual(len(guard), 11)
+
+    def test_default_is_used_by_the_routes(self):
+        self.addCleanup(reference.set_default, reference.default)
+        self.assertRegex(util.create_ref(), r'[0-9a-f]{32}')
+        reference.set_default(ReferenceGenerator('shop1'))
+        self.assertTrue(util.create_ref().startswith('shop1-'))
+        self.assertTrue(all(ref.startswith('shop1-') for ref in util.create_refs(3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
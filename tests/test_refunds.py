@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from py4paystack.routes.refund import Refund
+from py4paystack.workflows.refunds import STARTED, RefundRunner
+
+from .fake_server import FakePaystack, Refused
+
+
+class TestRefundRunner(unittest.TestCase):
+
+    def setUp(self):
+        # refunds exist for transactions 0, 2 and 4, the one for transaction 6 failed
+        self.server = FakePaystack(total_records=4).start()
+        self.server.route('POST', r'/refund', self.create)
+        self.refund = Refund('sk_test_fake', transport=self.server.transport())
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'refunds.jsonl')
+
+    def tearDown(self):
+        self.server.stop()
+
+    def create(self, match, query, body):
+        if body['transaction'] == 'ref-settled':
+            raise Refused('Transaction has been fully reversed')
+        return {'id': 900000, 'transaction': body['transaction'], 'amount': body.get('amount'), 'status': 'pending'}
+
+    def runner(self):
+        runner = RefundRunner(self.refund, self.path, workers=2)
+        self.addCleanup(runner.journal.close)
+        return runner
+
+    def test_existing_and_repeated_refunds_are_skipped(self):
+        refunds = [(2, None), ('ref0000000004', None), (6, 5000), (10, None), (10, None), ('ref-settled', None)]
+        summary = self.runner().run(refunds, merchant_note='incident 42')
+        self.assertEqual(summary, {'already_refunded': 3, 'refunded': 2, 'failed': 1})
+        self.assertEqual(self.server.requests['POST /refund'], 3)
+
+        # a second run of the same input sends nothing
+        summary = self.runner().run(refunds)
+        self.assertEqual(summary, {'already_refunded': 2, 'done': 4})
+        self.assertEqual(self.server.requests['POST /refund'], 3)
+
+    def test_network_error_is_not_retried(self):
+        runner = self.runner()
+        with mock.patch.object(self.refund, 'create', side_effect=ConnectionResetError) as create:
+            summary = runner.run([(10, None)])
+        self.assertEqual(summary, {'error': 1})
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(runner.journal.state('10'), STARTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from py4paystack.routes.virtual_accounts import DedicatedVirtualAccounts
+from py4paystack.utilities.metrics import Instrumentation
+from py4paystack.workflows.requery import DAY, RequeryScheduler
+
+from .fake_server import FakePaystack, Refused
+
+NOW = 1656633600.0
+
+
+class TestRequeryScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack().start()
+        self.server.route('GET', r'/dedicated_account/requery', self.requery)
+        self.instrumentation = Instrumentation()
+        self.scheduler = RequeryScheduler(
+            DedicatedVirtualAccounts('sk_test_fake', transport=self.server.transport(), instrumentation=self.instrumentation),
+            budgets={'wema-bank': 2, 'access-bank': 1})
+        self.refused = set()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def requery(self, match, query, body):
+        if query['account_number'] in self.refused:
+            raise Refused('Account not found')
+        return {}
+
+    def test_busiest_accounts_go_first_within_the_provider_budget(self):
+        self.scheduler.add('9000000001', 'wema-bank', activity=1)
+        self.scheduler.add('9000000002', 'wema-bank', activity=40)
+        self.scheduler.add('9000000003', 'wema-bank', activity=10)
+        self.scheduler.add('9000000004', 'access-bank', activity=1)
+
+        self.assertEqual(self.scheduler.run_once(NOW), {'requeried': 3})
+        self.assertEqual(self.scheduler.counters['over_budget'], 1)
+        # the quiet wema account waits, the others are due again after their interval
+        self.assertEqual(self.scheduler.next_due(), 0.0)
+        self.assertEqual(self.scheduler._accounts['9000000002'].due, NOW + DAY / 40)
+        self.assertIsNone(self.scheduler._accounts['9000000001'].last_requery)
+
+        counters = self.instrumentation.snapshot()['counters']
+        self.assertEqual(counters['requeries.wema-bank'], {'GET /dedicated_account/requery': 2})
+        self.assertEqual(counters['requeries.access-bank'], {'GET /dedicated_account/requery': 1})
+
+    def test_refused_requery_waits_for_the_next_interval(self):
+        self.refused.add('9000000001')
+        self.scheduler.add('9000000001', 'wema-bank', activity=4)
+        self.assertEqual(self.scheduler.run_once(NOW), {'failed': 1})
+        self.assertEqual(self.scheduler.next_due(), NOW + DAY / 4)
+
+    def test_network_error_is_retried_after_the_minimum_interval(self):
+        self.scheduler.add('9000000001', 'wema-bank', activity=4)
+        self.server.stop()
+        self.assertEqual(self.scheduler.run_once(NOW), {'error': 1})
+        self.assertEqual(self.scheduler.next_due(), NOW + self.scheduler.min_interval)
+        self.server.start()
+
+    def test_late_credits_are_counted(self):
+        self.scheduler.add('9000000001', 'wema-bank', last_requery=NOW)
+        self.assertEqual(self.scheduler.record_credit('9000000001', NOW - 600, detected_at=NOW + 300), 900)
+        self.assertEqual(self.scheduler.metrics()['counters'], {'credits': 1, 'late_credits': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
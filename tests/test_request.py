@@ -0,0 +1,46 @@
+import unittest
+
+from py4paystack.routes.apple_pay import ApplePay
+from py4paystack.routes.customer import Customer
+from py4paystack.routes.transaction import Transaction
+
+from .fake_server import FakePaystack
+
+
+class TestRequest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack().start()
+        self.bodies = []
+        for method in ('POST', 'DELETE'):
+            self.server.route(method, r'/(?P<collection>[\w-]+)(/domain)?', lambda match, query, body: self.bodies.append(body) or {})
+        self.transport = self.server.transport()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_headers_are_built_once_and_read_only(self):
+        trans = Transaction('sk_test_fake', transport=self.transport)
+        self.assertEqual(trans.auth_headers, {'authorization': b'bearer sk_test_fake'})
+        self.assertEqual(trans.headers['Content-type'], b'application/json')
+        with self.assertRaises(TypeError):
+            trans.headers['authorization'] = b'bearer sk_live_other'
+
+    def test_instances_share_one_layer_of_type_checks(self):
+        verify = Transaction.verify
+        routes = [Transaction('sk_test_fake', transport=self.transport) for _ in range(2000)]
+        self.assertIs(Transaction.verify, verify)
+        self.assertEqual(routes[-1].verify('ref1')['status'], True)
+        with self.assertRaisesRegex(TypeError, 'Transaction.verify'):
+            routes[-1].verify(1)
+        self.assertEqual(self.server.requests, {'GET /transaction/verify/ref1': 1})
+
+    def test_bodies_are_utf8_json(self):
+        Customer('sk_test_fake', transport=self.transport).create('ada@example.com', first_name='Adébáyọ̀')
+        ApplePay('sk_test_fake', transport=self.transport).unregister('example.com')
+        self.assertEqual(self.bodies, [{'email': 'ada@example.com', 'first_name': 'Adébáyọ̀'},
+                                       {'domainName': 'example.com'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import time
+import unittest
+
+from py4paystack.tenants import Tenants
+
+from .fake_server import FakePaystack
+
+KEYS = {'shop1': 'sk_test_shop1', 'shop2': 'sk_test_shop2', 'shop3': 'sk_test_shop3', 'closed': None}
+
+
+class TestTenants(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack().start()
+        self.transport = self.server.transport()
+        self.evicted = []
+
+    def tearDown(self):
+        self.server.stop()
+
+    def tenants(self, **kwargs):
+        return Tenants(KEYS, self.transport, on_evict=lambda tenant: self.evicted.append(tenant.tenant_id), **kwargs)
+
+    def test_tenants_share_the_pool_but_not_metrics(self):
+        tenants = self.tenants()
+        trans = tenants['shop1'].transaction()
+        trans.verify('ref1')
+        trans.verify('ref2')
+        tenants['shop2'].transaction().verify('ref3')
+
+        self.assertIs(trans.transport, tenants['shop2'].transaction().transport)
+        self.assertEqual(trans.auth_headers['authorization'], b'bearer sk_test_shop1')
+        self.assertEqual(tenants.metrics('shop1')['status_codes'], {'GET /transaction/verify/:id': {200: 2}})
+        self.assertEqual(tenants.metrics('shop2')['status_codes'], {'GET /transaction/verify/:id': {200: 1}})
+        self.assertEqual(tenants.metrics('shop3'), {})
+
+    def test_unknown_tenants_are_key_errors(self):
+        tenants = self.tenants()
+        for tenant_id in ('shop4', 'closed'):
+            with self.subTest(tenant_id=tenant_id), self.assertRaises(KeyError):
+                tenants[tenant_id]
+        self.assertEqual(len(tenants), 0)
+
+    def test_least_recently_used_tenants_are_evicted(self):
+        tenants = self.tenants(max_tenants=2)
+        first = tenants.tenant('shop1')
+        tenants['shop2']
+        tenants['shop1']
+        tenants['shop3']
+        self.assertEqual(self.evicted, ['shop2'])
+        self.assertIs(tenants.tenant('shop1'), first)
+
+        tenants.remove('shop1')
+        self.assertNotIn('shop1', tenants)
+        self.assertIsNot(tenants.tenant('shop1'), first)
+
+    def test_idle_tenants_are_evicted(self):
+        tenants = self.tenants(idle_timeout=0.05)
+        tenants['shop1']
+        self.assertEqual(tenants.evict_idle(), 0)
+        time.sleep(0.1)
+        self.assertEqual(tenants.evict_idle(), 1)
+        self.assertEqual(self.evicted, ['shop1'])
+
+    def test_each_tenant_has_its_own_rate_limit(self):
+        tenants = self.tenants(rate=20, burst=1)
+        for _ in range(3):
+            tenants['shop1'].transaction().verify('ref1')
+        tenants['shop2'].transaction().verify('ref1')
+        self.assertEqual(tenants.metrics('shop1')['counters'], {'rate_limit_waits': {'GET /transaction/verify/:id': 2}})
+        self.assertEqual(tenants.metrics('shop2')['counters'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import itertools
+import unittest
+from unittest import mock
+
+from py4paystack.routes.transfer import Transfer
+from py4paystack.routes.transfer_control import TransferControl
+from py4paystack.workflows.transfer_otp import EXPIRED, FINALIZED, OTP, TransferOTPQueue
+
+from .fake_server import FakePaystack, Refused
+
+RECIPIENT = 'RCP_1ptvuv321ahaa7q'
+
+
+class TestTransferOTPQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack(transfer_status=OTP).start()
+        # transfers by reference, an initiate with a reference Paystack already has is refused
+        self.transfers = {}
+        self.codes = itertools.count(1)
+        self.server.route('POST', r'/transfer', self.initiate)
+        self.server.route('GET', r'/transfer/verify/(?P<reference>[^/]+)', self.verify)
+        transport = self.server.transport()
+        self.queue = TransferOTPQueue(Transfer('sk_test_fake', transport=transport),
+                                      TransferControl('sk_test_fake', transport=transport))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def initiate(self, match, query, body):
+        if body['reference'] in self.transfers:
+            raise Refused('Duplicate Transfer Reference')
+        self.transfers[body['reference']] = {**body, 'transfer_code': f'TRF_{next(self.codes):010d}', 'status': OTP}
+        return self.transfers[body['reference']]
+
+    def verify(self, match, query, body):
+        if match['reference'] not in self.transfers:
+            raise Refused('Transfer not found')
+        return self.transfers[match['reference']]
+
+    def test_initiate_queues_transfers_waiting_for_an_otp(self):
+        summary = self.queue.initiate([
+            {'amount': 50000, 'recipient': RECIPIENT, 'reason': 'June payout', 'metadata': {'payee': 1}},
+            {'amount': 70000, 'recipient': RECIPIENT},
+            {'amount': 70000},
+        ])
+        self.assertEqual(summary, {OTP: 2, 'invalid': 1})
+        self.assertEqual(len(self.queue.pending()), 2)
+        self.assertNotIn('metadata', next(iter(self.transfers.values())))
+
+    def test_refused_initiate_that_went_through_is_queued(self):
+        self.initiate(None, None, {'reference': 'payout-1', 'amount': 50000})
+        summary = self.queue.initiate([{'amount': 50000, 'recipient': RECIPIENT, 'reference': 'payout-1'}])
+        self.assertEqual(summary, {OTP: 1})
+        self.assertEqual(self.queue.pending()[0].reference, 'payout-1')
+
+    def test_network_error_is_looked_up_not_resent(self):
+        def lost(source, **payload):
+            # Paystack got the transfer but the answer never arrived
+            self.initiate(None, None, payload)
+            raise ConnectionResetError
+
+        with mock.patch.object(self.queue.transfer, 'initiate', side_effect=lost) as initiate:
+            summary = self.queue.initiate([{'amount': 50000, 'recipient': RECIPIENT, 'reference': 'payout-2'}])
+        self.assertEqual(initiate.call_count, 1)
+        self.assertEqual(summary, {OTP: 1})
+
+    def test_network_error_for_unknown_transfer_is_an_error(self):
+        with mock.patch.object(self.queue.transfer, 'initiate', side_effect=ConnectionResetError):
+            summary = self.queue.initiate([{'amount': 50000, 'recipient': RECIPIENT}])
+        self.assertEqual(summary, {'error': 1})
+        self.assertEqual(len(self.queue), 0)
+
+    def test_wrong_otp_keeps_the_transfer_waiting(self):
+        self.queue.add('TRF_0000000001', 'payout-1', 50000)
+        self.queue.add('TRF_0000000002', 'payout-2', 50000)
+        results = self.queue.finalize({'TRF_0000000001': '123456', 'TRF_0000000002': '000000'})
+        self.assertEqual(results, {'TRF_0000000001': FINALIZED, 'TRF_0000000002': OTP})
+        self.assertEqual(self.queue.table['TRF_0000000002'].message, 'Invalid OTP')
+
+    def test_expired_otps_are_resent(self):
+        self.queue.add('TRF_0000000001', expires_at=1.0)
+        self.assertEqual(self.queue.expire(), 1)
+        self.assertEqual(self.queue.summary(), {EXPIRED: 1})
+        self.assertEqual(self.queue.finalize({'TRF_0000000001': '123456'}), {})
+        self.assertEqual(self.queue.resend(), {'resent': 1})
+        self.assertEqual(self.queue.summary(), {OTP: 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import http.client
+import json
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from py4paystack.utilities import transport as transport_module
+from py4paystack.utilities.transport import Transport
+
+from .fake_server import FakePaystack
+
+RESPONSE = b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}'
+
+
+class DroppingServer:
+
+    """Answers the first request on every connection and reads the second, then drops the connection without an answer"""
+
+    def __init__(self) -> None:
+        self.received = []
+        self._socket = socket.create_server(('127.0.0.1', 0))
+        self.port = self._socket.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        with connection, connection.makefile('rb') as stream:
+            for answered in (True, False):
+                line = stream.readline()
+                if not line:
+                    return
+                length = 0
+                for header in iter(stream.readline, b'\r\n'):
+                    name, _, value = header.partition(b':')
+                    if name.lower() == b'content-length':
+                        length = int(value)
+                stream.read(length)
+                self.received.append(line.split()[0].decode())
+                if answered:
+                    connection.sendall(RESPONSE)
+            connection.shutdown(socket.SHUT_RDWR)
+
+    def close(self):
+        self._socket.close()
+
+
+class TestStaleConnections(unittest.TestCase):
+
+    def setUp(self):
+        self.server = DroppingServer()
+        self.transport = Transport('127.0.0.1', self.server.port, secure=False)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.close()
+
+    def test_post_dropped_after_it_was_read_is_not_sent_again(self):
+        self.transport.send('POST', '/refund', body=b'{}')
+        with self.assertRaises(http.client.RemoteDisconnected):
+            self.transport.send('POST', '/refund', body=b'{}')
+        time.sleep(0.05)
+        self.assertEqual(self.server.received, ['POST', 'POST'])
+
+    def test_get_dropped_after_it_was_read_is_sent_again(self):
+        self.transport.send('GET', '/transaction/verify/ref')
+        status, _ = self.transport.send('GET', '/transaction/verify/ref')
+        self.assertEqual(status, 200)
+        self.assertEqual(self.server.received, ['GET', 'GET', 'GET'])
+
+    def test_idle_connection_closed_by_server_is_not_used(self):
+        self.transport.send('POST', '/refund', body=b'{}')
+        connection, _ = self.transport.acquire()
+        # ending the request stream makes the server close the connection while it sits in the pool
+        connection.sock.shutdown(socket.SHUT_WR)
+        self.transport.release(connection)
+        time.sleep(0.05)
+        status, _ = self.transport.send('POST', '/refund', body=b'{}')
+        self.assertEqual(status, 200)
+        self.assertEqual(self.server.received, ['POST', 'POST'])
+
+
+class TestUpload(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakePaystack().start()
+        self.transport = self.server.transport(timeout=2.0)
+        self.file = tempfile.TemporaryFile()
+        self.file.write(b'0123456789' * 100)
+
+    def tearDown(self):
+        self.file.close()
+        self.server.stop()
+
+    def upload(self):
+        progress = []
+        status, body = self.transport.upload('PUT', '/uploads/receipt.pdf', self.file,
+                                             progress=lambda sent, total: progress.append((sent, total)), chunk_size=256)
+        self.assertEqual(status, 200)
+        return json.loads(body)['data']['size'], progress[-1]
+
+    def test_file_object_is_sent_from_its_position(self):
+        self.file.seek(300)
+        self.assertEqual(self.upload(), (700, (700, 700)))
+
+    def test_memory_mapped_file_is_sent_from_its_position(self):
+        self.file.seek(300)
+        with mock.patch.object(transport_module, 'MMAP_THRESHOLD', 0):
+            self.assertEqual(self.upload(), (700, (700, 700)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import datetime
+import unittest
+
+from py4paystack.routes.miscellaneous import Miscellaneous
+from py4paystack.routes.transaction import Transaction
+from py4paystack.utilities import settings, util
+
+from .fake_server import FakePaystack
+
+
+class TestValidators(unittest.TestCase):
+
+    def test_email(self):
+        self.assertEqual(util.check_email('ada.lovelace+pay@example.com.ng'), 'ada.lovelace+pay@example.com.ng')
+        for email in ('ada@example', 'ada@example.c|m', 'ada@example.co_', 'ada example@example.com', 'ada@@example.com'):
+            with self.subTest(email=email), self.assertRaises(ValueError):
+                util.check_email(email)
+
+    def test_email_or_customer_code(self):
+        self.assertEqual(util.check_email_or_customer('CUS_xnxdt6s1zg1f4nx'), 'CUS_xnxdt6s1zg1f4nx')
+        self.assertEqual(util.check_email_or_customer('ada@example.com'), 'ada@example.com')
+        with self.assertRaisesRegex(ValueError, 'email or customer_code'):
+            util.check_email_or_customer('PLN_gx2wn530m0i3w3m')
+
+    def test_code_prefix(self):
+        self.assertEqual(util.check_code(settings.AUTHORIZATION, 'AUTH_8dfhjjdt'), 'AUTH_8dfhjjdt')
+        self.assertEqual(util.check_code(settings.SUBACCOUNT, ['ACCT_8f4s1eq7ml']), 'ACCT_8f4s1eq7ml')
+        with self.assertRaisesRegex(ValueError, 'must start with AUTH not CUS'):
+            util.check_code(settings.AUTHORIZATION, 'CUS_8dfhjjdt')
+        with self.assertRaises(ValueError):
+            util.check_code(settings.SUBACCOUNT, ['ACCT_8f4s1eq7ml', 'SUB_9g5t2fr8nm'])
+
+    def test_channels(self):
+        self.assertEqual(util.check_channels('card'), ['card'])
+        self.assertEqual(util.check_channels(('card', 'bank')), ['card', 'bank'])
+        with self.assertRaisesRegex(ValueError, 'Invalid payment channel'):
+            util.check_channels(['card', 'cash'])
+
+    def test_dates(self):
+        self.assertEqual(util.handle_date(datetime.datetime(2022, 6, 1, 12, 30)), '2022-06-01')
+        self.assertEqual(util.handle_date('2022-06-01'), '2022-06-01')
+        with self.assertRaises(ValueError):
+            util.handle_date('01/06/2022')
+
+    def test_fixed_length_values(self):
+        self.assertEqual(util.check_bvn('12345678901'), '12345678901')
+        self.assertEqual(util.check_account_number('0123456789'), '0123456789')
+        for check, value in ((util.check_bvn, '1234567890a'), (util.check_account_number, '012345678'),
+                             (util.check_bank_code, '05A'), (util.check_country, 'NGA')):
+            with self.subTest(check=check.__name__), self.assertRaises(ValueError):
+                check(value)
+
+    def test_validate_many_reports_every_failure(self):
+        valid, errors = util.validate_many(util.check_email, ['a@example.com', 'nope', 'b@example.com', None])
+        self.assertEqual(valid, ['a@example.com', 'b@example.com'])
+        self.assertEqual([index for index, _ in errors], [1, 3])
+        self.assertEqual(errors[0][1], 'provide a valid email!')
+
+
+class TestQueryParams(unittest.TestCase):
+
+    def test_values_are_encoded(self):
+        path = util.handle_query_params('/customer', {
+            'email': 'ada+pay@example.com', 'use_cursor': False, 'from': datetime.date(2022, 6, 1),
+            'perPage': 50, 'next': None, 'name': 'Ada Lovelace & Co'})
+        self.assertEqual(path, '/customer?email=ada%2Bpay%40example.com&use_cursor=false&from=2022-06-01'
+                               '&perPage=50&name=Ada%20Lovelace%20%26%20Co')
+        self.assertEqual(util.handle_query_params('/customer', {'next': None}), '/customer')
+
+    def test_routes_send_their_params_in_the_query(self):
+        with FakePaystack() as server:
+            queries = []
+            server.route('GET', r'/(?P<collection>\w+)(/totals)?', lambda match, query, body: queries.append(query) or [])
+            transport = server.transport()
+            Transaction('sk_test_fake', transport=transport).totals(per_page=10, from_date=datetime.date(2022, 6, 1))
+            misc = Miscellaneous('sk_test_fake', transport=transport)
+            misc.list_banks('nigeria', use_cursor=True, per_page=20)
+            with self.assertRaises(ValueError):
+                misc.list_banks('nigeria', currency='EUR')
+            self.assertEqual(server.requests, {'GET /transaction/totals': 1, 'GET /bank': 1})
+        self.assertEqual(queries, [{'perPage': '10', 'from': '2022-06-01'},
+                                   {'country': 'nigeria', 'use_cursor': 'true', 'perPage': '20'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
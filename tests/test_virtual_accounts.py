@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from py4paystack.routes.virtual_accounts import DedicatedVirtualAccounts
+from py4paystack.utilities.metrics import Instrumentation
+from py4paystack.workflows.virtual_accounts import AccountProvisioner
+
+from .fake_server import FakePaystack, Refused, dedicated_account_record
+
+CUSTOMERS = ['CUS_0000000001', 'CUS_new0000001', 'CUS_new0000002', 'CUS_new0000001', 'CUS_blocked000', 'PLN_0000000001']
+
+
+class TestAccountProvisioner(unittest.TestCase):
+
+    def setUp(self):
+        # CUS_0000000000 to CUS_0000000002 already have an account
+        self.server = FakePaystack(total_records=3).start()
+        self.server.route('POST', r'/dedicated_account', self.create)
+        self.instrumentation = Instrumentation()
+        self.virtual_accounts = DedicatedVirtualAccounts(
+            'sk_test_fake', transport=self.server.transport(), instrumentation=self.instrumentation)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def tearDown(self):
+        self.server.stop()
+
+    def create(self, match, query, body):
+        if body['customer'] == 'CUS_blocked000':
+            raise Refused('Customer is blacklisted')
+        return dedicated_account_record(int(body['customer'][-1]) + 100, body['customer'], body['preferred_bank'])
+
+    def provisioner(self):
+        provisioner = AccountProvisioner(self.virtual_accounts, os.path.join(self.directory, 'accounts.jsonl'), workers=2)
+        self.addCleanup(provisioner.journal.close)
+        return provisioner
+
+    def test_only_customers_without_an_account_are_assigned_one(self):
+        provisioner = self.provisioner()
+        self.assertEqual(provisioner.run(CUSTOMERS), {'existing': 2, 'assigned': 2, 'failed': 1, 'error': 1})
+        self.assertEqual(self.server.requests['POST /dedicated_account'], 3)
+
+        mapping = provisioner.mapping()
+        self.assertEqual(sorted(mapping), ['CUS_0000000001', 'CUS_new0000001', 'CUS_new0000002'])
+        self.assertEqual(mapping['CUS_new0000002'], ('9000000102', provisioner.bank_for('CUS_new0000002')))
+        self.assertIn(mapping['CUS_new0000001'][1], ('access-bank', 'wema-bank'))
+
+        # the providers are fetched once and read from the cache afterwards
+        self.assertEqual(self.server.requests['GET /dedicated_account/available_providers'], 1)
+        self.assertGreater(self.instrumentation.snapshot()['counters']['cache_hits']['GET /dedicated_account/available_providers'], 0)
+
+        path = os.path.join(self.directory, 'accounts.csv')
+        self.assertEqual(provisioner.write_mapping(path), 3)
+
+    def test_rerun_only_requests_unassigned_customers(self):
+        self.provisioner().run(CUSTOMERS)
+        self.assertEqual(self.provisioner().run(CUSTOMERS), {'done': 4, 'failed': 1, 'error': 1})
+        self.assertEqual(self.server.requests['POST /dedicated_account'], 4)
+
+    def test_preferred_bank_is_used_for_every_account(self):
+        provisioner = AccountProvisioner(self.virtual_accounts, os.path.join(self.directory, 'wema.jsonl'), preferred_bank='wema-bank')
+        self.addCleanup(provisioner.journal.close)
+        provisioner.run(['CUS_new0000001', 'CUS_new0000002'])
+        self.assertEqual({bank for _, bank in provisioner.mapping().values()}, {'wema-bank'})
+        self.assertEqual(self.server.requests['GET /dedicated_account/available_providers'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import hmac
+import json
+import unittest
+
+from py4paystack.utilities.dedup import MemoryDeduplicator
+from py4paystack.utilities.errors import InvalidSignatureError
+from py4paystack.webhook import WebhookDispatcher
+
+SECRET_KEY = 'sk_test_fake'
+
+
+def signed(event: str, **data):
+    payload = json.dumps({'event': event, 'data': data}).encode()
+    return payload, hmac.digest(SECRET_KEY.encode(), payload, 'sha512').hex()
+
+
+class TestWebhookDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.received = []
+
+    def dispatcher(self, workers=0):
+        dispatcher = WebhookDispatcher(SECRET_KEY, workers=workers, dedup=MemoryDeduplicator())
+        dispatcher.register('*', lambda event: self.received.append(event.key or event.data))
+        self.addCleanup(dispatcher.close)
+        return dispatcher
+
+    def test_invalid_signature_is_rejected(self):
+        payload, _ = signed('charge.success', reference='ref1')
+        with self.assertRaises(InvalidSignatureError):
+            self.dispatcher().handle(payload, 'not-the-signature')
+        self.assertEqual(self.received, [])
+
+    def test_redelivered_event_is_handled_once(self):
+        dispatcher = self.dispatcher()
+        payload, signature = signed('charge.success', reference='ref1', id=1)
+        self.assertIsNotNone(dispatcher.handle(payload, signature))
+        self.assertIsNone(dispatcher.handle(payload, signature))
+        dispatcher.handle(*signed('transfer.success', reference='ref1'))
+        self.assertEqual(self.received, ['charge.success:ref1', 'transfer.success:ref1'])
+
+    def test_events_without_identifier_are_keyed_on_their_body(self):
+        dispatcher = self.dispatcher()
+        first = signed('customeridentification.success', customer_code='CUS_1')
+        dispatcher.handle(*first)
+        dispatcher.handle(*signed('customeridentification.success', customer_code='CUS_2'))
+        dispatcher.handle(*first)
+        self.assertEqual(self.received, [{'customer_code': 'CUS_1'}, {'customer_code': 'CUS_2'}])
+
+    def test_failed_event_is_handled_again_on_redelivery(self):
+        for workers in (0, 2):
+            with self.subTest(workers=workers):
+                dispatcher = WebhookDispatcher(SECRET_KEY, workers=workers, dedup=MemoryDeduplicator())
+                self.addCleanup(dispatcher.close)
+                calls = []
+
+                def handler(event):
+                    calls.append(event.key)
+                    if len(calls) == 1:
+                        raise RuntimeError('database is down')
+
+                dispatcher.register('charge.success', handler)
+                payload, signature = signed('charge.success', reference='ref1')
+                for _ in range(2):
+                    try:
+                        dispatcher.handle(payload, signature)
+                    except RuntimeError:
+                        pass
+                    dispatcher.join()
+                self.assertEqual(calls, ['charge.success:ref1', 'charge.success:ref1'])
+
+
+if __name__ == '__main__':
+    unittest.main()